@@ -4,12 +4,17 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, date, timedelta
-import json
 import os
 import pickle
 import random
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
+from utils.data_utils import save_prediction_data, save_parent_observation, load_parent_observations
+from utils.language_utils import get_text as get_app_text
+from utils.settings import load_app_settings, get_settings_store
+from utils.analytics import get_dashboard_summary, get_students_needing_attention, percentage
+from utils.archive import schedule_archiving
+from utils.retention import schedule_retention
 
 # IMPORTANT: Page config MUST be the first Streamlit command
 st.set_page_config(
@@ -19,130 +24,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Simple settings management
-def load_app_settings():
-    """Load application settings from file"""
-    settings_file = "data/app_settings.json"
-    if os.path.exists(settings_file):
-        try:
-            with open(settings_file, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    return {'language': 'English', 'theme': 'Modern', 'offline_mode': False}
-
-def save_app_settings(settings):
-    """Save application settings to file"""
-    settings_file = "data/app_settings.json"
-    try:
-        os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-        with open(settings_file, 'w') as f:
-            json.dump(settings, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"Error saving settings: {e}")
-        return False
-
 # Simple translations
 def get_text(key, language=None):
     """Get localized text based on language setting"""
     if language is None:
         language = st.session_state.get('app_language', 'English')
     
-    translations = {
-        'English': {
-            'app_title': 'EduScan Somalia',
-            'dashboard': 'Dashboard',
-            'assessment_form': 'Assessment Form',
-            'teacher_resources': 'Teacher Resources',
-            'parent_tracker': 'Parent Tracker',
-            'educational_content': 'Educational Content',
-            'student_name': 'Student Name',
-            'grade_level': 'Grade Level',
-            'math_score': 'Math Score (0-100)',
-            'reading_score': 'Reading Score (0-100)',
-            'writing_score': 'Writing Score (0-100)',
-            'attendance': 'Attendance (%)',
-            'behavior_rating': 'Behavior Rating (1-5)',
-            'literacy_level': 'Literacy Level (1-5)',
-            'analyze_learning_risk': 'Analyze Learning Risk',
-            'assessment_results': 'Assessment Results',
-            'recommendations': 'Recommendations',
-            'teacher_name': 'Teacher Name',
-            'assessment_date': 'Assessment Date',
-            'assessment_subtitle': 'Comprehensive learning risk assessment for students',
-            'attention_span': 'Attention Span (1-5)',
-            'class_participation': 'Class Participation (1-5)',
-            'homework_completion': 'Homework Completion (1-5)',
-            'teacher_notes': 'Teacher Notes',
-            'assess_student': 'Assess Student',
-            'clear_form': 'Clear Form',
-            'academic_scores': 'Academic Scores',
-            'behavioral_indicators': 'Behavioral Indicators',
-        },
-        'Somali': {
-            'app_title': 'EduScan Somalia',
-            'dashboard': 'Xarunta Xogta',
-            'assessment_form': 'Foomka Qiimaynta',
-            'teacher_resources': 'Agabka Macalliminta',
-            'parent_tracker': 'Dabagalka Waalidka',
-            'educational_content': 'Waxyaabaha Waxbarasho',
-            'student_name': 'Magaca Ardayga',
-            'grade_level': 'Heerka Fasalka',
-            'math_score': 'Dhibcaha Xisaabta (0-100)',
-            'reading_score': 'Dhibcaha Akhriska (0-100)',
-            'writing_score': 'Dhibcaha Qorista (0-100)',
-            'attendance': 'Soo Gaadhitaanka (%)',
-            'behavior_rating': 'Qiimaynta Dhaqanka (1-5)',
-            'literacy_level': 'Heerka Aqrinta (1-5)',
-            'analyze_learning_risk': 'Falanqee Khatarta Barashada',
-            'assessment_results': 'Natiijada Qiimaynta',
-            'recommendations': 'Talooyinka',
-            'teacher_name': 'Magaca Macallinka',
-            'assessment_date': 'Taariikhda Qiimaynta',
-            'assessment_subtitle': 'Qiimayn dhamaystiran oo khatarta barashada ardayda',
-            'attention_span': 'Mudada Diiradda (1-5)',
-            'class_participation': 'Ka-qaybgalka Fasalka (1-5)',
-            'homework_completion': 'Dhammaystirka Hawlaha Guriga (1-5)',
-            'teacher_notes': 'Xusuusta Macallinka',
-            'assess_student': 'Qiimee Ardayga',
-            'clear_form': 'Nadiifi Foomka',
-            'academic_scores': 'Dhibcaha Tacliinta',
-            'behavioral_indicators': 'Tilmaamaha Dhaqanka',
-        },
-        'Arabic': {
-            'app_title': 'EduScan Somalia',
-            'dashboard': 'لوحة التحكم',
-            'assessment_form': 'نموذج التقييم',
-            'teacher_resources': 'موارد المعلم',
-            'parent_tracker': 'متتبع الوالدين',
-            'educational_content': 'المحتوى التعليمي',
-            'student_name': 'اسم الطالب',
-            'grade_level': 'مستوى الصف',
-            'math_score': 'درجة الرياضيات (0-100)',
-            'reading_score': 'درجة القراءة (0-100)',
-            'writing_score': 'درجة الكتابة (0-100)',
-            'attendance': 'الحضور (%)',
-            'behavior_rating': 'تقييم السلوك (1-5)',
-            'literacy_level': 'مستوى الإلمام بالقراءة والكتابة (1-5)',
-            'analyze_learning_risk': 'تحليل مخاطر التعلم',
-            'assessment_results': 'نتائج التقييم',
-            'recommendations': 'التوصيات',
-            'teacher_name': 'اسم المعلم',
-            'assessment_date': 'تاريخ التقييم',
-            'assessment_subtitle': 'تقييم شامل لمخاطر التعلم للطلاب',
-            'attention_span': 'مدة الانتباه (1-5)',
-            'class_participation': 'المشاركة في الفصل (1-5)',
-            'homework_completion': 'إكمال الواجب المنزلي (1-5)',
-            'teacher_notes': 'ملاحظات المعلم',
-            'assess_student': 'تقييم الطالب',
-            'clear_form': 'مسح النموذج',
-            'academic_scores': 'الدرجات الأكاديمية',
-            'behavioral_indicators': 'مؤشرات السلوك',
-        }
-    }
-    
-    return translations.get(language, translations['English']).get(key, key)
+    return get_app_text(key, language, domain='app')
 
 # Model loading and prediction functions
 def load_model():
@@ -281,9 +169,7 @@ def render_sidebar():
         
         if selected_language != st.session_state.get('app_language'):
             st.session_state['app_language'] = selected_language
-            settings = load_app_settings()
-            settings['language'] = selected_language
-            save_app_settings(settings)
+            get_settings_store().update(language=selected_language)
             st.rerun()
         
         st.markdown("---")
@@ -311,52 +197,57 @@ def render_dashboard():
     </div>
     """, unsafe_allow_html=True)
     
-    # Dashboard metrics
+    # Dashboard metrics from each student's latest assessment
+    summary = get_dashboard_summary()
+    total_students = summary['total_students']
+    risk_counts = summary['risk_counts']
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         <div class="metric-card">
             <h3>📊 Total Students</h3>
-            <h2>156</h2>
-            <p>This Month</p>
+            <h2>{total_students}</h2>
+            <p>Assessed</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col2:
-        st.markdown("""
+        st.markdown(f"""
         <div class="metric-card">
             <h3>✅ On Track</h3>
-            <h2>89</h2>
-            <p>57% Students</p>
+            <h2>{risk_counts['Low Risk']}</h2>
+            <p>{percentage(risk_counts['Low Risk'], total_students)}% Students</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col3:
-        st.markdown("""
+        st.markdown(f"""
         <div class="metric-card">
             <h3>⚠️ At Risk</h3>
-            <h2>42</h2>
-            <p>27% Students</p>
+            <h2>{risk_counts['Medium Risk']}</h2>
+            <p>{percentage(risk_counts['Medium Risk'], total_students)}% Students</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col4:
-        st.markdown("""
+        st.markdown(f"""
         <div class="metric-card">
             <h3>🚨 Intervention</h3>
-            <h2>25</h2>
-            <p>16% Students</p>
+            <h2>{risk_counts['High Risk']}</h2>
+            <p>{percentage(risk_counts['High Risk'], total_students)}% Students</p>
         </div>
         """, unsafe_allow_html=True)
     
     # Performance chart
     st.subheader("📈 Performance Overview")
     
-    subjects = ['Math', 'Reading', 'Writing', 'Science', 'Social Studies']
-    on_track = [75, 82, 68, 73, 79]
-    at_risk = [15, 12, 22, 18, 14]
-    intervention = [10, 6, 10, 9, 7]
+    subject_counts = summary['subject_counts']
+    subjects = list(subject_counts)
+    on_track = [subject_counts[subject]['On Track'] for subject in subjects]
+    at_risk = [subject_counts[subject]['At Risk'] for subject in subjects]
+    intervention = [subject_counts[subject]['Intervention'] for subject in subjects]
     
     fig = go.Figure()
     fig.add_trace(go.Bar(name='On Track', x=subjects, y=on_track, marker_color='#10b981'))
@@ -372,6 +263,21 @@ def render_dashboard():
     )
     
     st.plotly_chart(fig, use_container_width=True)
+    
+    # Highest-risk students by their latest assessment
+    st.subheader("🚩 Students Needing Attention")
+    attention = get_students_needing_attention(limit=5, risk_levels=['High Risk', 'Medium Risk'])
+    if attention:
+        st.dataframe(pd.DataFrame([{
+            'Student': student['student_name'],
+            'Grade': student['grade_level'],
+            'Risk Level': student['risk_level'],
+            'Probability': f"{student['probability']:.1%}",
+            'Weakest Subject': student['weakest_subject'] or '-',
+            'Assessed': (student['timestamp'] or '')[:10]
+        } for student in attention]), use_container_width=True, hide_index=True)
+    else:
+        st.info("No students are currently at medium or high risk.")
 
 def render_prediction_page():
     """Render student assessment page"""
@@ -485,45 +391,29 @@ def render_prediction_page():
                             st.write("- Daily progress monitoring")
                             st.write("- Consider specialist evaluation")
                         
-                        # Save prediction data
+                        # Save prediction data as a flat record, like the Prediction page
                         prediction_data = {
+                            'timestamp': datetime.now().isoformat(),
                             'student_name': student_name,
-                            'teacher_name': teacher_name,
                             'grade_level': grade_level,
-                            'assessment_date': assessment_date.isoformat(),
-                            'scores': {
-                                'math': math_score,
-                                'reading': reading_score, 
-                                'writing': writing_score,
-                                'attendance': attendance
-                            },
-                            'behavioral': {
-                                'attention_span': attention_span,
-                                'class_participation': class_participation,
-                                'homework_completion': homework_completion
-                            },
-                            'teacher_notes': teacher_notes,
                             'prediction': int(prediction[0]),
-                            'probabilities': probabilities[0].tolist(),
-                            'risk_level': current_risk
+                            'probability': float(confidence),
+                            'risk_level': current_risk,
+                            'notes': teacher_notes,
+                            'math_score': math_score,
+                            'reading_score': reading_score,
+                            'writing_score': writing_score,
+                            'attendance': attendance,
+                            'teacher_name': teacher_name,
+                            'assessment_date': assessment_date.isoformat(),
+                            'attention_span': attention_span,
+                            'class_participation': class_participation,
+                            'homework_completion': homework_completion
                         }
                         
-                        # Simple data storage
-                        try:
-                            os.makedirs("data", exist_ok=True)
-                            predictions_file = "data/student_data.json"
-                            predictions = []
-                            
-                            if os.path.exists(predictions_file):
-                                with open(predictions_file, 'r') as f:
-                                    predictions = json.load(f)
-                            
-                            predictions.append(prediction_data)
-                            
-                            with open(predictions_file, 'w') as f:
-                                json.dump(predictions, f, indent=2)
-                        except Exception as e:
-                            st.error(f"Error saving prediction: {e}")
+                        # Database when available, the shared file store otherwise
+                        if not save_prediction_data(prediction_data):
+                            st.error("Error saving prediction")
                         
                 else:
                     st.error("Model not available. Please check model files.")
@@ -654,51 +544,34 @@ def render_tracker_page():
         if submitted and child_name:
             observation_data = {
                 'child_name': child_name,
-                'observation_date': observation_date.isoformat(),
+                'date': observation_date.isoformat(),
                 'homework_time': homework_time,
                 'reading_time': reading_time,
                 'difficulty_level': difficulty_level,
                 'focus_rating': focus_rating,
                 'motivation_rating': motivation_rating,
                 'independence_rating': independence_rating,
-                'parent_notes': parent_notes
+                'parent_notes': parent_notes,
+                'timestamp': datetime.now().isoformat()
             }
             
-            # Simple data storage
-            try:
-                os.makedirs("data", exist_ok=True)
-                observations_file = "data/parent_observations.json"
-                observations = []
-                
-                if os.path.exists(observations_file):
-                    with open(observations_file, 'r') as f:
-                        observations = json.load(f)
-                
-                observations.append(observation_data)
-                
-                with open(observations_file, 'w') as f:
-                    json.dump(observations, f, indent=2)
-                
+            # Database when available, the shared file store otherwise
+            if save_parent_observation(observation_data):
                 st.success("Observation saved successfully!")
-            except Exception as e:
-                st.error(f"Error saving observation: {e}")
+            else:
+                st.error("Error saving observation")
     
     # Display recent observations
     st.markdown("---")
     st.subheader("📊 Recent Observations")
     
     try:
-        observations_file = "data/parent_observations.json"
-        if os.path.exists(observations_file):
-            with open(observations_file, 'r') as f:
-                observations = json.load(f)
-            
-            if observations:
-                df = pd.DataFrame(observations)
-                st.dataframe(df[['child_name', 'observation_date', 'focus_rating', 'motivation_rating']], 
-                           use_container_width=True)
-            else:
-                st.info("No observations recorded yet.")
+        observations = load_parent_observations()
+        
+        if observations:
+            df = pd.DataFrame(observations)
+            columns = [col for col in ['child_name', 'date', 'reading_time', 'focus_rating', 'motivation_rating'] if col in df.columns]
+            st.dataframe(df[columns], use_container_width=True)
         else:
             st.info("No observations recorded yet.")
     except Exception as e:
@@ -806,6 +679,11 @@ def render_content_page():
 
 def main():
     """Main application function"""
+    # Compact closed months into the Parquet archive in the background (once per process)
+    schedule_archiving()
+    # Apply the data retention policies in the background, if any are configured
+    schedule_retention()
+    
     # Render sidebar navigation
     render_sidebar()
     
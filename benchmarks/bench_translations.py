@@ -0,0 +1,60 @@
+"""
+Benchmark for utils.language_utils lookups
+
+Measures the per-call cost of get_text/get_texts against synthetic catalogs of
+growing size, next to the cost of building the tables on every call (what
+get_text used to do). The compiled lookups should stay flat as catalogs grow.
+
+Run from the repository root:
+    python benchmarks/bench_translations.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import language_utils
+
+CATALOG_SIZES = [150, 1000, 10000, 100000]
+LANGUAGES = ['English', 'Somali', 'Arabic']
+LOOKUPS = 20000
+
+
+def synthetic_translations(size):
+    return {
+        language: {f"key_{i}": f"{language} text {i}" for i in range(size)}
+        for language in LANGUAGES
+    }
+
+
+def time_per_call(func, number):
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    return best / number * 1e9
+
+
+def main():
+    print(f"{'keys':>8} {'get_text ns':>12} {'get_texts(20) ns':>17} {'rebuild per call ns':>20}")
+    for size in CATALOG_SIZES:
+        domain = f"bench_{size}"
+        builtin = synthetic_translations(size)
+        language_utils.TRANSLATION_DOMAINS[domain] = builtin
+        language_utils.get_translations(domain)
+
+        key = f"key_{size // 2}"
+        keys = [f"key_{i}" for i in range(0, size, max(1, size // 20))][:20]
+
+        lookup = time_per_call(lambda: language_utils.get_text(key, 'Somali', domain=domain), LOOKUPS)
+        bulk = time_per_call(lambda: language_utils.get_texts(keys, 'Somali', domain=domain), LOOKUPS // 10)
+        rebuild_runs = max(1, LOOKUPS // size)
+        rebuild = time_per_call(
+            lambda: {language: dict(texts) for language, texts in builtin.items()}['Somali'].get(key, key),
+            rebuild_runs)
+
+        print(f"{size:>8} {lookup:>12.0f} {bulk:>17.0f} {rebuild:>20.0f}")
+        del language_utils.TRANSLATION_DOMAINS[domain]
+
+
+if __name__ == "__main__":
+    main()
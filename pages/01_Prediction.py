@@ -3,17 +3,28 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import json
 import os
 import sys
-from utils.model_utils import load_model, make_prediction
-from utils.data_utils import save_prediction_data, load_student_data
+import tempfile
+from utils.model_utils import (
+    load_model, make_prediction, predict_batch, predict_csv_in_chunks,
+    format_batch_results, build_prediction_records
+)
+from utils.data_utils import save_prediction_data, save_prediction_batch
+from utils.export import EXPORT_FORMAT_LABELS, available_formats, export_data, remove_export
+from utils.analytics import (
+    get_student_names, get_student_history, get_daily_risk_counts, get_correlation_matrix, get_probability_summary
+)
 from utils.image_utils import get_image_html, create_image_gallery, get_student_images
 from utils.educational_images import get_diverse_educational_images
 from utils.image_base64 import get_base64_images, get_image_html as get_b64_image_html
 from utils.language_utils import get_text, load_app_settings
 
+# Uploads larger than this default to chunked streaming mode
+STREAMING_THRESHOLD_BYTES = 20 * 1024 * 1024
+
 # Initialize language in session state
 if 'app_language' not in st.session_state:
     settings = load_app_settings()
@@ -663,8 +674,21 @@ def main():
     elif prediction_type == "Batch Upload":
         if uploaded_file is not None:
             try:
-                df = pd.read_csv(uploaded_file)
-                st.success(f" Uploaded file with {len(df)} students")
+                # Large district exports are scored in chunks straight from the upload
+                streaming_mode = st.checkbox(
+                    "Streaming mode for large files",
+                    value=uploaded_file.size > STREAMING_THRESHOLD_BYTES,
+                    help="Reads and scores the CSV in chunks and writes results to a file, so memory use stays flat"
+                )
+                
+                upload_key = (uploaded_file.name, uploaded_file.size)
+                if streaming_mode:
+                    df = pd.read_csv(uploaded_file, nrows=5)
+                    uploaded_file.seek(0)
+                    st.success(f" Uploaded file of {uploaded_file.size / (1024 * 1024):.1f} MB")
+                else:
+                    df = pd.read_csv(uploaded_file)
+                    st.success(f" Uploaded file with {len(df)} students")
                 
                 # Validate required columns
                 required_columns = ['math_score', 'reading_score', 'writing_score', 'attendance', 'behavior', 'literacy']
@@ -672,41 +696,124 @@ def main():
                 
                 if missing_columns:
                     st.error(f" Missing required columns: {', '.join(missing_columns)}")
+                elif streaming_mode:
+                    # Show preview
+                    st.markdown("### Data Preview")
+                    st.dataframe(df)
+                    
+                    save_streamed = st.checkbox(
+                        "Save predictions to student records",
+                        value=False,
+                        help="Each scored chunk is saved in one transaction as it is processed"
+                    )
+                    
+                    if st.button("Process Batch Predictions"):
+                        progress_bar = st.progress(0.0)
+                        status = st.empty()
+                        saved_counts = {'saved': 0, 'failed': 0, 'unnamed': 0}
+                        batch_timestamp = datetime.now().isoformat()
+                        
+                        def save_chunk(chunk, scores):
+                            records = build_prediction_records(chunk, scores, timestamp=batch_timestamp)
+                            saved_counts['unnamed'] += int(scores['error'].isna().sum()) - len(records)
+                            if not records:
+                                return
+                            if save_prediction_batch(records):
+                                saved_counts['saved'] += len(records)
+                            else:
+                                saved_counts['failed'] += len(records)
+                        
+                        def report_progress(fraction, rows_processed):
+                            if fraction is not None:
+                                progress_bar.progress(fraction)
+                            status.text(f"Scored {rows_processed:,} students...")
+                        
+                        output_file = tempfile.NamedTemporaryFile(
+                            prefix="learning_risk_predictions_", suffix=".csv", delete=False
+                        )
+                        output_file.close()
+                        summary = predict_csv_in_chunks(
+                            uploaded_file,
+                            output_file.name,
+                            total_bytes=uploaded_file.size,
+                            progress_callback=report_progress,
+                            chunk_callback=save_chunk if save_streamed else None
+                        )
+                        if save_streamed:
+                            st.success(f" Saved {saved_counts['saved']:,} predictions")
+                            if saved_counts['failed']:
+                                st.error(f" Could not save {saved_counts['failed']:,} predictions")
+                            if saved_counts['unnamed']:
+                                st.warning(f" Skipped {saved_counts['unnamed']:,} rows without a student_name")
+                        
+                        # Replace any previous result file from this session
+                        previous_results = st.session_state.get('batch_results')
+                        if previous_results and os.path.exists(previous_results['file']):
+                            os.remove(previous_results['file'])
+                        st.session_state['batch_results'] = {
+                            'key': upload_key, 'file': output_file.name, 'summary': summary
+                        }
+                    
+                    # Only show results produced from the current upload
+                    batch_results = st.session_state.get('batch_results')
+                    if batch_results and batch_results['key'] == upload_key and os.path.exists(batch_results['file']):
+                        summary = batch_results['summary']
+                        results_file = batch_results['file']
+                        for row_number, error in summary['errors']:
+                            st.error(f"Error processing student {row_number}: {error}")
+                        if summary['failed_rows'] > len(summary['errors']):
+                            st.error(f"...and {summary['failed_rows'] - len(summary['errors'])} more rows could not be processed")
+                        
+                        st.markdown("### Batch Prediction Results")
+                        col1, col2, col3 = st.columns(3)
+                        col1.metric("Students in file", f"{summary['total_rows']:,}")
+                        col2.metric("Scored", f"{summary['scored_rows']:,}")
+                        col3.metric("Failed validation", f"{summary['failed_rows']:,}")
+                        
+                        # A header-only upload or one where every row failed leaves no results to preview
+                        if summary['scored_rows']:
+                            st.markdown("First 100 results:")
+                            st.dataframe(pd.read_csv(results_file, nrows=100))
+                        
+                        # Summary statistics
+                        if summary['risk_counts']:
+                            fig_pie = px.pie(values=list(summary['risk_counts'].values()),
+                                            names=list(summary['risk_counts'].keys()),
+                                            title="Risk Level Distribution")
+                            st.plotly_chart(fig_pie, use_container_width=True)
+                        
+                        # Download results straight from the result file
+                        with open(results_file, 'rb') as f:
+                            st.download_button(
+                                label="📥 Download Results",
+                                data=f,
+                                file_name=f"learning_risk_predictions_{datetime.now().strftime('%Y%m%d')}.csv",
+                                mime="text/csv"
+                            )
                 else:
                     # Show preview
                     st.markdown("### Data Preview")
                     st.dataframe(df.head())
                     
                     if st.button("Process Batch Predictions"):
-                        progress_bar = st.progress(0)
-                        results = []
+                        with st.spinner(f"Scoring {len(df)} students..."):
+                            st.session_state['batch_scores'] = {'key': upload_key, 'scores': predict_batch(df)}
+                    
+                    # Keep results across reruns so they can be saved afterwards
+                    batch_scores = st.session_state.get('batch_scores')
+                    if batch_scores and batch_scores['key'] == upload_key:
+                        scores = batch_scores['scores']
+                        
+                        # Report rows that failed validation instead of scoring them
+                        failed = scores[scores['error'].notna()]
+                        for idx, error in failed['error'].head(10).items():
+                            st.error(f"Error processing student {idx + 1}: {error}")
+                        if len(failed) > 10:
+                            st.error(f"...and {len(failed) - 10} more rows could not be processed")
                         
-                        for idx, row in df.iterrows():
-                            try:
-                                student_data = {col: row[col] for col in required_columns}
-                                prediction, prediction_prob = make_prediction(student_data)
-                                
-                                if prediction_prob < 0.3:
-                                    risk_level = "Low Risk"
-                                elif prediction_prob < 0.7:
-                                    risk_level = "Medium Risk"
-                                else:
-                                    risk_level = "High Risk"
-                                
-                                results.append({
-                                    'Student_ID': idx + 1,
-                                    'Risk_Level': risk_level,
-                                    'Risk_Probability': f"{prediction_prob:.1%}",
-                                    **student_data
-                                })
-                                
-                                progress_bar.progress((idx + 1) / len(df))
-                            
-                            except Exception as e:
-                                st.error(f"Error processing student {idx + 1}: {str(e)}")
+                        results_df = format_batch_results(df, scores)
                         
                         # Display results
-                        results_df = pd.DataFrame(results)
                         st.markdown("### Batch Prediction Results")
                         st.dataframe(results_df)
                         
@@ -724,6 +831,19 @@ def main():
                             file_name=f"learning_risk_predictions_{datetime.now().strftime('%Y%m%d')}.csv",
                             mime="text/csv"
                         )
+                        
+                        # Persist the whole batch in one transaction
+                        if st.button("💾 Save All Predictions"):
+                            records = build_prediction_records(df, scores)
+                            unnamed = len(scores) - len(failed) - len(records)
+                            if not records:
+                                st.error(" No rows have a student_name, so nothing was saved")
+                            elif save_prediction_batch(records):
+                                st.success(f" Saved {len(records)} predictions")
+                            else:
+                                st.error(" Could not save the batch predictions")
+                            if records and unnamed:
+                                st.warning(f" Skipped {unnamed} rows without a student_name")
             
             except Exception as e:
                 st.error(f" Error reading file: {str(e)}")
@@ -732,13 +852,20 @@ def main():
     
     else:  # Historical Analysis
         st.markdown("###  Historical Analysis")
-        historical_data = load_student_data()
         
-        if historical_data:
-            df_historical = pd.DataFrame(historical_data)
-            
-            # Convert timestamp to datetime
-            df_historical['timestamp'] = pd.to_datetime(df_historical['timestamp'])
+        # Only load the requested window instead of every stored prediction
+        col_start, col_end = st.columns(2)
+        with col_start:
+            history_start = st.date_input("From:", value=date.today() - timedelta(days=365), key="history_start")
+        with col_end:
+            history_end = st.date_input("To:", value=date.today(), key="history_end")
+        
+        # Count and mean come from the per-day statistics, not from the records
+        period_summary = get_probability_summary(history_start, history_end)
+        
+        if period_summary['count']:
+            st.caption(f"{period_summary['count']:,} assessments in this period, "
+                       f"average risk probability {period_summary['mean_probability']:.0%}")
             
             # Analysis options
             analysis_type = st.selectbox(
@@ -747,34 +874,95 @@ def main():
             )
             
             if analysis_type == "Risk Trends Over Time":
-                # Group by date and risk level
-                daily_risks = df_historical.groupby([df_historical['timestamp'].dt.date, 'risk_level']).size().unstack(fill_value=0)
-                
-                fig_trend = px.line(daily_risks, title="Risk Level Trends Over Time")
-                st.plotly_chart(fig_trend, use_container_width=True)
+                # Read the pre-aggregated daily counts for the window instead of grouping raw predictions
+                daily_rows = get_daily_risk_counts(history_start, history_end)
+                if daily_rows:
+                    daily_risks = pd.DataFrame(daily_rows).pivot_table(
+                        index='day', columns='risk_level', values='count', aggfunc='sum', fill_value=0)
+                    daily_risks.index = pd.to_datetime(daily_risks.index)
+                    
+                    fig_trend = px.line(daily_risks, title="Risk Level Trends Over Time")
+                    st.plotly_chart(fig_trend, use_container_width=True)
+                else:
+                    st.info("No assessments in the selected period")
             
             elif analysis_type == "Performance Correlation":
-                # Correlation matrix
-                numeric_cols = ['math_score', 'reading_score', 'writing_score', 'attendance', 'behavior', 'literacy', 'probability']
-                if all(col in df_historical.columns for col in numeric_cols):
-                    corr_matrix = df_historical[numeric_cols].corr()
+                # Correlation matrix from the streaming sufficient statistics
+                all_history = st.checkbox("Use all history", value=False, key="correlation_all_history")
+                if all_history:
+                    correlation = get_correlation_matrix()
+                else:
+                    correlation = get_correlation_matrix(history_start, history_end)
+                
+                if correlation:
+                    corr_matrix = pd.DataFrame(correlation['matrix'], index=correlation['columns'],
+                                               columns=correlation['columns'], dtype=float)
                     fig_heatmap = px.imshow(corr_matrix, text_auto=True, title="Performance Correlation Matrix")
                     st.plotly_chart(fig_heatmap, use_container_width=True)
+                    st.caption(f"Based on {correlation['count']} assessments")
+                else:
+                    st.info("Not enough data for a correlation matrix")
             
             elif analysis_type == "Student Progress Tracking":
-                if 'student_name' in df_historical.columns:
-                    student_names = df_historical['student_name'].dropna().unique()
+                # Names and per-student histories come from maintained indexes, not the loaded frame
+                student_names = get_student_names()
+                if student_names:
                     selected_student = st.selectbox("Select student:", student_names)
                     
                     if selected_student:
-                        student_progress = df_historical[df_historical['student_name'] == selected_student].sort_values('timestamp')
+                        # Empty when the name outlived its rows, e.g. after retention
+                        history = get_student_history(selected_student)
                         
-                        if len(student_progress) > 1:
+                        if history and len(history) > 1:
+                            student_progress = pd.DataFrame(history)
+                            student_progress['timestamp'] = pd.to_datetime(student_progress['timestamp'])
                             fig_progress = px.line(student_progress, x='timestamp', y='probability', 
                                                  title=f"Risk Probability Trend for {selected_student}")
                             st.plotly_chart(fig_progress, use_container_width=True)
                         else:
                             st.info("Not enough data points for trend analysis")
+            
+            # Export the window's predictions, streamed to a file in chunks
+            with st.expander("📥 Export Predictions"):
+                col_student, col_risk, col_format = st.columns(3)
+                with col_student:
+                    export_student = st.selectbox("Student:", ["All students"] + (get_student_names() or []),
+                                                  key="export_student")
+                with col_risk:
+                    export_risk = st.selectbox("Risk level:", ["All levels", "Low Risk", "Medium Risk", "High Risk"],
+                                               key="export_risk")
+                with col_format:
+                    export_format = st.selectbox("Format:", available_formats(), format_func=EXPORT_FORMAT_LABELS.get,
+                                                 key="export_format")
+                
+                # An export belongs to the filters it was made with; changing any of them drops it
+                export_key = (history_start, history_end, export_student, export_risk, export_format)
+                stored = st.session_state.get('prediction_export')
+                if stored and stored['key'] != export_key:
+                    remove_export(stored['export'])
+                    stored = st.session_state['prediction_export'] = None
+                if st.button("Export", key="export_predictions"):
+                    if stored:
+                        remove_export(stored['export'])
+                    export = export_data(
+                        'predictions', export_format,
+                        student_name=None if export_student == "All students" else export_student,
+                        start_date=history_start, end_date=history_end,
+                        risk_level=None if export_risk == "All levels" else export_risk
+                    )
+                    stored = st.session_state['prediction_export'] = {'key': export_key, 'export': export}
+                    if export is None:
+                        st.error("Could not export the predictions")
+                
+                export = stored['export'] if stored else None
+                if export and os.path.exists(export['path']):
+                    with open(export['path'], 'rb') as f:
+                        st.download_button(
+                            label=f"Download {export['rows']:,} predictions",
+                            data=f,
+                            file_name=export['file_name'],
+                            mime=export['mime']
+                        )
         else:
             st.info("No historical data available. Make some predictions first!")
 
@@ -5,7 +5,12 @@ import plotly.express as px
 from datetime import datetime, date, timedelta
 import json
 import os
-from utils.data_utils import save_parent_observation, load_parent_observations
+from utils.data_utils import save_parent_observation
+from utils.analytics import (
+    get_child_observations, build_observation_frame, get_observation_page, get_observation_details, observation_key
+)
+from utils.observation_rollups import get_child_rollups
+from utils.export import EXPORT_FORMAT_LABELS, available_formats, export_data, remove_export
 from utils.image_utils import get_image_html, create_image_gallery, get_student_images
 from utils.educational_images import get_diverse_educational_images
 from utils.image_base64 import get_base64_images, get_image_html as get_b64_image_html
@@ -166,15 +171,11 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def create_progress_chart(data, metric):
-    """Create progress chart for specific metric"""
-    df = pd.DataFrame(data)
+def create_progress_chart(df, metric):
+    """Create progress chart for specific metric from an observation frame"""
     if df.empty:
         return None
     
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date')
-    
     fig = px.line(df, x='date', y=metric, 
                   title=f"{metric.replace('_', ' ').title()} Progress Over Time",
                   markers=True)
@@ -187,17 +188,10 @@ def create_progress_chart(data, metric):
     
     return fig
 
-def create_weekly_summary(data):
-    """Create weekly summary visualization"""
-    if not data:
-        return None, None
-    
-    df = pd.DataFrame(data)
-    df['date'] = pd.to_datetime(df['date'])
-    df['week'] = df['date'].dt.to_period('W')
-    
-    # Calculate weekly averages
-    weekly_avg = df.groupby('week')[['homework_completion', 'behavior_rating', 'sleep_hours', 'mood_rating']].mean()
+def create_weekly_summary(weekly_avg):
+    """Create weekly summary visualization from the weekly means of a rollup"""
+    if weekly_avg.empty:
+        return None
     
     # Create summary chart
     fig = go.Figure()
@@ -207,7 +201,7 @@ def create_weekly_summary(data):
     
     for i, metric in enumerate(metrics):
         fig.add_trace(go.Scatter(
-            x=weekly_avg.index.astype(str),
+            x=weekly_avg.index.strftime('%Y-%m-%d'),
             y=weekly_avg[metric],
             mode='lines+markers',
             name=metric.replace('_', ' ').title(),
@@ -216,12 +210,12 @@ def create_weekly_summary(data):
     
     fig.update_layout(
         title="Weekly Progress Summary",
-        xaxis_title="Week",
+        xaxis_title="Week ending",
         yaxis_title="Score",
         height=400
     )
     
-    return fig, weekly_avg
+    return fig
 
 def main():
     # Page header
@@ -462,16 +456,16 @@ def main():
         st.markdown("## Growth Progress Tracking")
         st.markdown(f"Analyzing progress for **{child_name}** from {start_date} to {end_date}")
         
-        # Load observations for the child
-        all_observations = load_parent_observations()
-        child_observations = [obs for obs in all_observations 
-                            if obs.get('child_name') == child_name 
-                            and start_date <= date.fromisoformat(obs['date']) <= end_date]
+        # Load the child's observations once; every tab below reuses this slice
+        child_observations = get_child_observations(child_name, start_date, end_date)
         
         if not child_observations:
             st.warning("Chart No observations found for the selected date range. Start by adding daily observations!")
             return
         
+        # One typed frame backs every chart and metric in the tabs
+        df = build_observation_frame(child_observations)
+        
         # Create tabs for different metrics
         tab1, tab2, tab3, tab4 = st.tabs(["Academic", "Behavioral", "Emotional", "Health"])
         
@@ -482,25 +476,23 @@ def main():
             
             with col1:
                 # Homework completion chart
-                homework_fig = create_progress_chart(child_observations, 'homework_completion')
+                homework_fig = create_progress_chart(df, 'homework_completion')
                 if homework_fig:
                     st.plotly_chart(homework_fig, use_container_width=True)
             
             with col2:
                 # Reading time chart
-                reading_fig = create_progress_chart(child_observations, 'reading_time')
+                reading_fig = create_progress_chart(df, 'reading_time')
                 if reading_fig:
                     st.plotly_chart(reading_fig, use_container_width=True)
             
             # Subject struggles analysis
             st.markdown("#### Chart Subject Difficulty Analysis")
             
-            all_subjects = []
-            for obs in child_observations:
-                all_subjects.extend(obs.get('subjects_struggled', []))
+            all_subjects = df['subjects_struggled'].explode().dropna()
             
-            if all_subjects:
-                subject_counts = pd.Series(all_subjects).value_counts()
+            if not all_subjects.empty:
+                subject_counts = all_subjects.value_counts()
                 fig_subjects = px.bar(x=subject_counts.index, y=subject_counts.values,
                                     title="Subjects with Most Difficulties",
                                     labels={'x': 'Subject', 'y': 'Number of Days'})
@@ -511,12 +503,11 @@ def main():
         with tab2:
             st.markdown("### Behavioral Progress")
             
-            behavior_fig = create_progress_chart(child_observations, 'behavior_rating')
+            behavior_fig = create_progress_chart(df, 'behavior_rating')
             if behavior_fig:
                 st.plotly_chart(behavior_fig, use_container_width=True)
             
             # Behavior statistics
-            df = pd.DataFrame(child_observations)
             if not df.empty:
                 col1, col2, col3 = st.columns(3)
                 
@@ -535,15 +526,14 @@ def main():
         with tab3:
             st.markdown("### Emotional Well-being")
             
-            mood_fig = create_progress_chart(child_observations, 'mood_rating')
+            mood_fig = create_progress_chart(df, 'mood_rating')
             if mood_fig:
                 st.plotly_chart(mood_fig, use_container_width=True)
             
             # Mood analysis
-            df = pd.DataFrame(child_observations)
             if not df.empty:
                 mood_dist = df['mood_rating'].value_counts().sort_index()
-                fig_mood_dist = px.pie(values=mood_dist.values, names=[f"Mood {i}" for i in mood_dist.index],
+                fig_mood_dist = px.pie(values=mood_dist.values, names=[f"Mood {i:g}" for i in mood_dist.index],
                                      title="Mood Distribution")
                 st.plotly_chart(fig_mood_dist, use_container_width=True)
         
@@ -553,17 +543,16 @@ def main():
             col1, col2 = st.columns(2)
             
             with col1:
-                sleep_fig = create_progress_chart(child_observations, 'sleep_hours')
+                sleep_fig = create_progress_chart(df, 'sleep_hours')
                 if sleep_fig:
                     st.plotly_chart(sleep_fig, use_container_width=True)
             
             with col2:
-                activity_fig = create_progress_chart(child_observations, 'physical_activity')
+                activity_fig = create_progress_chart(df, 'physical_activity')
                 if activity_fig:
                     st.plotly_chart(activity_fig, use_container_width=True)
             
             # Health summary
-            df = pd.DataFrame(child_observations)
             if not df.empty:
                 st.markdown("#### Chart Health Summary")
                 
@@ -589,18 +578,24 @@ def main():
         st.markdown("## Weekly Summary")
         st.markdown(f"Weekly analysis for **{child_name}**")
         
-        # Load observations
-        all_observations = load_parent_observations()
-        child_observations = [obs for obs in all_observations 
-                            if obs.get('child_name') == child_name 
-                            and start_date <= date.fromisoformat(obs['date']) <= end_date]
+        # Rollups cover the child's whole history and are cached until a new observation arrives
+        rollups = get_child_rollups(child_name)
         
-        if not child_observations:
+        weeks = rollups['week'] if rollups else None
+        if weeks is not None:
+            # Weeks (labelled by their Sunday) overlapping the selected range that have observations
+            in_range = ((weeks.index >= pd.Timestamp(start_date))
+                        & (weeks.index - pd.Timedelta(days=6) <= pd.Timestamp(end_date))
+                        & (weeks['count'].sum(axis=1) > 0))
+            weeks = weeks[in_range]
+        
+        if weeks is None or weeks.empty:
             st.warning("Chart No observations found for the selected date range.")
             return
         
         # Create weekly summary chart
-        weekly_fig, weekly_data = create_weekly_summary(child_observations)
+        weekly_data = weeks['mean']
+        weekly_fig = create_weekly_summary(weekly_data)
         
         if weekly_fig:
             st.plotly_chart(weekly_fig, use_container_width=True)
@@ -608,8 +603,11 @@ def main():
             # Weekly insights
             st.markdown("### 💡 Weekly Insights")
             
-            if weekly_data is not None and not weekly_data.empty:
+            if not weekly_data.empty:
                 latest_week = weekly_data.iloc[-1]
+                missing_days = weeks['missing_days'].iloc[-1]
+                if missing_days:
+                    st.caption(f"{missing_days} day(s) without an observation in the latest week")
                 
                 col1, col2 = st.columns(2)
                 
@@ -646,88 +644,156 @@ def main():
                             st.success("Behavior rating improved!")
                         if mood_change > 0.2:
                             st.success("Mood has improved!")
+            
+            # Trend over the 28 days up to the end of the range
+            trend = rollups['rolling_28']
+            trend = trend[trend.index <= pd.Timestamp(end_date)]
+            if not trend.empty:
+                st.markdown("#### 4-Week Trend")
+                
+                latest = trend.iloc[-1]
+                trend_metrics = [('homework_completion', "Homework", "%"), ('behavior_rating', "Behavior", ""),
+                                 ('mood_rating', "Mood", ""), ('sleep_hours', "Sleep", " hrs")]
+                for column, (metric, label, unit) in zip(st.columns(len(trend_metrics)), trend_metrics):
+                    with column:
+                        mean = latest[('mean', metric)]
+                        slope = latest[('slope', metric)]
+                        st.metric(
+                            f"{label} (28-day avg)",
+                            f"{mean:.1f}{unit}" if pd.notna(mean) else "N/A",
+                            delta=f"{slope * 7:+.2f} per week" if pd.notna(slope) else None
+                        )
+                
+                st.caption(f"{trend['missing_days'].iloc[-1]} of the last 28 days have no observation")
 
     else:  # Observations Log
         st.markdown("## Observations Log")
         st.markdown(f"Complete observation history for **{child_name}**")
         
-        # Load all observations for the child
-        all_observations = load_parent_observations()
-        child_observations = [obs for obs in all_observations if obs.get('child_name') == child_name]
-        
-        if not child_observations:
-            st.warning("Note No observations recorded yet. Start by adding daily observations!")
-            return
-        
-        # Sort by date (newest first)
-        child_observations.sort(key=lambda x: x['date'], reverse=True)
-        
         # Filter options
         col1, col2 = st.columns(2)
         
         with col1:
-            date_filter = st.date_input("Filter by date (optional)")
+            filter_by_date = st.checkbox("Filter by date", value=False)
+            date_filter = st.date_input("Date", value=date.today(), disabled=not filter_by_date)
         
         with col2:
-            show_detailed = st.checkbox("Show detailed observations", value=False)
+            page_size = st.selectbox("Entries per page", [10, 20, 50], index=1)
+        
+        day = date_filter if filter_by_date else None
+        
+        # Page cursors per child and filter; changing either starts again at the newest entry
+        log_key = (child_name, day, page_size)
+        if st.session_state.get('observation_log_key') != log_key:
+            st.session_state['observation_log_key'] = log_key
+            st.session_state['observation_log_cursors'] = [None]
+        cursors = st.session_state['observation_log_cursors']
+        
+        # Only the visible page is loaded, with the date filter applied before paging
+        observations, next_cursor = get_observation_page(child_name, page_size, cursors[-1], day, day)
         
-        # Display observations
-        for obs in child_observations[:20]:  # Show last 20 observations
-            obs_date = date.fromisoformat(obs['date'])
+        if not observations:
+            if day is None:
+                st.warning("Note No observations recorded yet. Start by adding daily observations!")
+                return
+            st.info("No observations recorded on this date.")
+        
+        # Display observations (newest first)
+        for obs in observations:
+            key = observation_key(obs)
+            obs_date = date.fromisoformat(key[0])
+            
+            st.markdown(f"**{obs_date.strftime('%B %d, %Y')}** - Rating: {obs['behavior_rating']}/5 · "
+                        f"Homework: {obs['homework_completion']}% · Mood: {obs['mood_rating']}/5")
             
-            if date_filter and obs_date != date_filter:
+            # Details, including the free-text notes, are only fetched for entries opened here
+            if not st.checkbox("Show details", key=f"observation_details_{key[0]}_{key[1]}"):
                 continue
             
-            with st.expander(f"{obs_date.strftime('%B %d, %Y')} - Rating: {obs['behavior_rating']}/5"):
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.markdown("**Academic**")
-                    st.write(f"Homework: {obs['homework_completion']}%")
-                    st.write(f"Reading: {obs['reading_time']} min")
-                    st.write(f"Focus: {obs.get('focus_level', 'N/A')}")
-                    if obs.get('subjects_struggled'):
-                        st.write(f"Struggled with: {', '.join(obs['subjects_struggled'])}")
-                
-                with col2:
-                    st.markdown("**Behavioral**")
-                    st.write(f"Behavior: {obs['behavior_rating']}/5")
-                    st.write(f"Mood: {obs['mood_rating']}/5")
-                    st.write(f"Energy: {obs.get('energy_level', 'N/A')}")
-                
-                with col3:
-                    st.markdown("**Health**")
-                    st.write(f"Sleep: {obs['sleep_hours']} hrs")
-                    st.write(f"Activity: {obs['physical_activity']} min")
-                    st.write(f"Screen time: {obs['screen_time']} hrs")
-                
-                if show_detailed:
-                    if obs.get('learning_wins'):
-                        st.markdown("**Learning Wins:**")
-                        st.write(obs['learning_wins'])
-                    
-                    if obs.get('challenges_faced'):
-                        st.markdown("**Challenges:**")
-                        st.write(obs['challenges_faced'])
-                    
-                    if obs.get('strategies_used'):
-                        st.markdown("**🛠️ Helpful Strategies:**")
-                        st.write(obs['strategies_used'])
-                    
-                    if obs.get('social_interactions'):
-                        st.markdown("**Group Social Interactions:**")
-                        st.write(obs['social_interactions'])
+            details = get_observation_details(child_name, key) or obs
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.markdown("**Academic**")
+                st.write(f"Homework: {details['homework_completion']}%")
+                st.write(f"Reading: {details['reading_time']} min")
+                st.write(f"Focus: {details.get('focus_level', 'N/A')}")
+                if details.get('subjects_struggled'):
+                    st.write(f"Struggled with: {', '.join(details['subjects_struggled'])}")
+            
+            with col2:
+                st.markdown("**Behavioral**")
+                st.write(f"Behavior: {details['behavior_rating']}/5")
+                st.write(f"Mood: {details['mood_rating']}/5")
+                st.write(f"Energy: {details.get('energy_level', 'N/A')}")
+            
+            with col3:
+                st.markdown("**Health**")
+                st.write(f"Sleep: {details['sleep_hours']} hrs")
+                st.write(f"Activity: {details['physical_activity']} min")
+                st.write(f"Screen time: {details['screen_time']} hrs")
+            
+            if details.get('learning_wins'):
+                st.markdown("**Learning Wins:**")
+                st.write(details['learning_wins'])
+            
+            if details.get('challenges_faced'):
+                st.markdown("**Challenges:**")
+                st.write(details['challenges_faced'])
+            
+            if details.get('strategies_used'):
+                st.markdown("**🛠️ Helpful Strategies:**")
+                st.write(details['strategies_used'])
+            
+            if details.get('social_interactions'):
+                st.markdown("**Group Social Interactions:**")
+                st.write(details['social_interactions'])
+            
+            st.markdown("---")
+        
+        # Pagination
+        col_newer, col_page, col_older = st.columns([1, 2, 1])
         
-        # Export option
+        with col_newer:
+            if len(cursors) > 1 and st.button("← Newer"):
+                cursors.pop()
+                st.rerun()
+        
+        with col_page:
+            st.caption(f"Page {len(cursors)}")
+        
+        with col_older:
+            if next_cursor is not None and st.button("Older →"):
+                cursors.append(next_cursor)
+                st.rerun()
+        
+        # Export option: rows are streamed to a file with the log's filters
+        export_format = st.selectbox("Export format", available_formats(), format_func=EXPORT_FORMAT_LABELS.get,
+                                     key="observation_export_format")
+        
+        # An export belongs to the child, filter and format it was made for; changing any of them drops it
+        export_key = (child_name, day, export_format)
+        stored = st.session_state.get('observation_export')
+        if stored and stored['key'] != export_key:
+            remove_export(stored['export'])
+            stored = st.session_state['observation_export'] = None
         if st.button("📥 Export Observations"):
-            df_export = pd.DataFrame(child_observations)
-            csv = df_export.to_csv(index=False)
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name=f"{child_name}_observations_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
-            )
+            if stored:
+                remove_export(stored['export'])
+            export = export_data('observations', export_format, student_name=child_name, start_date=day, end_date=day)
+            stored = st.session_state['observation_export'] = {'key': export_key, 'export': export}
+            if export is None:
+                st.error("Could not export the observations")
+        
+        export = stored['export'] if stored else None
+        if export and os.path.exists(export['path']):
+            with open(export['path'], 'rb') as f:
+                st.download_button(
+                    label=f"Download {export['rows']:,} observations",
+                    data=f,
+                    file_name=export['file_name'],
+                    mime=export['mime']
+                )
 
     # Footer with tips
     st.markdown("---")
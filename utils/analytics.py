@@ -0,0 +1,916 @@
+"""
+Dashboard aggregation and indexes over the stored predictions and parent observations
+Counts are based on each student's most recent assessment. On the file backend they
+are maintained incrementally by reading only the records appended since the last
+refresh and snapshotted to sidecar files; on the database they are kept in tables
+updated as each prediction is saved.
+"""
+
+import os
+import math
+import heapq
+import bisect
+import threading
+from collections import Counter
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.data_utils import (
+    DATABASE_AVAILABLE, get_data_directory, get_prediction_store, get_observation_store, canonical_risk_level
+)
+from utils.storage import atomic_write_json, read_json_file
+
+if DATABASE_AVAILABLE:
+    from utils.db_utils import (
+        get_dashboard_aggregates, query_students_needing_attention,
+        list_student_names, query_student_predictions,
+        query_daily_risk_counts, rebuild_daily_rollups, query_correlation_moments,
+        query_parent_observations, query_observation_page, query_observation_details
+    )
+
+RISK_LEVELS = ['Low Risk', 'Medium Risk', 'High Risk']
+
+# Dashboard status shown for each risk level
+RISK_STATUS = {
+    'Low Risk': 'On Track',
+    'Medium Risk': 'At Risk',
+    'High Risk': 'Intervention'
+}
+
+# Subject chart: record field -> label
+SUBJECTS = {
+    'math_score': 'Math',
+    'reading_score': 'Reading',
+    'writing_score': 'Writing'
+}
+
+# Score bands per subject as (status, minimum score), highest first
+SUBJECT_BANDS = [
+    ('On Track', 70),
+    ('At Risk', 50),
+    ('Intervention', 0)
+]
+
+# Numeric prediction fields in the Performance Correlation matrix
+CORRELATION_COLUMNS = [
+    'math_score', 'reading_score', 'writing_score', 'attendance', 'behavior', 'literacy', 'probability'
+]
+
+# Column index pairs (i <= j) with stored statistics
+CORRELATION_PAIRS = [(i, j) for i in range(len(CORRELATION_COLUMNS)) for j in range(i, len(CORRELATION_COLUMNS))]
+
+# Prediction fields kept in the per-student timelines
+TIMELINE_FIELDS = [
+    'timestamp', 'grade_level', 'probability', 'math_score', 'reading_score',
+    'writing_score', 'attendance', 'behavior', 'literacy'
+]
+
+
+# Observation frame columns by dtype
+OBSERVATION_NUMERIC_FIELDS = [
+    'homework_completion', 'reading_time', 'behavior_rating', 'mood_rating',
+    'sleep_hours', 'screen_time', 'physical_activity'
+]
+OBSERVATION_CATEGORY_FIELDS = {
+    'focus_level': ['Very Poor', 'Poor', 'Fair', 'Good', 'Excellent'],
+    'energy_level': ['Very Low', 'Low', 'Normal', 'High', 'Very High']
+}
+OBSERVATION_TEXT_FIELDS = [
+    'social_interactions', 'learning_wins', 'challenges_faced', 'strategies_used', 'special_events'
+]
+
+
+def subject_band(score):
+    """Status band of a subject score, or None if it is missing"""
+    if not isinstance(score, (int, float)):
+        return None
+    for band, minimum in SUBJECT_BANDS:
+        if score >= minimum:
+            return band
+    return None
+
+
+class PersistentIndex:
+    """
+    Base for indexes that follow the prediction store and persist to a sidecar file
+
+    The index keeps its own read cursor and is snapshotted to a JSON file
+    together with that cursor, so a new process only reads the records
+    appended after the last snapshot. Subclasses implement ``reset``,
+    ``apply``, ``snapshot_data`` and ``restore``.
+    """
+
+    snapshot_version = 1
+
+    def __init__(self, sidecar_path, snapshot_every=200):
+        self.sidecar_path = sidecar_path
+        self.snapshot_every = snapshot_every
+        self.cursor = None
+        self._unsaved = 0
+        self.reset()
+        self._load_snapshot()
+
+    def refresh(self, store):
+        """Fold in the records appended since the last refresh, snapshotting when enough accumulated"""
+        records, self.cursor, reset = store.read_since(self.cursor)
+        if reset:
+            self.reset()
+        for record in records:
+            if isinstance(record, dict):
+                self.apply(record)
+                self._unsaved += 1
+        if reset or self._unsaved >= self.snapshot_every:
+            self.save_snapshot()
+
+    def rebuild(self, store):
+        """Discard the current state and snapshot and index the whole store again"""
+        self.cursor = None
+        self.refresh(store)
+
+    def save_snapshot(self):
+        try:
+            atomic_write_json(self.sidecar_path, {
+                'version': self.snapshot_version,
+                'cursor': self.cursor,
+                'data': self.snapshot_data()
+            }, indent=None)
+            self._unsaved = 0
+        except Exception as e:
+            print(f"Error saving index snapshot {self.sidecar_path}: {e}")
+
+    def _load_snapshot(self):
+        snapshot = read_json_file(self.sidecar_path, default=None)
+        if not isinstance(snapshot, dict) or snapshot.get('version') != self.snapshot_version:
+            return
+        try:
+            self.restore(snapshot.get('data') or {})
+        except (TypeError, ValueError, KeyError, AttributeError) as e:
+            print(f"Ignoring unusable index snapshot {self.sidecar_path}: {e}")
+            self.reset()
+            return
+        self.cursor = _tuples(snapshot.get('cursor'))
+
+
+class DashboardAggregator(PersistentIndex):
+    """
+    Running dashboard counts keyed on each student's latest prediction
+
+    ``apply`` is O(1) per record: when a newer prediction arrives for a
+    student, the contributions of their previous one are subtracted before
+    the new ones are added. Only the latest contributions are snapshotted;
+    the counts are summed again on restore.
+    """
+
+    def reset(self):
+        self._latest = {}
+        self.risk_counts = Counter()
+        self.grade_counts = {}
+        self.subject_counts = {subject: Counter() for subject in SUBJECTS}
+        self.total_assessments = 0
+
+    def _contributions(self, record):
+        risk_level = canonical_risk_level(record)
+        bands = {subject: subject_band(record.get(subject)) for subject in SUBJECTS}
+        return risk_level, record.get('grade_level'), bands
+
+    def _add(self, contributions, sign):
+        risk_level, grade, bands = contributions
+        if risk_level in RISK_STATUS:
+            self.risk_counts[risk_level] += sign
+            self.grade_counts.setdefault(grade, Counter())[risk_level] += sign
+        for subject, band in bands.items():
+            if band is not None:
+                self.subject_counts[subject][band] += sign
+
+    def apply(self, record):
+        """Fold one prediction record into the counts"""
+        student = record.get('student_name')
+        if not student:
+            return
+        self.total_assessments += 1
+
+        timestamp = record.get('timestamp') or ''
+        previous = self._latest.get(student)
+        if previous is not None and previous[0] > timestamp:
+            return
+        contributions = self._contributions(record)
+        if previous is not None:
+            self._add(previous[1], -1)
+        self._add(contributions, 1)
+        self._latest[student] = (timestamp, contributions)
+
+    def summary(self):
+        """Snapshot of the current counts"""
+        # Students whose latest prediction has a risk level, as on the database
+        return build_summary(
+            total_students=sum(self.risk_counts.values()),
+            risk_counts=self.risk_counts,
+            grade_counts=self.grade_counts,
+            subject_counts=self.subject_counts,
+            total_assessments=self.total_assessments
+        )
+
+    def snapshot_data(self):
+        return {'latest': self._latest, 'total_assessments': self.total_assessments}
+
+    def restore(self, data):
+        for student, (timestamp, (risk_level, grade, bands)) in data['latest'].items():
+            contributions = (risk_level, grade, bands)
+            self._add(contributions, 1)
+            self._latest[student] = (timestamp, contributions)
+        self.total_assessments = data['total_assessments']
+
+
+def build_summary(total_students, risk_counts, grade_counts, subject_counts, total_assessments=None):
+    """Dashboard summary dict shared by the file and database paths"""
+    return {
+        'total_students': total_students,
+        'total_assessments': total_assessments,
+        'risk_counts': {level: risk_counts.get(level, 0) for level in RISK_LEVELS},
+        'grade_counts': {
+            grade: {level: counts.get(level, 0) for level in RISK_LEVELS}
+            for grade, counts in grade_counts.items()
+            if any(counts.values())
+        },
+        'subject_counts': {
+            SUBJECTS[subject]: {band: counts.get(band, 0) for band, _ in SUBJECT_BANDS}
+            for subject, counts in subject_counts.items()
+        }
+    }
+
+
+class RiskIndex(PersistentIndex):
+    """
+    Each student's latest prediction, bucketed by risk level and ranked by probability
+
+    Every risk level keeps a max-heap of its students. Updates push a new
+    entry and leave the student's old one in place; stale entries are
+    skipped (and dropped) when they reach the top, so ``top`` costs
+    O(k log n) instead of a scan over all students. Risk levels are disjoint
+    probability bands, so the top of several levels is read band by band.
+    Snapshots hold the latest entries; the heaps are rebuilt on restore.
+    """
+
+    def reset(self):
+        self._latest = {}
+        self._heaps = {level: [] for level in RISK_LEVELS}
+        self.buckets = {level: set() for level in RISK_LEVELS}
+
+    def apply(self, record):
+        """Fold one prediction record into the index"""
+        student = record.get('student_name')
+        probability = record.get('probability')
+        if not student or not isinstance(probability, (int, float)):
+            return
+
+        timestamp = record.get('timestamp') or ''
+        previous = self._latest.get(student)
+        if previous is not None and previous['timestamp'] > timestamp:
+            return
+        if previous is not None:
+            self.buckets[previous['risk_level']].discard(student)
+
+        entry = attention_entry(record)
+        level = entry['risk_level']
+        self._latest[student] = entry
+        self.buckets[level].add(student)
+        heap = self._heaps[level]
+        heapq.heappush(heap, (-probability, timestamp, student))
+
+        # Drop stale entries once they outnumber the live ones
+        if len(heap) > 2 * len(self.buckets[level]) + 64:
+            heap[:] = [(-self._latest[name]['probability'], self._latest[name]['timestamp'], name)
+                       for name in self.buckets[level]]
+            heapq.heapify(heap)
+
+    def _is_current(self, item):
+        entry = self._latest.get(item[2])
+        return entry is not None and entry['probability'] == -item[0] and entry['timestamp'] == item[1]
+
+    def _top_of(self, level, k):
+        heap = self._heaps[level]
+        found = []
+        kept = []
+        seen = set()
+        while heap and len(found) < k:
+            item = heapq.heappop(heap)
+            if item[2] in seen or not self._is_current(item):
+                continue
+            seen.add(item[2])
+            kept.append(item)
+            found.append(self._latest[item[2]])
+        for item in kept:
+            heapq.heappush(heap, item)
+        return found
+
+    def top(self, k, risk_levels=None):
+        """Up to ``k`` students with the highest latest probability, optionally limited to some risk levels"""
+        found = []
+        for level in reversed(RISK_LEVELS):
+            if len(found) >= k:
+                break
+            if risk_levels is None or level in risk_levels:
+                found.extend(self._top_of(level, k - len(found)))
+        return found
+
+    def students_at(self, risk_level):
+        """Names of the students whose latest prediction is at ``risk_level``"""
+        return set(self.buckets[risk_level])
+
+    def snapshot_data(self):
+        return {'latest': self._latest}
+
+    def restore(self, data):
+        for student, entry in data['latest'].items():
+            self._latest[student] = entry
+            self.buckets[entry['risk_level']].add(student)
+            self._heaps[entry['risk_level']].append((-entry['probability'], entry['timestamp'], student))
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+
+
+def attention_entry(record):
+    """Fields shown for a student in the attention list"""
+    scores = {SUBJECTS[subject]: record.get(subject) for subject in SUBJECTS
+              if isinstance(record.get(subject), (int, float))}
+    weakest = min(scores, key=scores.get) if scores else None
+    return {
+        'student_name': record.get('student_name'),
+        'grade_level': record.get('grade_level'),
+        'probability': record.get('probability'),
+        'risk_level': canonical_risk_level(record),
+        'timestamp': record.get('timestamp') or '',
+        'weakest_subject': weakest if weakest and subject_band(scores[weakest]) != 'On Track' else None
+    }
+
+
+class StudentTimelineIndex(PersistentIndex):
+    """Every student's assessments in timestamp order, plus the sorted list of student names"""
+
+    def reset(self):
+        self._names = []
+        self._timestamps = {}
+        self._entries = {}
+
+    def apply(self, record):
+        """Insert one prediction record in its student's timeline"""
+        student = record.get('student_name')
+        if not student:
+            return
+        timestamp = record.get('timestamp') or ''
+        entry = {field: record.get(field) for field in TIMELINE_FIELDS}
+        entry['risk_level'] = canonical_risk_level(record)
+
+        timestamps = self._timestamps.get(student)
+        if timestamps is None:
+            bisect.insort(self._names, student)
+            timestamps = self._timestamps[student] = []
+            self._entries[student] = []
+        position = bisect.bisect_right(timestamps, timestamp)
+        timestamps.insert(position, timestamp)
+        self._entries[student].insert(position, entry)
+
+    def students(self):
+        """Distinct student names, sorted"""
+        return list(self._names)
+
+    def history(self, student):
+        """A student's assessments, oldest first"""
+        return list(self._entries.get(student, []))
+
+    def snapshot_data(self):
+        return {'timelines': self._entries}
+
+    def restore(self, data):
+        for student, entries in data['timelines'].items():
+            self._entries[student] = entries
+            self._timestamps[student] = [entry.get('timestamp') or '' for entry in entries]
+        self._names = sorted(self._entries)
+
+
+class DailyRiskRollup(PersistentIndex):
+    """
+    Number of assessments per day, risk level, grade and school
+
+    Days are kept sorted, so a trend over any window reads only the rollup
+    rows of the days inside it.
+    """
+
+    def reset(self):
+        self._days = []
+        self._counts = {}
+
+    def apply(self, record):
+        """Count one prediction record"""
+        day = record_day(record)
+        risk_level = canonical_risk_level(record)
+        if day is None or risk_level not in RISK_STATUS:
+            return
+        counts = self._counts.get(day)
+        if counts is None:
+            bisect.insort(self._days, day)
+            counts = self._counts[day] = Counter()
+        counts[(risk_level, record.get('grade_level') or '', record.get('school') or '')] += 1
+
+    def query(self, start_day=None, end_day=None, grade_level=None, school=None):
+        """``{'day', 'risk_level', 'count'}`` rows for the days in an inclusive 'YYYY-MM-DD' range"""
+        low = bisect.bisect_left(self._days, start_day) if start_day else 0
+        high = bisect.bisect_right(self._days, end_day) if end_day else len(self._days)
+        rows = []
+        for day in self._days[low:high]:
+            totals = Counter()
+            for (risk_level, grade, row_school), count in self._counts[day].items():
+                if (grade_level is None or grade == grade_level) and (school is None or row_school == school):
+                    totals[risk_level] += count
+            rows.extend({'day': day, 'risk_level': level, 'count': totals[level]}
+                        for level in RISK_LEVELS if totals[level])
+        return rows
+
+    def snapshot_data(self):
+        return {'rows': [[day, risk_level, grade, school, count]
+                         for day in self._days
+                         for (risk_level, grade, school), count in self._counts[day].items()]}
+
+    def restore(self, data):
+        for day, risk_level, grade, school, count in data['rows']:
+            self._counts.setdefault(day, Counter())[(risk_level, grade, school)] += count
+        self._days = sorted(self._counts)
+
+
+class CorrelationStats(PersistentIndex):
+    """
+    Streaming sufficient statistics for the correlation of CORRELATION_COLUMNS
+
+    For every pair of columns it keeps the number of records where both are
+    present and the sums of x, y, x², y² and xy, both per day and in total.
+    The all-time matrix is then O(1) to compute, and a window only sums the
+    day buckets inside it. Missing values are excluded pairwise, as in
+    DataFrame.corr(). The database keeps the same per-day statistics in its
+    correlation_moments table.
+    """
+
+    def reset(self):
+        self._days = []
+        self._buckets = {}
+        self._total = _empty_moments()
+
+    def apply(self, record):
+        """Add one prediction record's values"""
+        values = [record.get(column) for column in CORRELATION_COLUMNS]
+        values = [float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else None for v in values]
+        day = record_day(record)
+        bucket = None
+        if day is not None:
+            bucket = self._buckets.get(day)
+            if bucket is None:
+                bisect.insort(self._days, day)
+                bucket = self._buckets[day] = _empty_moments()
+
+        for pair, (i, j) in enumerate(CORRELATION_PAIRS):
+            x, y = values[i], values[j]
+            if x is None or y is None:
+                continue
+            moments = (1.0, x, y, x * x, y * y, x * y)
+            offset = pair * 6
+            for k, value in enumerate(moments):
+                self._total[offset + k] += value
+                if bucket is not None:
+                    bucket[offset + k] += value
+
+    def moments(self, start_day=None, end_day=None):
+        """Summed statistics over an inclusive 'YYYY-MM-DD' range (all time if both are None)"""
+        if start_day is None and end_day is None:
+            return list(self._total)
+        low = bisect.bisect_left(self._days, start_day) if start_day else 0
+        high = bisect.bisect_right(self._days, end_day) if end_day else len(self._days)
+        total = _empty_moments()
+        for day in self._days[low:high]:
+            for k, value in enumerate(self._buckets[day]):
+                total[k] += value
+        return total
+
+    def snapshot_data(self):
+        return {'columns': CORRELATION_COLUMNS, 'days': {day: self._buckets[day] for day in self._days},
+                'total': self._total}
+
+    def restore(self, data):
+        if data['columns'] != CORRELATION_COLUMNS:
+            raise ValueError("columns changed")
+        self._buckets = data['days']
+        self._days = sorted(self._buckets)
+        self._total = data['total']
+
+
+def _empty_moments():
+    return [0.0] * (6 * len(CORRELATION_PAIRS))
+
+
+def correlation_from_moments(moments):
+    """Pearson correlation matrix (list of rows, None where undefined) and the record count"""
+    size = len(CORRELATION_COLUMNS)
+    matrix = [[None] * size for _ in range(size)]
+    count = 0
+    for pair, (i, j) in enumerate(CORRELATION_PAIRS):
+        n, sx, sy, sxx, syy, sxy = moments[pair * 6:pair * 6 + 6]
+        count = max(count, int(n))
+        if n < 2:
+            continue
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        if var_x <= 1e-12 * max(sxx, 1.0) or var_y <= 1e-12 * max(syy, 1.0):
+            continue
+        r = (sxy - sx * sy / n) / math.sqrt(var_x * var_y)
+        matrix[i][j] = matrix[j][i] = max(-1.0, min(1.0, r))
+    return matrix, count
+
+
+class ObservationIndex:
+    """
+    Parent observations grouped by child and sorted by ``(date, timestamp)``
+
+    A date-range query is two bisections and a slice of the child's list, and
+    a log page is a bisection on the ``(date, timestamp)`` cursor.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._keys = {}
+        self._entries = {}
+
+    def apply(self, observation):
+        """Insert one observation in its child's list"""
+        child = observation.get('child_name')
+        day = observation.get('date')
+        if not child or not isinstance(day, str):
+            return
+        key = observation_key(observation)
+        keys = self._keys.setdefault(child, [])
+        position = bisect.bisect_right(keys, key)
+        keys.insert(position, key)
+        self._entries.setdefault(child, []).insert(position, observation)
+
+    def children(self):
+        """Names of the children with observations, sorted"""
+        return sorted(self._entries)
+
+    def _bounds(self, child, start_day, end_day):
+        keys = self._keys.get(child, [])
+        first = bisect.bisect_left(keys, (start_day,)) if start_day is not None else 0
+        last = bisect.bisect_left(keys, (_next_day(end_day),)) if end_day is not None else len(keys)
+        return first, last
+
+    def between(self, child, start_day=None, end_day=None):
+        """A child's observations between two inclusive 'YYYY-MM-DD' days, oldest first"""
+        first, last = self._bounds(child, start_day, end_day)
+        return self._entries.get(child, [])[first:last]
+
+    def page(self, child, page_size, before=None, start_day=None, end_day=None):
+        """Up to ``page_size + 1`` observations preceding the ``before`` key within the day range, newest first"""
+        first, last = self._bounds(child, start_day, end_day)
+        if before is not None:
+            last = min(last, bisect.bisect_left(self._keys.get(child, []), tuple(before)))
+        entries = self._entries.get(child, [])[max(first, last - page_size - 1):last]
+        entries.reverse()
+        return entries
+
+    def find(self, child, key):
+        """The observation stored under a ``(date, timestamp)`` key, or None"""
+        keys = self._keys.get(child, [])
+        key = tuple(key)
+        position = bisect.bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            return self._entries[child][position]
+        return None
+
+
+def observation_key(observation):
+    """``(date, timestamp)`` sort key and log cursor of an observation"""
+    return ((observation.get('date') or '')[:10], observation.get('timestamp') or '')
+
+
+def _next_day(day):
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+
+def build_observation_frame(observations):
+    """
+    Columnar DataFrame of parent observations, sorted by date
+
+    Built column by column with compact dtypes: categorical names and levels,
+    datetime64 dates, float32 metrics (NaN when missing) and a boolean
+    medication flag, so one frame can back every chart of a view.
+    """
+    def column(field):
+        return [obs.get(field) for obs in observations]
+
+    frame = pd.DataFrame({
+        'child_name': pd.Categorical(column('child_name')),
+        'date': pd.to_datetime([(obs.get('date') or '')[:10] for obs in observations],
+                               format='%Y-%m-%d', errors='coerce')
+    })
+    for field in OBSERVATION_NUMERIC_FIELDS:
+        frame[field] = pd.to_numeric(pd.Series(column(field), dtype=object), errors='coerce').astype(np.float32)
+    for field, levels in OBSERVATION_CATEGORY_FIELDS.items():
+        frame[field] = pd.Categorical(column(field), categories=levels, ordered=True)
+    frame['medication_taken'] = np.array([bool(value) for value in column('medication_taken')], dtype=bool)
+    frame['subjects_struggled'] = pd.Series([obs.get('subjects_struggled') or [] for obs in observations], dtype=object)
+    for field in OBSERVATION_TEXT_FIELDS:
+        frame[field] = pd.Series(column(field), dtype=object)
+
+    return frame.sort_values('date', kind='stable', ignore_index=True)
+
+
+def record_day(record):
+    """'YYYY-MM-DD' of a record's timestamp, or None if it has none"""
+    timestamp = record.get('timestamp')
+    if isinstance(timestamp, str) and len(timestamp) >= 10 and timestamp[4] == '-' and timestamp[7] == '-':
+        return timestamp[:10]
+    return None
+
+
+def _tuples(value):
+    """Undo the tuple -> list conversion of a JSON round trip in a store cursor"""
+    if isinstance(value, dict):
+        return {key: _tuples(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return tuple(_tuples(item) for item in value)
+    return value
+
+
+_observation_index = ObservationIndex()
+_observation_cursor = None
+_observation_lock = threading.Lock()
+
+
+# Sidecar-backed indexes over the prediction store: name -> (class, sidecar file name)
+PERSISTENT_INDEXES = {
+    'dashboard': (DashboardAggregator, 'student_data.dashboard.json'),
+    'attention': (RiskIndex, 'student_data.attention.json'),
+    'timeline': (StudentTimelineIndex, 'student_data.timeline.json'),
+    'daily_risk': (DailyRiskRollup, 'student_data.daily_risk.json'),
+    'correlation': (CorrelationStats, 'student_data.correlation.json')
+}
+
+_persistent_indexes = {}
+_persistent_lock = threading.Lock()
+
+
+def _db_dashboard_summary():
+    """Dashboard summary from the stored counts, or None if the database is unavailable"""
+    rows = get_dashboard_aggregates()
+    if rows is None:
+        return None
+
+    risk_counts = Counter()
+    grade_counts = {}
+    subject_counts = {subject: Counter() for subject in SUBJECTS}
+    for row in rows:
+        risk_counts.update(row['risk_counts'])
+        grade_counts.setdefault(row['grade_level'], Counter()).update(row['risk_counts'])
+        for subject, counts in row['subject_counts'].items():
+            subject_counts[subject].update(counts)
+
+    return build_summary(
+        total_students=sum(risk_counts.values()),
+        risk_counts=risk_counts,
+        grade_counts=grade_counts,
+        subject_counts=subject_counts
+    )
+
+
+def get_dashboard_summary():
+    """
+    Student counts for the dashboard
+
+    Returns ``total_students``, ``risk_counts`` per risk level,
+    ``grade_counts`` per grade and risk level, and ``subject_counts`` per
+    subject label and status band.
+    """
+    if DATABASE_AVAILABLE:
+        summary = _db_dashboard_summary()
+        if summary is not None:
+            return summary
+
+    with _persistent_lock:
+        return _refreshed_index('dashboard').summary()
+
+
+def get_students_needing_attention(limit=5, risk_levels=None):
+    """
+    Students with the highest risk probability in their latest assessment
+
+    Returns up to ``limit`` dicts with ``student_name``, ``grade_level``,
+    ``probability``, ``risk_level``, ``timestamp`` and ``weakest_subject``.
+    """
+    if DATABASE_AVAILABLE:
+        rows = query_students_needing_attention(limit, risk_levels)
+        if rows is not None:
+            return [attention_entry(row) for row in rows]
+
+    with _persistent_lock:
+        return _refreshed_index('attention').top(limit, risk_levels)
+
+
+def _get_index(name):
+    index = _persistent_indexes.get(name)
+    if index is None:
+        index_class, file_name = PERSISTENT_INDEXES[name]
+        index = _persistent_indexes[name] = index_class(os.path.join(get_data_directory(), file_name))
+    return index
+
+
+def _refreshed_index(name):
+    """Return a persistent index brought up to date with the prediction store; hold _persistent_lock"""
+    index = _get_index(name)
+    index.refresh(get_prediction_store())
+    return index
+
+
+def get_student_names():
+    """Distinct names of the assessed students, sorted"""
+    if DATABASE_AVAILABLE:
+        names = list_student_names()
+        if names is not None:
+            return names
+
+    with _persistent_lock:
+        return _refreshed_index('timeline').students()
+
+
+def get_student_history(student_name):
+    """A student's assessments, oldest first"""
+    if DATABASE_AVAILABLE:
+        rows = query_student_predictions(student_name=student_name)
+        if rows is not None:
+            rows.reverse()
+            return rows
+
+    with _persistent_lock:
+        return _refreshed_index('timeline').history(student_name)
+
+
+def _day_key(value):
+    return value.isoformat()[:10] if value is not None else None
+
+
+def get_daily_risk_counts(start_date=None, end_date=None, grade_level=None, school=None):
+    """
+    Assessments per day and risk level, read from the daily rollups
+
+    Returns ``{'day': 'YYYY-MM-DD', 'risk_level', 'count'}`` rows for the
+    inclusive date range, optionally limited to one grade or school.
+    """
+    if DATABASE_AVAILABLE:
+        rows = query_daily_risk_counts(start_date, end_date, grade_level, school)
+        if rows is not None:
+            return rows
+
+    with _persistent_lock:
+        return _refreshed_index('daily_risk').query(_day_key(start_date), _day_key(end_date), grade_level, school)
+
+
+def get_correlation_matrix(start_date=None, end_date=None):
+    """
+    Correlation matrix of CORRELATION_COLUMNS over all history or an inclusive date range
+
+    Returns ``{'columns', 'matrix', 'count'}`` where ``matrix`` is a list of
+    rows with None for undefined coefficients, or None if there is no data.
+    """
+    if DATABASE_AVAILABLE:
+        result = _db_correlation_matrix(start_date, end_date)
+        if result is not None:
+            return result if result['count'] else None
+
+    with _persistent_lock:
+        moments = _refreshed_index('correlation').moments(_day_key(start_date), _day_key(end_date))
+    matrix, count = correlation_from_moments(moments)
+    if not count:
+        return None
+    return {'columns': list(CORRELATION_COLUMNS), 'matrix': matrix, 'count': count}
+
+
+def get_probability_summary(start_date=None, end_date=None):
+    """
+    Number of assessments with a probability and their mean over an inclusive date range
+
+    Read from the same per-day statistics as the correlation matrix, so no
+    records are loaded. Returns ``{'count', 'mean_probability'}``, the mean
+    being None when there are no assessments.
+    """
+    k = CORRELATION_COLUMNS.index('probability')
+    pair = CORRELATION_PAIRS.index((k, k))
+    moments = None
+    if DATABASE_AVAILABLE:
+        moments = query_correlation_moments([(k, k)], CORRELATION_COLUMNS, start_date, end_date)
+
+    if moments is None:
+        with _persistent_lock:
+            moments = _refreshed_index('correlation').moments(_day_key(start_date), _day_key(end_date))
+        moments = moments[pair * 6:pair * 6 + 6]
+    n, sx = moments[0], moments[1]
+    return {'count': int(n), 'mean_probability': sx / n if n else None}
+
+
+def _db_correlation_matrix(start_date, end_date):
+    """Correlation matrix from the stored per-day statistics; None if the database is unavailable"""
+    moments = query_correlation_moments(CORRELATION_PAIRS, CORRELATION_COLUMNS, start_date, end_date)
+    if moments is None:
+        return None
+    matrix, count = correlation_from_moments(moments)
+    return {'columns': list(CORRELATION_COLUMNS), 'matrix': matrix, 'count': count}
+
+
+def _refreshed_observation_index():
+    """Return the observation index brought up to date with the observation store; hold _observation_lock"""
+    global _observation_cursor
+    records, _observation_cursor, reset = get_observation_store().read_since(_observation_cursor)
+    if reset:
+        _observation_index.reset()
+    for record in records:
+        if isinstance(record, dict):
+            _observation_index.apply(record)
+    return _observation_index
+
+
+def get_child_observations(child_name, start_date=None, end_date=None):
+    """
+    A child's parent observations in an inclusive date range, oldest first
+
+    On the file backend the observation index is brought up to date with the
+    records appended since the previous call, so repeated queries only cost
+    a bisection.
+    """
+    if DATABASE_AVAILABLE:
+        rows = query_parent_observations(child_name, start_date, end_date)
+        if rows is not None:
+            rows.reverse()
+            return rows
+
+    with _observation_lock:
+        return _refreshed_observation_index().between(child_name, _day_key(start_date), _day_key(end_date))
+
+
+def get_observation_page(child_name, page_size=20, before=None, start_date=None, end_date=None):
+    """
+    One page of a child's Observations Log, newest first
+
+    Returns ``(observations, next_cursor)``. The date range is applied before
+    paging; pass ``next_cursor`` back as ``before`` to get the following page
+    (it is None on the last page). The free-text fields are left out, load
+    them for a single entry with get_observation_details.
+    """
+    rows = None
+    if DATABASE_AVAILABLE:
+        rows = query_observation_page(child_name, page_size, before, start_date, end_date)
+    if rows is None:
+        with _observation_lock:
+            rows = _refreshed_observation_index().page(
+                child_name, page_size, before, _day_key(start_date), _day_key(end_date))
+
+    next_cursor = observation_key(rows[page_size - 1]) if len(rows) > page_size else None
+    page = [{field: value for field, value in row.items() if field not in OBSERVATION_TEXT_FIELDS}
+            for row in rows[:page_size]]
+    return page, next_cursor
+
+
+def get_observation_details(child_name, key):
+    """The full observation with the ``(date, timestamp)`` key of a log entry, or None"""
+    if DATABASE_AVAILABLE:
+        observation = query_observation_details(child_name, key[0], key[1])
+        if observation is not None:
+            return observation
+
+    with _observation_lock:
+        return _refreshed_observation_index().find(child_name, key)
+
+
+def backfill_rollups():
+    """Rebuild the daily rollups (and the other persistent indexes) from the stored predictions"""
+    rebuilt_database = False
+    if DATABASE_AVAILABLE:
+        rebuilt_database = rebuild_daily_rollups()
+
+    with _persistent_lock:
+        for name in PERSISTENT_INDEXES:
+            _get_index(name).rebuild(get_prediction_store())
+    return rebuilt_database
+
+
+def percentage(part, total):
+    """Whole-number percentage, 0 when there is nothing to divide"""
+    return round(100 * part / total) if total else 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] == ['backfill']:
+        database = backfill_rollups()
+        print("Rebuilt the file indexes" + (" and the database rollups" if database else ""))
+    else:
+        print("Usage: python -m utils.analytics backfill")
+        sys.exit(2)
@@ -0,0 +1,456 @@
+"""
+Columnar archive tier
+Closed months of parent observations are compacted into Parquet files partitioned by
+month and school, data/archive/<dataset>/month=YYYY-MM/school=<school>/, with the typed
+columns of the export schema. read_history serves the observation trends from the
+archive for archived months, reading only the requested columns and partitions, and
+from the primary store (database or JSON files) for the recent, hot months. Predictions
+are not archived: their analytics come from the rollups and indexes kept as they are
+saved, so nothing would read a prediction archive.
+
+Archived months are treated as closed: records are stamped with the time they are
+saved, so nothing new lands in them. The primary store keeps its copy until the
+retention policy removes it. Run ``python -m utils.archive`` periodically (e.g.
+nightly), or call schedule_archiving() to archive from a background thread.
+"""
+
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import closing
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from utils.data_utils import DATABASE_AVAILABLE, get_data_directory
+from utils.export import (
+    EXPORT_COLUMNS, PARQUET_AVAILABLE, ParquetChunkWriter,
+    iter_export_chunks, iter_file_chunks, to_export_rows
+)
+from utils.storage import atomic_write_json, get_lock, read_json_file
+
+if PARQUET_AVAILABLE:
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+# Datasets compacted into the archive
+ARCHIVED_DATASETS = ['observations']
+
+# Number of most recent months (including the current one) that stay in the primary store only
+ARCHIVE_HOT_MONTHS = int(os.environ.get('EDUSCAN_ARCHIVE_HOT_MONTHS', '3'))
+
+# Hours between runs of the background archiver
+ARCHIVE_INTERVAL_HOURS = 24
+
+ARCHIVE_SUBDIR = 'archive'
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Per dataset: the field holding the record's date and the field naming the student
+DATE_FIELDS = {'predictions': 'timestamp', 'observations': 'date'}
+NAME_FIELDS = {'predictions': 'student_name', 'observations': 'child_name'}
+
+# Partition of records without a school
+UNASSIGNED_SCHOOL = 'unassigned'
+
+
+def archive_dir():
+    return os.path.join(get_data_directory(), ARCHIVE_SUBDIR)
+
+
+def _manifest_path():
+    return os.path.join(archive_dir(), MANIFEST_NAME)
+
+
+def _month_dir(dataset, month):
+    return os.path.join(archive_dir(), dataset, f"month={month}")
+
+
+def school_partition(record):
+    """Partition value of a record's school"""
+    school = record.get('school')
+    if not isinstance(school, str) or not school.strip():
+        return UNASSIGNED_SCHOOL
+    return re.sub(r'[^A-Za-z0-9_-]+', '-', school.strip()).strip('-').lower() or UNASSIGNED_SCHOOL
+
+
+def _month_number(month):
+    return int(month[:4]) * 12 + int(month[5:7]) - 1
+
+
+def _month_name(number):
+    return f"{number // 12:04d}-{number % 12 + 1:02d}"
+
+
+def archive_cutoff(hot_months=ARCHIVE_HOT_MONTHS, today=None):
+    """First 'YYYY-MM' month kept hot; every earlier month is closed and can be archived"""
+    today = today or date.today()
+    return _month_name(today.year * 12 + today.month - 1 - max(hot_months - 1, 0))
+
+
+def load_archive_manifest():
+    """``{dataset: {month: {'rows': n, 'schools': {school: rows}}}}`` of the archived months"""
+    manifest = read_json_file(_manifest_path(), default=None)
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('datasets') or {}
+
+
+def _save_manifest(manifest):
+    atomic_write_json(_manifest_path(), {
+        'version': MANIFEST_VERSION,
+        'updated': datetime.now().isoformat(),
+        'datasets': manifest
+    })
+
+
+def archive_version():
+    """Changes whenever the archive is rewritten"""
+    try:
+        return os.stat(_manifest_path()).st_mtime_ns
+    except OSError:
+        return None
+
+
+def hot_start_date(dataset, manifest=None):
+    """First day served from the primary store for a dataset, or None when nothing is archived"""
+    if not PARQUET_AVAILABLE:
+        return None
+    months = (load_archive_manifest() if manifest is None else manifest).get(dataset)
+    if not months:
+        return None
+    first_hot = _month_name(_month_number(max(months)) + 1)
+    return date(int(first_hot[:4]), int(first_hot[5:7]), 1)
+
+
+class _MonthWriter:
+    """Parquet part files of one month, one per school, written under temporary names until closed"""
+
+    def __init__(self, dataset, month):
+        self.dataset = dataset
+        self.month = month
+        self.columns = EXPORT_COLUMNS[dataset]
+        self.rows = {}
+        self._writers = {}
+
+    def write(self, school, records):
+        writer = self._writers.get(school)
+        if writer is None:
+            directory = os.path.join(_month_dir(self.dataset, self.month), f"school={school}")
+            os.makedirs(directory, exist_ok=True)
+            # A month seen again later in the stream gets another part file
+            part = len([name for name in os.listdir(directory) if name.endswith('.parquet')])
+            path = os.path.join(directory, f"part-{part:05d}.parquet")
+            writer = self._writers[school] = (ParquetChunkWriter(f"{path}.tmp", self.columns), path)
+        writer[0].write(to_export_rows(records, self.columns))
+        self.rows[school] = self.rows.get(school, 0) + len(records)
+
+    def close(self):
+        for writer, path in self._writers.values():
+            writer.close()
+            os.replace(f"{path}.tmp", path)
+        self._writers = {}
+
+
+def _archive_dataset(dataset, chunks, skip_months):
+    """Write the records of ``chunks`` into month/school partitions; returns ``{month: {school: rows}}``"""
+    date_field = DATE_FIELDS[dataset]
+    archived = {}
+    current = None
+    try:
+        for chunk in chunks:
+            # Group the chunk by month and school so each part file gets whole batches
+            batches = {}
+            for record in chunk:
+                month = (record.get(date_field) or '')[:7]
+                if len(month) != 7 or month in skip_months:
+                    continue
+                batches.setdefault(month, {}).setdefault(school_partition(record), []).append(record)
+
+            for month in sorted(batches):
+                if current is None or current.month != month:
+                    if current is not None:
+                        current.close()
+                        _merge_counts(archived, current)
+                    if month not in archived:
+                        # Start the month from scratch, dropping files of an earlier or interrupted run
+                        shutil.rmtree(_month_dir(dataset, month), ignore_errors=True)
+                        archived[month] = {}
+                    current = _MonthWriter(dataset, month)
+                for school, records in batches[month].items():
+                    current.write(school, records)
+    finally:
+        if current is not None:
+            current.close()
+            _merge_counts(archived, current)
+    return archived
+
+
+def _merge_counts(archived, writer):
+    counts = archived.setdefault(writer.month, {})
+    for school, rows in writer.rows.items():
+        counts[school] = counts.get(school, 0) + rows
+
+
+def _archive_lock():
+    """Inter-process lock serializing the runs that rewrite archive partitions and the manifest"""
+    return get_lock(archive_dir())
+
+
+def archive_history(hot_months=ARCHIVE_HOT_MONTHS, force=False, today=None):
+    """
+    Compact the closed months of ARCHIVED_DATASETS into the Parquet archive
+
+    Months already in the manifest are skipped unless ``force`` is set.
+    Archives of other datasets, left by earlier versions, are removed.
+    Returns ``{dataset: [months archived]}``; empty if pyarrow is missing.
+    """
+    if not PARQUET_AVAILABLE:
+        print("The Parquet archive requires the pyarrow package")
+        return {}
+
+    cutoff = archive_cutoff(hot_months, today)
+    last_closed_day = date(int(cutoff[:4]), int(cutoff[5:7]), 1) - timedelta(days=1)
+    result = {}
+
+    with _archive_lock():
+        manifest = load_archive_manifest()
+        stale = [dataset for dataset in EXPORT_COLUMNS
+                 if dataset not in ARCHIVED_DATASETS and os.path.isdir(os.path.join(archive_dir(), dataset))]
+        for dataset in stale:
+            shutil.rmtree(os.path.join(archive_dir(), dataset), ignore_errors=True)
+            manifest.pop(dataset, None)
+        if force:
+            manifest = {}
+
+        for dataset in ARCHIVED_DATASETS:
+            # Only read the records after the months archived by earlier runs
+            start = hot_start_date(dataset, manifest)
+            months = manifest.setdefault(dataset, {})
+            skip = set(months)
+            try:
+                # Closing the chunks returns a database connection even when writing fails
+                try:
+                    with closing(iter_export_chunks(dataset, start_date=start, end_date=last_closed_day)) as chunks:
+                        archived = _archive_dataset(dataset, chunks, skip)
+                except Exception as e:
+                    if not DATABASE_AVAILABLE:
+                        raise
+                    print(f"Database error, falling back to JSON: {e}")
+                    with closing(iter_file_chunks(dataset, None, start, last_closed_day, None, 5000)) as chunks:
+                        archived = _archive_dataset(dataset, chunks, skip)
+            except Exception as e:
+                print(f"Error archiving {dataset}: {e}")
+                continue
+
+            for month, schools in archived.items():
+                months[month] = {'rows': sum(schools.values()), 'schools': schools}
+            result[dataset] = sorted(archived)
+
+        if not force and not stale and not any(result.values()):
+            return result
+        _save_manifest(manifest)
+    return result
+
+
+def _trim_partition(path, date_field, cutoff):
+    """Rewrite one part file without its rows dated before ``cutoff``; returns how many were removed"""
+    table = pq.read_table(path)
+    days = pc.utf8_slice_codeunits(table[date_field], 0, 10)
+    # Undated rows are kept, as in the file store
+    kept = table.filter(pc.fill_null(pc.greater_equal(days, cutoff), True))
+    removed = table.num_rows - kept.num_rows
+    if not removed:
+        return 0
+    if kept.num_rows:
+        pq.write_table(kept, f"{path}.tmp", compression='snappy')
+        os.replace(f"{path}.tmp", path)
+    else:
+        os.remove(path)
+    return removed
+
+
+def remove_archived_before(dataset, cutoff):
+    """
+    Remove a dataset's archived records dated before ``cutoff`` ('YYYY-MM-DD')
+
+    Earlier months are deleted whole; only the part files of the cutoff month
+    are read and rewritten without the expired rows. Returns ``(months
+    dropped, rows removed)``.
+    """
+    cutoff_month = cutoff[:7]
+    with _archive_lock():
+        manifest = load_archive_manifest()
+        months = manifest.get(dataset, {})
+        dropped = sorted(archived for archived in months if archived < cutoff_month)
+        removed = 0
+        for archived in dropped:
+            shutil.rmtree(_month_dir(dataset, archived), ignore_errors=True)
+            removed += months.pop(archived)['rows']
+
+        boundary = months.get(cutoff_month)
+        if boundary is not None and cutoff[8:10] > '01':
+            month_dir = _month_dir(dataset, cutoff_month)
+            schools = boundary['schools']
+            for school in list(schools):
+                directory = os.path.join(month_dir, f"school={school}")
+                parts = sorted(name for name in os.listdir(directory) if name.endswith('.parquet')) \
+                    if os.path.isdir(directory) else []
+                school_removed = sum(_trim_partition(os.path.join(directory, name), DATE_FIELDS[dataset], cutoff)
+                                     for name in parts)
+                schools[school] -= school_removed
+                removed += school_removed
+                if schools[school] <= 0:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    del schools[school]
+            boundary['rows'] = sum(schools.values())
+            if not schools:
+                shutil.rmtree(month_dir, ignore_errors=True)
+                del months[cutoff_month]
+                dropped.append(cutoff_month)
+
+        if dropped or removed:
+            _save_manifest(manifest)
+        return dropped, removed
+
+
+def _read_archived(dataset, months, columns, student_name, school):
+    """Read the requested columns of the archived partitions of ``months``"""
+    name_field = NAME_FIELDS[dataset]
+    read_columns = [column for column in columns if column != 'school']
+    filters = [(name_field, '=', student_name)] if student_name is not None else None
+
+    frames = []
+    for month in months:
+        month_dir = _month_dir(dataset, month)
+        schools = [school] if school is not None else months[month].get('schools', {})
+        for partition in schools:
+            directory = os.path.join(month_dir, f"school={partition}")
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith('.parquet'):
+                    continue
+                frame = pq.read_table(os.path.join(directory, name), columns=read_columns, filters=filters).to_pandas()
+                if 'school' in columns:
+                    frame['school'] = partition
+                frames.append(frame)
+    return frames
+
+
+def read_history(dataset, columns, start_date=None, end_date=None, student_name=None, school=None):
+    """
+    Selected columns of a dataset's records in an inclusive date range, oldest months first
+
+    Archived months are read from the Parquet partitions (only ``columns``,
+    and only the ``school`` partition when given); the months after the
+    archive come from the primary store. ``student_name`` selects one student
+    (the child for observations). Returns a DataFrame with ``columns``, which
+    may include 'school' and must otherwise be export columns of the dataset.
+    """
+    schema = EXPORT_COLUMNS[dataset]
+    date_field = DATE_FIELDS[dataset]
+    needed = list(dict.fromkeys(list(columns) + [date_field]))
+
+    manifest = load_archive_manifest()
+    hot_start = hot_start_date(dataset, manifest)
+    frames = []
+
+    if hot_start is not None and (start_date is None or start_date < hot_start):
+        first, last = _day(start_date)[:7], _day(end_date)[:7]
+        months = {month: entry for month, entry in manifest[dataset].items()
+                  if (not first or month >= first) and (not last or month <= last)}
+        archived = _read_archived(dataset, dict(sorted(months.items())), needed, student_name, school)
+        if archived:
+            # Archived months at the edges of the range may hold days outside it
+            archived_frame = pd.concat(archived, ignore_index=True)
+            days = archived_frame[date_field].str[:10]
+            keep = pd.Series(True, index=archived_frame.index)
+            if start_date is not None:
+                keep &= days >= _day(start_date)
+            if end_date is not None:
+                keep &= days <= _day(end_date)
+            frames.append(archived_frame[keep])
+
+    hot_from = start_date if hot_start is None or (start_date is not None and start_date >= hot_start) else hot_start
+    if end_date is None or hot_from is None or hot_from <= end_date:
+        frames.append(_read_hot(dataset, needed, hot_from, end_date, student_name, school))
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=list(columns))
+    history = pd.concat(frames, ignore_index=True)
+    for column in columns:
+        if schema.get(column) in ('float', 'int'):
+            history[column] = pd.to_numeric(history[column], errors='coerce')
+    return history[list(columns)]
+
+
+def _day(value):
+    return value.isoformat()[:10] if value is not None else ''
+
+
+def _read_hot(dataset, columns, start_date, end_date, student_name, school):
+    """Records of the primary store from ``start_date`` on, typed like the archive, reading only ``columns``"""
+    schema = {column: kind for column, kind in EXPORT_COLUMNS[dataset].items() if column in columns}
+    # The school is only needed to derive the partition value
+    read_columns = list(schema) + (['school'] if school is not None or 'school' in columns else [])
+
+    def collect(chunks):
+        rows = []
+        with closing(chunks):
+            for chunk in chunks:
+                if school is not None or 'school' in columns:
+                    for record, row in zip(chunk, to_export_rows(chunk, schema)):
+                        row['school'] = school_partition(record)
+                        if school is None or row['school'] == school:
+                            rows.append(row)
+                else:
+                    rows.extend(to_export_rows(chunk, schema))
+        return rows
+
+    try:
+        rows = collect(iter_export_chunks(dataset, student_name, start_date, end_date, columns=read_columns))
+    except Exception as e:
+        if not DATABASE_AVAILABLE:
+            raise
+        print(f"Database error, falling back to JSON: {e}")
+        rows = collect(iter_file_chunks(dataset, student_name, start_date, end_date, None, 5000, read_columns))
+    return pd.DataFrame(rows, columns=columns)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def _archive_loop(interval_hours):
+    while True:
+        try:
+            archive_history()
+        except Exception as e:
+            print(f"Error in background archiving: {e}")
+        time.sleep(interval_hours * 3600)
+
+
+def schedule_archiving(interval_hours=ARCHIVE_INTERVAL_HOURS):
+    """Start archiving closed months from a daemon thread every ``interval_hours``, once per process"""
+    global _scheduler
+    if not PARQUET_AVAILABLE:
+        return False
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = threading.Thread(target=_archive_loop, args=(interval_hours,),
+                                          name='history-archiver', daemon=True)
+            _scheduler.start()
+    return True
+
+
+if __name__ == "__main__":
+    import sys
+
+    force = '--force' in sys.argv[1:]
+    archived = archive_history(force=force)
+    for dataset, months in archived.items():
+        print(f"{dataset}: archived {len(months)} month(s)" + (f" ({months[0]} to {months[-1]})" if months else ""))
@@ -0,0 +1,276 @@
+"""
+Static image asset pipeline
+Pre-generates resized WebP/JPEG variants of the photos under pictures/ and attached_assets/
+into static/assets/ with content-hash file names, so pages can reference them as cacheable
+URLs served by Streamlit's static file serving instead of inlining base64 data URIs.
+
+Run ``python -m utils.asset_pipeline`` at build time to (re)generate the variants.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+
+from utils.storage import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# Directories scanned for source images, in lookup order
+SOURCE_DIRS = ('pictures', 'attached_assets')
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif')
+
+# Streamlit serves <app root>/static/* at app/static/* when server.enableStaticServing is on
+STATIC_DIR = 'static'
+ASSET_SUBDIR = 'assets'
+STATIC_URL_PREFIX = 'app/static'
+MANIFEST_NAME = 'manifest.json'
+
+# Variant name -> target width in pixels; images are never upscaled
+VARIANTS = {
+    'thumb': 320,
+    'card': 640,
+    'hero': 1280
+}
+
+# Output formats, preferred first
+FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}
+}
+
+DEFAULT_SIZES = "(max-width: 768px) 100vw, 50vw"
+
+# Upload timestamps appended to file names, e.g. photo_1751965339103.jpg
+_UPLOAD_SUFFIX = re.compile(r'_\d{10,}$')
+
+
+def _asset_dir():
+    return os.path.join(STATIC_DIR, ASSET_SUBDIR)
+
+
+def _manifest_path():
+    return os.path.join(_asset_dir(), MANIFEST_NAME)
+
+
+def _slug(name):
+    return re.sub(r'[^A-Za-z0-9]+', '-', name).strip('-').lower() or 'image'
+
+
+def _source_key(path):
+    """Manifest key of a source image: its path relative to the app root with forward slashes"""
+    return os.path.normpath(path).replace(os.sep, '/')
+
+
+def _name_key(path):
+    """File name of an image without its upload timestamp suffix, used to match renamed uploads"""
+    stem, extension = os.path.splitext(os.path.basename(path))
+    return _UPLOAD_SUFFIX.sub('', stem) + extension
+
+
+def iter_source_images(source_dirs=SOURCE_DIRS):
+    """Yield the paths of the images found under the source directories"""
+    for directory in source_dirs:
+        if not os.path.isdir(directory):
+            continue
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(root, name)
+
+
+def _render_variants(source_path, digest, output_dir):
+    """Write every variant of one image and return its manifest entry"""
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        width, height = image.size
+        stem = _slug(os.path.splitext(os.path.basename(source_path))[0])
+
+        variants = {}
+        for variant, target_width in VARIANTS.items():
+            variant_width = min(target_width, width)
+            variant_height = max(1, round(height * variant_width / width))
+            resized = image if variant_width == width else image.resize(
+                (variant_width, variant_height), Image.LANCZOS)
+
+            files = {}
+            for extension, options in FORMATS.items():
+                file_name = f"{stem}-{variant}-{digest[:12]}.{extension}"
+                target = os.path.join(output_dir, file_name)
+                if not os.path.exists(target):
+                    frame = resized.convert('RGB') if options['format'] == 'JPEG' else resized
+                    tmp_path = f"{target}.tmp"
+                    frame.save(tmp_path, **options)
+                    os.replace(tmp_path, target)
+                files[extension] = f"{ASSET_SUBDIR}/{file_name}"
+            variants[variant] = {'width': variant_width, 'height': variant_height, 'files': files}
+
+    return {'sha256': digest, 'width': width, 'height': height, 'variants': variants}
+
+
+def build_assets(source_dirs=SOURCE_DIRS, prune=True):
+    """
+    Generate the resized variants and manifest for every source image
+
+    File names embed a hash of the source content, so unchanged images are
+    skipped and browsers may cache the URLs indefinitely. Variants no longer
+    referenced by the manifest are removed when ``prune`` is set.
+    """
+    output_dir = _asset_dir()
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest = {}
+    for source_path in iter_source_images(source_dirs):
+        try:
+            with open(source_path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            manifest[_source_key(source_path)] = _render_variants(source_path, digest, output_dir)
+        except Exception as e:
+            logger.error(f"Skipping image {source_path}: {e}")
+
+    atomic_write_json(_manifest_path(), manifest)
+
+    if prune:
+        referenced = {os.path.basename(path)
+                      for entry in manifest.values()
+                      for variant in entry['variants'].values()
+                      for path in variant['files'].values()}
+        for name in os.listdir(output_dir):
+            if name != MANIFEST_NAME and name not in referenced:
+                os.remove(os.path.join(output_dir, name))
+
+    clear_manifest_cache()
+    return manifest
+
+
+# Process-wide manifest cache: ((mtime, size), manifest, url -> source key, name key -> source key)
+_manifest_cache = None
+_manifest_lock = threading.Lock()
+
+
+def load_manifest():
+    """Return the asset manifest, re-reading it only when the file changes"""
+    global _manifest_cache
+    try:
+        st = os.stat(_manifest_path())
+    except OSError:
+        return {}
+    signature = (st.st_mtime_ns, st.st_size)
+
+    cached = _manifest_cache
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with _manifest_lock:
+        try:
+            with open(_manifest_path(), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Error reading asset manifest: {e}")
+            return {}
+        by_url = {asset_url(entry['variants']['card']['files']['jpeg']): key
+                  for key, entry in manifest.items()}
+        # Earlier source directories win when two files share a name
+        by_name = {}
+        for directory in reversed(SOURCE_DIRS):
+            for key in manifest:
+                if key.startswith(f"{directory}/"):
+                    by_name[_name_key(key)] = key
+        _manifest_cache = (signature, manifest, by_url, by_name)
+        return manifest
+
+
+def clear_manifest_cache():
+    global _manifest_cache
+    with _manifest_lock:
+        _manifest_cache = None
+
+
+def asset_url(relative_path):
+    """URL under which Streamlit serves a file from static/"""
+    return f"{STATIC_URL_PREFIX}/{relative_path}"
+
+
+def find_asset(image_path):
+    """
+    Return the manifest entry for an image path, or None
+
+    Paths that do not exist as given are matched by file name against the
+    source directories, ignoring the upload timestamp suffix on both sides, so
+    references to renamed or re-uploaded images still find their image.
+    """
+    manifest = load_manifest()
+    if not manifest:
+        return None
+    entry = manifest.get(_source_key(image_path))
+    if entry is not None:
+        return entry
+
+    for directory in SOURCE_DIRS:
+        entry = manifest.get(_source_key(os.path.join(directory, os.path.basename(image_path))))
+        if entry is not None:
+            return entry
+    cached = _manifest_cache
+    if cached is None:
+        return None
+    key = cached[3].get(_name_key(image_path))
+    return cached[1].get(key) if key is not None else None
+
+
+def find_asset_by_url(url):
+    """Return the manifest entry whose default URL (as returned by get_asset_src) is ``url``"""
+    if not url.startswith(STATIC_URL_PREFIX):
+        return None
+    load_manifest()
+    cached = _manifest_cache
+    if cached is None:
+        return None
+    key = cached[2].get(url)
+    return cached[1].get(key) if key is not None else None
+
+
+def get_asset_src(image_path, variant='card'):
+    """Static URL of a JPEG variant of an image, or None if it has not been generated"""
+    entry = find_asset(image_path)
+    if entry is None:
+        return None
+    return asset_url(entry['variants'][variant]['files']['jpeg'])
+
+
+def get_srcset(entry, extension):
+    """``srcset`` value listing every variant of a manifest entry in one format"""
+    variants = sorted(entry['variants'].values(), key=lambda v: v['width'])
+    seen = set()
+    parts = []
+    for variant in variants:
+        if variant['width'] in seen:
+            continue
+        seen.add(variant['width'])
+        parts.append(f"{asset_url(variant['files'][extension])} {variant['width']}w")
+    return ', '.join(parts)
+
+
+def get_picture_html(entry, alt_text, style, sizes=DEFAULT_SIZES, extra_attributes=""):
+    """``<picture>`` element offering WebP variants with a JPEG ``<img>`` fallback"""
+    card = entry['variants']['card']
+    return (
+        f'<picture>'
+        f'<source type="image/webp" srcset="{get_srcset(entry, "webp")}" sizes="{sizes}">'
+        f'<img src="{asset_url(card["files"]["jpeg"])}" srcset="{get_srcset(entry, "jpeg")}" '
+        f'sizes="{sizes}" width="{card["width"]}" height="{card["height"]}" '
+        f'alt="{alt_text}" loading="lazy" decoding="async" style="{style}" {extra_attributes}>'
+        f'</picture>'
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    built = build_assets()
+    print(f"Generated variants for {len(built)} images in {_asset_dir()}")
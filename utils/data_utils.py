@@ -1,15 +1,15 @@
-import json
 import os
 import sys
 from datetime import datetime
-import pandas as pd
+from utils.storage import get_store, JsonArrayStore
+from utils.model_utils import get_risk_level
 
 # Import database functions
 try:
     from utils.db_utils import (
-        save_prediction_to_db, save_parent_observation_to_db,
+        save_prediction_to_db, save_predictions_bulk, save_parent_observation_to_db,
         load_student_predictions, load_parent_observations, authenticate_user_db,
-        get_database_stats
+        get_database_stats, query_student_predictions, query_parent_observations as db_query_observations
     )
     DATABASE_AVAILABLE = True
 except ImportError:
@@ -28,6 +28,18 @@ def get_data_directory():
     os.makedirs(data_dir, exist_ok=True)
     return data_dir
 
+def get_prediction_store():
+    """Get the file store used for predictions when the database is unavailable"""
+    return get_store('student_data', get_data_directory())
+
+def get_observation_store():
+    """Get the file store used for parent observations when the database is unavailable"""
+    return get_store('parent_observations', get_data_directory())
+
+def get_user_store():
+    """Get the locked JSON array store holding user accounts"""
+    return JsonArrayStore(os.path.join(get_data_directory(), 'users.json'))
+
 def save_prediction_data(prediction_record):
     """Save prediction data to database or JSON file as fallback"""
     # Try database first if available
@@ -37,53 +49,47 @@ def save_prediction_data(prediction_record):
         except Exception as e:
             print(f"Database error, falling back to JSON: {e}")
     
-    # Fallback to JSON file storage
+    # Fallback to file storage
     try:
-        data_dir = get_data_directory()
-        file_path = os.path.join(data_dir, 'student_data.json')
-        
-        # Load existing data
-        existing_data = []
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    existing_data = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                existing_data = []
-        
-        # Add new record
-        existing_data.append(prediction_record)
-        
-        # Save updated data
-        with open(file_path, 'w') as f:
-            json.dump(existing_data, f, indent=2)
-        
+        get_prediction_store().append(prediction_record)
         return True
     
     except Exception as e:
         print(f"Error saving prediction data: {e}")
         return False
 
+def save_prediction_batch(prediction_records):
+    """Save many prediction records in one transaction (or one file append as fallback)"""
+    # Try database first if available
+    if DATABASE_AVAILABLE:
+        try:
+            return save_predictions_bulk(prediction_records)
+        except Exception as e:
+            print(f"Database error, falling back to JSON: {e}")
+    
+    # Fallback to file storage
+    try:
+        get_prediction_store().append_many(prediction_records)
+        return True
+    
+    except Exception as e:
+        print(f"Error saving prediction batch: {e}")
+        return False
+
 def load_student_data():
     """Load student prediction data from database or JSON file as fallback"""
     # Try database first if available
     if DATABASE_AVAILABLE:
         try:
-            return load_student_predictions()
+            records = load_student_predictions()
+            if records is not None:
+                return records
         except Exception as e:
             print(f"Database error, falling back to JSON: {e}")
     
-    # Fallback to JSON file storage
+    # Fallback to file storage
     try:
-        data_dir = get_data_directory()
-        file_path = os.path.join(data_dir, 'student_data.json')
-        
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            return data
-        else:
-            return []
+        return get_prediction_store().load_all()
     
     except Exception as e:
         print(f"Error loading student data: {e}")
@@ -98,27 +104,9 @@ def save_parent_observation(observation_data):
         except Exception as e:
             print(f"Database error, falling back to JSON: {e}")
     
-    # Fallback to JSON file storage
+    # Fallback to file storage
     try:
-        data_dir = get_data_directory()
-        file_path = os.path.join(data_dir, 'parent_observations.json')
-        
-        # Load existing data
-        existing_data = []
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    existing_data = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                existing_data = []
-        
-        # Add new observation
-        existing_data.append(observation_data)
-        
-        # Save updated data
-        with open(file_path, 'w') as f:
-            json.dump(existing_data, f, indent=2)
-        
+        get_observation_store().append(observation_data)
         return True
     
     except Exception as e:
@@ -131,78 +119,128 @@ def load_parent_observations():
     if DATABASE_AVAILABLE:
         try:
             from utils.db_utils import load_parent_observations as db_load_observations
-            return db_load_observations()
+            records = db_load_observations()
+            if records is not None:
+                return records
         except Exception as e:
             print(f"Database error, falling back to JSON: {e}")
     
-    # Fallback to JSON file storage
+    # Fallback to file storage
     try:
-        data_dir = get_data_directory()
-        file_path = os.path.join(data_dir, 'parent_observations.json')
-        
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if content:
-                    data = json.loads(content)
-                    # Ensure data is a list
-                    if isinstance(data, list):
-                        return data
-                    else:
-                        return []
-                else:
-                    return []
-        else:
-            # Create empty file if it doesn't exist
-            with open(file_path, 'w') as f:
-                json.dump([], f)
-            return []
+        return get_observation_store().load_all()
     
-    except (json.JSONDecodeError, UnicodeDecodeError, TypeError) as e:
-        print(f"JSON parsing error, creating new file: {e}")
-        # Create fresh file if corrupted
+    except Exception as e:
+        print(f"Error loading parent observations: {e}")
+        return []
+
+def _month_key(value):
+    """'YYYY-MM' segment key for a date/datetime filter bound"""
+    return value.strftime('%Y-%m') if value is not None else None
+
+def _in_date_range(value, start_date, end_date):
+    """Compare an ISO date/timestamp string against inclusive date bounds without parsing it"""
+    if not isinstance(value, str):
+        return False
+    day = value[:10]
+    if start_date is not None and day < start_date.isoformat()[:10]:
+        return False
+    if end_date is not None and day > end_date.isoformat()[:10]:
+        return False
+    return True
+
+def canonical_risk_level(record):
+    """Untranslated risk level of a prediction record, derived from its probability when present"""
+    probability = record.get('probability')
+    if isinstance(probability, (int, float)):
+        return get_risk_level(probability)
+    return record.get('risk_level')
+
+def _page(records, sort_key, limit, offset):
+    records.sort(key=sort_key, reverse=True)
+    end = offset + limit if limit is not None else None
+    return records[offset:end]
+
+def iter_stored_predictions(student_name=None, start_date=None, end_date=None, risk_level=None):
+    """Yield the file store's predictions matching the filters, reading only the months in the date range"""
+    has_range = start_date is not None or end_date is not None
+    for record in get_prediction_store().iter_months(_month_key(start_date), _month_key(end_date)):
+        if (student_name is None or record.get('student_name') == student_name) \
+                and (not has_range or _in_date_range(record.get('timestamp'), start_date, end_date)) \
+                and (risk_level is None or canonical_risk_level(record) == risk_level):
+            yield record
+
+def iter_stored_observations(child_name=None, start_date=None, end_date=None):
+    """Yield the file store's parent observations matching the filters, reading only the months in the date range"""
+    has_range = start_date is not None or end_date is not None
+    for obs in get_observation_store().iter_months(_month_key(start_date), _month_key(end_date)):
+        if (child_name is None or obs.get('child_name') == child_name) \
+                and (not has_range or _in_date_range(obs.get('date'), start_date, end_date)):
+            yield obs
+
+def query_student_data(student_name=None, start_date=None, end_date=None, risk_level=None, limit=None, offset=0):
+    """
+    Load predictions matching the given filters, newest first
+    
+    The database applies the filters in SQL; the file store only reads the
+    monthly segments overlapping the date range.
+    """
+    # Try database first if available
+    if DATABASE_AVAILABLE:
         try:
-            data_dir = get_data_directory()
-            file_path = os.path.join(data_dir, 'parent_observations.json')
-            with open(file_path, 'w') as f:
-                json.dump([], f)
-        except:
-            pass
+            records = query_student_predictions(student_name, start_date, end_date, risk_level, limit, offset)
+            if records is not None:
+                return records
+        except Exception as e:
+            print(f"Database error, falling back to JSON: {e}")
+    
+    # Fallback to file storage
+    try:
+        matches = list(iter_stored_predictions(student_name, start_date, end_date, risk_level))
+        return _page(matches, lambda r: r.get('timestamp') or '', limit, offset)
+    
+    except Exception as e:
+        print(f"Error querying student data: {e}")
         return []
+
+def query_parent_observations(child_name=None, start_date=None, end_date=None, limit=None, offset=0):
+    """
+    Load parent observations for a child and date range, newest first
+    
+    The database applies the filters in SQL; the file store only reads the
+    monthly segments overlapping the date range.
+    """
+    # Try database first if available
+    if DATABASE_AVAILABLE:
+        try:
+            records = db_query_observations(child_name, start_date, end_date, limit, offset)
+            if records is not None:
+                return records
+        except Exception as e:
+            print(f"Database error, falling back to JSON: {e}")
+    
+    # Fallback to file storage
+    try:
+        matches = list(iter_stored_observations(child_name, start_date, end_date))
+        return _page(matches, lambda o: (o.get('date') or '', o.get('timestamp') or ''), limit, offset)
+    
     except Exception as e:
-        print(f"Error loading parent observations: {e}")
+        print(f"Error querying parent observations: {e}")
         return []
 
 def save_user_data(user_data):
     """Save user authentication data"""
     try:
-        data_dir = get_data_directory()
-        file_path = os.path.join(data_dir, 'users.json')
-        
-        # Load existing users
-        existing_users = []
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    existing_users = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                existing_users = []
-        
-        # Check if user already exists
-        user_exists = False
-        for i, user in enumerate(existing_users):
-            if user['username'] == user_data['username']:
-                existing_users[i] = user_data
-                user_exists = True
-                break
-        
-        if not user_exists:
+        def upsert_user(existing_users):
+            # Check if user already exists
+            for i, user in enumerate(existing_users):
+                if user['username'] == user_data['username']:
+                    existing_users[i] = user_data
+                    return existing_users
             existing_users.append(user_data)
+            return existing_users
         
-        # Save updated users
-        with open(file_path, 'w') as f:
-            json.dump(existing_users, f, indent=2)
-        
+        # Read-modify-write under the store lock so concurrent saves are not lost
+        get_user_store().update(upsert_user)
         return True
     
     except Exception as e:
@@ -212,16 +250,14 @@ def save_user_data(user_data):
 def load_user_data():
     """Load user authentication data"""
     try:
-        data_dir = get_data_directory()
-        file_path = os.path.join(data_dir, 'users.json')
+        user_store = get_user_store()
         
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            return data
-        else:
+        def ensure_default_users(existing_users):
+            if existing_users:
+                return existing_users
+            
             # Create default admin user
-            default_users = [
+            return [
                 {
                     "username": "admin",
                     "password": "admin123",
@@ -247,12 +283,12 @@ def load_user_data():
                     "created_date": datetime.now().isoformat()
                 }
             ]
-            
-            # Save default users
-            with open(file_path, 'w') as f:
-                json.dump(default_users, f, indent=2)
-            
-            return default_users
+        
+        if os.path.exists(user_store.path):
+            return user_store.load_all()
+        
+        # Save default users
+        return user_store.update(ensure_default_users)
     
     except Exception as e:
         print(f"Error loading user data: {e}")
@@ -277,52 +313,58 @@ def authenticate_user(username, password):
     return None
 
 def export_data_to_csv(data_type='predictions'):
-    """Export data to CSV format"""
-    try:
-        if data_type == 'predictions':
-            data = load_student_data()
-            df = pd.DataFrame(data)
-            filename = f"predictions_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        elif data_type == 'observations':
-            data = load_parent_observations()
-            df = pd.DataFrame(data)
-            filename = f"observations_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        else:
-            return None, "Invalid data type"
-        
-        if df.empty:
-            return None, "No data to export"
-        
-        csv_data = df.to_csv(index=False)
-        return csv_data, filename
+    """
+    Export data to a CSV file
     
-    except Exception as e:
-        return None, f"Error exporting data: {e}"
+    Rows are streamed to a temporary file by utils.export rather than built
+    into one string; returns ``(path, filename)`` or ``(None, message)``.
+    """
+    from utils.export import export_data
+    
+    if data_type not in ('predictions', 'observations'):
+        return None, "Invalid data type"
+    
+    export = export_data(data_type, 'csv')
+    if export is None:
+        return None, "Error exporting data"
+    if not export['rows']:
+        os.remove(export['path'])
+        return None, "No data to export"
+    return export['path'], export['file_name']
 
 def get_data_summary():
-    """Get summary statistics of stored data"""
+    """
+    Get summary statistics of stored data
+    
+    Counts come from one aggregate query on the database, or from the
+    stores' incrementally maintained summaries, so no records are loaded.
+    """
     try:
-        predictions = load_student_data()
-        observations = load_parent_observations()
-        users = load_user_data()
-        
-        summary = {
-            'total_predictions': len(predictions),
-            'total_observations': len(observations),
-            'total_users': len(users),
-            'last_prediction_date': None,
-            'last_observation_date': None
-        }
-        
-        if predictions:
-            latest_prediction = max(predictions, key=lambda x: x.get('timestamp', ''))
-            summary['last_prediction_date'] = latest_prediction.get('timestamp')
-        
-        if observations:
-            latest_observation = max(observations, key=lambda x: x.get('timestamp', ''))
-            summary['last_observation_date'] = latest_observation.get('timestamp')
+        summary = None
+        if DATABASE_AVAILABLE:
+            try:
+                db_stats = get_database_stats()
+                summary = {key: db_stats[key] for key in
+                           ('total_predictions', 'total_observations',
+                            'last_prediction_date', 'last_observation_date')}
+            except Exception as e:
+                print(f"Database error, falling back to JSON: {e}")
+        
+        if summary is None:
+            total_predictions, last_prediction = get_prediction_store().stats('timestamp')
+            total_observations, last_observation = get_observation_store().stats('timestamp')
+            summary = {
+                'total_predictions': total_predictions,
+                'total_observations': total_observations,
+                'last_prediction_date': last_prediction,
+                'last_observation_date': last_observation
+            }
+        
+        total_users, _ = get_user_store().stats('created_date')
+        if total_users == 0:
+            # load_user_data() seeds the default accounts on first use
+            total_users = len(load_user_data())
+        summary['total_users'] = total_users
         
         return summary
     
@@ -337,55 +379,25 @@ def get_data_summary():
         }
 
 def clean_old_data(days_old=90):
-    """Clean data older than specified days"""
+    """
+    Remove predictions and observations older than ``days_old`` days
+
+    Runs utils.retention with the same age for both datasets, in the calling
+    thread; the app applies the configured policies from a background worker
+    instead (see utils.retention.schedule_retention).
+    """
     try:
-        from datetime import datetime, timedelta
-        cutoff_date = datetime.now() - timedelta(days=days_old)
-        
-        # Clean predictions
-        predictions = load_student_data()
-        filtered_predictions = []
-        
-        for pred in predictions:
-            try:
-                pred_date = datetime.fromisoformat(pred.get('timestamp', ''))
-                if pred_date > cutoff_date:
-                    filtered_predictions.append(pred)
-            except ValueError:
-                # Keep records without valid timestamps
-                filtered_predictions.append(pred)
-        
-        # Clean observations
-        observations = load_parent_observations()
-        filtered_observations = []
-        
-        for obs in observations:
-            try:
-                obs_date = datetime.fromisoformat(obs.get('timestamp', ''))
-                if obs_date > cutoff_date:
-                    filtered_observations.append(obs)
-            except ValueError:
-                # Keep records without valid timestamps
-                filtered_observations.append(obs)
-        
-        # Save cleaned data
-        data_dir = get_data_directory()
-        
-        with open(os.path.join(data_dir, 'student_data.json'), 'w') as f:
-            json.dump(filtered_predictions, f, indent=2)
-        
-        with open(os.path.join(data_dir, 'parent_observations.json'), 'w') as f:
-            json.dump(filtered_observations, f, indent=2)
-        
-        removed_predictions = len(predictions) - len(filtered_predictions)
-        removed_observations = len(observations) - len(filtered_observations)
-        
-        return {
-            'removed_predictions': removed_predictions,
-            'removed_observations': removed_observations,
-            'remaining_predictions': len(filtered_predictions),
-            'remaining_observations': len(filtered_observations)
-        }
+        from utils.retention import apply_retention
+        report = apply_retention({
+            'predictions': {'max_age_days': days_old},
+            'observations': {'max_age_days': days_old}
+        })
+        
+        removed = {}
+        for dataset, result in report['datasets'].items():
+            removed[f"removed_{dataset}"] = (result['database'] or 0) + result['files']
+        removed['report'] = report
+        return removed
     
     except Exception as e:
         print(f"Error cleaning old data: {e}")
@@ -4,270 +4,1238 @@ Direct database operations without SQLAlchemy complexity
 """
 
 import os
+import time
+import threading
 import psycopg2
+from psycopg2.extras import execute_values
 import json
-from datetime import datetime, date
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_db_connection():
-    """Get PostgreSQL database connection"""
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+class ConnectionPool:
+    """
+    Thread-safe pool of database connections shared by the whole process
+    
+    Connections are created with ``connect()`` (psycopg2.connect by default, or
+    any stub returning a DB-API connection). Idle connections that have not been
+    used for ``health_check_interval`` seconds are checked with ``SELECT 1``
+    before being handed out, and replaced if the check fails.
+    """
+    
+    def __init__(self, connect, minconn=1, maxconn=10, health_check_interval=30, acquire_timeout=10):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Pool sizes must satisfy 0 <= minconn <= maxconn and maxconn >= 1")
+        
+        self._connect = connect
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        
+        self._idle = []
+        self._in_use = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+    
+    def getconn(self):
+        """Check a connection out of the pool, opening one if below maxconn"""
+        deadline = time.monotonic() + self.acquire_timeout
+        
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._in_use < self.maxconn:
+                    conn, last_used = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"No database connection available after {self.acquire_timeout}s")
+                self._condition.wait(remaining)
+            self._in_use += 1
+        
+        # Connect or health-check outside the lock so other threads are not blocked
+        try:
+            if conn is not None and not self._is_healthy(conn, last_used):
+                self._close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+            return conn
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+    
+    def putconn(self, conn, discard=False):
+        """Return a connection to the pool, closing it if it is broken or the pool is full"""
+        with self._condition:
+            self._in_use -= 1
+            keep = (not discard and not self._closed and not getattr(conn, 'closed', 0)
+                    and len(self._idle) + self._in_use < self.maxconn)
+            if keep:
+                self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+        if not keep:
+            self._close_quietly(conn)
+    
+    def closeall(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+    
+    def _is_healthy(self, conn, last_used):
+        if getattr(conn, 'closed', 0):
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            conn.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"Discarding unhealthy database connection: {e}")
+            return False
+    
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _build_pool(connect=None, dsn=None, minconn=None, maxconn=None, health_check_interval=None):
+    if connect is None:
+        dsn = dsn or os.environ['DATABASE_URL']
+        connect = lambda: psycopg2.connect(dsn)
+    
+    return ConnectionPool(
+        connect,
+        minconn=minconn if minconn is not None else int(os.environ.get('DB_POOL_MIN', 1)),
+        maxconn=maxconn if maxconn is not None else int(os.environ.get('DB_POOL_MAX', 10)),
+        health_check_interval=(health_check_interval if health_check_interval is not None
+                               else float(os.environ.get('DB_POOL_HEALTH_CHECK_SECONDS', 30)))
+    )
+
+def configure_pool(connect=None, dsn=None, minconn=None, maxconn=None, health_check_interval=None):
+    """
+    Create (or replace) the process-wide connection pool
+    
+    Sizes default to the DB_POOL_MIN / DB_POOL_MAX environment variables (1 and
+    10), and the health check interval to DB_POOL_HEALTH_CHECK_SECONDS (30).
+    Pass ``connect`` to use a stub connection factory, e.g. in tests without a
+    local PostgreSQL server.
+    """
+    global _pool
+    new_pool = _build_pool(connect, dsn, minconn, maxconn, health_check_interval)
+    
+    with _pool_lock:
+        old_pool, _pool = _pool, new_pool
+    if old_pool is not None:
+        old_pool.closeall()
+    return new_pool
+
+def get_pool():
+    """Get the process-wide connection pool, creating it from DATABASE_URL on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _build_pool()
+        return _pool
+
+def close_pool():
+    """Close the process-wide connection pool"""
+    global _pool
+    with _pool_lock:
+        old_pool, _pool = _pool, None
+    if old_pool is not None:
+        old_pool.closeall()
+
+@contextmanager
+def db_connection():
+    """
+    Borrow a pooled connection for one unit of work
+    
+    Commits when the block succeeds and rolls back when it raises. Connections
+    that fail to roll back are discarded instead of being returned to the pool.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    broken = False
     try:
-        conn = psycopg2.connect(os.environ['DATABASE_URL'])
-        return conn
-    except Exception as e:
-        logger.error(f"Database connection error: {e}")
-        return None
+        yield conn
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
+        raise
+    finally:
+        pool.putconn(conn, discard=broken)
 
 def save_prediction_to_db(prediction_data):
     """Save prediction data to PostgreSQL database"""
-    conn = get_db_connection()
-    if not conn:
-        return False
+    _ensure_indexes_once()
     
     try:
-        cur = conn.cursor()
-        
-        # Get or create student
-        student_name = prediction_data.get('student_name', 'Unknown Student')
-        grade_level = prediction_data.get('grade_level', 'Unknown')
-        
-        cur.execute(
-            "SELECT id FROM students WHERE name = %s",
-            (student_name,)
-        )
-        student_record = cur.fetchone()
-        
-        if student_record:
-            student_id = student_record[0]
-        else:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            
+            # Get or create student
+            student_name = prediction_data.get('student_name', 'Unknown Student')
+            grade_level = prediction_data.get('grade_level', 'Unknown')
+            
             cur.execute(
-                "INSERT INTO students (name, grade_level) VALUES (%s, %s) RETURNING id",
-                (student_name, grade_level)
+                "SELECT id FROM students WHERE name = %s",
+                (student_name,)
             )
-            student_id = cur.fetchone()[0]
-        
-        # Insert prediction
-        cur.execute("""
-            INSERT INTO predictions (
-                student_id, math_score, reading_score, writing_score, 
-                attendance, behavior, literacy, prediction, probability, 
-                risk_level, notes, timestamp
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            student_id,
-            prediction_data.get('math_score'),
-            prediction_data.get('reading_score'),
-            prediction_data.get('writing_score'),
-            prediction_data.get('attendance'),
-            prediction_data.get('behavior'),
-            prediction_data.get('literacy'),
-            prediction_data.get('prediction'),
-            prediction_data.get('probability'),
-            prediction_data.get('risk_level'),
-            prediction_data.get('notes', ''),
-            datetime.fromisoformat(prediction_data.get('timestamp', datetime.now().isoformat()))
-        ))
+            student_record = cur.fetchone()
+            
+            if student_record:
+                student_id = student_record[0]
+            else:
+                cur.execute(
+                    "INSERT INTO students (name, grade_level) VALUES (%s, %s) RETURNING id",
+                    (student_name, grade_level)
+                )
+                student_id = cur.fetchone()[0]
+            
+            timestamp = datetime.fromisoformat(prediction_data.get('timestamp', datetime.now().isoformat()))
+            
+            # Insert prediction
+            cur.execute("""
+                INSERT INTO predictions (
+                    student_id, math_score, reading_score, writing_score, 
+                    attendance, behavior, literacy, prediction, probability, 
+                    risk_level, notes, timestamp, grade_level, school
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (
+                student_id,
+                prediction_data.get('math_score'),
+                prediction_data.get('reading_score'),
+                prediction_data.get('writing_score'),
+                prediction_data.get('attendance'),
+                prediction_data.get('behavior'),
+                prediction_data.get('literacy'),
+                prediction_data.get('prediction'),
+                prediction_data.get('probability'),
+                prediction_data.get('risk_level'),
+                prediction_data.get('notes', ''),
+                timestamp,
+                *_rollup_dimensions(prediction_data)
+            ))
+            
+            _add_to_daily_rollups(cur, [prediction_data])
+            _add_to_correlation_moments(cur, [prediction_data])
+            _update_latest_predictions(cur, [(student_id, timestamp, prediction_data)])
         
-        conn.commit()
         logger.info(f"Prediction saved for student: {student_name}")
         return True
         
     except Exception as e:
-        conn.rollback()
         logger.error(f"Error saving prediction: {e}")
         return False
-    finally:
-        conn.close()
 
-def save_parent_observation_to_db(observation_data):
-    """Save parent observation to PostgreSQL database"""
-    conn = get_db_connection()
-    if not conn:
-        return False
+def save_predictions_bulk(prediction_records, page_size=1000):
+    """
+    Save many predictions in a single transaction
+    
+    Students are resolved or created with one set-based statement, and all
+    predictions are inserted with execute_values (one statement per
+    ``page_size`` rows) instead of three round trips per prediction.
+    """
+    if not prediction_records:
+        return True
+    
+    _ensure_indexes_once()
     
     try:
-        cur = conn.cursor()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            
+            # First grade level seen for each student, used only for new students
+            students = {}
+            for record in prediction_records:
+                students.setdefault(record.get('student_name', 'Unknown Student'),
+                                    record.get('grade_level', 'Unknown'))
+            
+            # Get or create all students at once
+            student_rows = execute_values(cur, """
+                WITH input (name, grade_level) AS (VALUES %s),
+                inserted AS (
+                    INSERT INTO students (name, grade_level)
+                    SELECT i.name, i.grade_level FROM input i
+                    WHERE NOT EXISTS (SELECT 1 FROM students s WHERE s.name = i.name)
+                    RETURNING name, id
+                )
+                SELECT name, id FROM inserted
+                UNION ALL
+                SELECT s.name, s.id FROM students s JOIN input i ON s.name = i.name
+            """, list(students.items()), page_size=len(students), fetch=True)
+            student_ids = dict(student_rows)
+            
+            now = datetime.now().isoformat()
+            saved = [
+                (student_ids[record.get('student_name', 'Unknown Student')],
+                 datetime.fromisoformat(record.get('timestamp', now)),
+                 record)
+                for record in prediction_records
+            ]
+            execute_values(cur, """
+                INSERT INTO predictions (
+                    student_id, math_score, reading_score, writing_score, 
+                    attendance, behavior, literacy, prediction, probability, 
+                    risk_level, notes, timestamp, grade_level, school
+                ) VALUES %s
+            """, [
+                (
+                    student_id,
+                    record.get('math_score'),
+                    record.get('reading_score'),
+                    record.get('writing_score'),
+                    record.get('attendance'),
+                    record.get('behavior'),
+                    record.get('literacy'),
+                    record.get('prediction'),
+                    record.get('probability'),
+                    record.get('risk_level'),
+                    record.get('notes', ''),
+                    timestamp,
+                    *_rollup_dimensions(record)
+                )
+                for student_id, timestamp, record in saved
+            ], page_size=page_size)
+            
+            _add_to_daily_rollups(cur, prediction_records, page_size)
+            _add_to_correlation_moments(cur, prediction_records, page_size)
+            _update_latest_predictions(cur, saved, page_size)
         
-        # Get or create student
-        child_name = observation_data.get('child_name', 'Unknown Child')
+        logger.info(f"Saved {len(prediction_records)} predictions in bulk")
+        return True
         
-        cur.execute(
-            "SELECT id FROM students WHERE name = %s",
-            (child_name,)
-        )
-        student_record = cur.fetchone()
+    except Exception as e:
+        logger.error(f"Error saving predictions in bulk: {e}")
+        return False
+
+def _rollup_risk_level(record):
+    """Risk level counted in the rollups: the probability band, else the stored label"""
+    probability = record.get('probability')
+    if isinstance(probability, (int, float)):
+        for risk_level, (low, high) in RISK_PROBABILITY_RANGES.items():
+            if probability >= low and (high is None or probability < high):
+                return risk_level
+    return record.get('risk_level')
+
+def _rollup_dimensions(record):
+    """``(grade_level, school)`` stored with a prediction and counted in its rollups"""
+    return record.get('grade_level') or '', record.get('school') or ''
+
+def _add_to_daily_rollups(cur, prediction_records, page_size=1000):
+    """Increment the daily rollup rows for newly inserted predictions, in the caller's transaction"""
+    counts = {}
+    today = date.today()
+    for record in prediction_records:
+        risk_level = _rollup_risk_level(record)
+        if risk_level is None:
+            continue
+        timestamp = record.get('timestamp')
+        day = datetime.fromisoformat(timestamp).date() if timestamp else today
+        key = (day, risk_level) + _rollup_dimensions(record)
+        counts[key] = counts.get(key, 0) + 1
+    if not counts:
+        return
+    
+    execute_values(cur, """
+        INSERT INTO daily_risk_rollups (day, risk_level, grade_level, school, count)
+        VALUES %s
+        ON CONFLICT (day, risk_level, grade_level, school)
+        DO UPDATE SET count = daily_risk_rollups.count + EXCLUDED.count
+    """, [key + (count,) for key, count in counts.items()], page_size=page_size)
+
+def _correlation_value(value):
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def _add_to_correlation_moments(cur, prediction_records, page_size=1000):
+    """Add newly inserted predictions to the per-day correlation statistics, in the caller's transaction"""
+    sums = {}
+    today = date.today()
+    for record in prediction_records:
+        timestamp = record.get('timestamp')
+        day = datetime.fromisoformat(timestamp).date() if timestamp else today
+        values = [_correlation_value(record.get(column)) for column in CORRELATION_COLUMNS]
+        for i, j in _correlation_pairs():
+            x, y = values[i], values[j]
+            if x is None or y is None:
+                continue
+            key = (day, CORRELATION_COLUMNS[i], CORRELATION_COLUMNS[j])
+            moments = sums.get(key)
+            if moments is None:
+                moments = sums[key] = [0.0] * 6
+            for k, value in enumerate((1.0, x, y, x * x, y * y, x * y)):
+                moments[k] += value
+    if not sums:
+        return
+    
+    execute_values(cur, """
+        INSERT INTO correlation_moments (day, x_column, y_column, n, sx, sy, sxx, syy, sxy)
+        VALUES %s
+        ON CONFLICT (day, x_column, y_column) DO UPDATE SET
+            n = correlation_moments.n + EXCLUDED.n,
+            sx = correlation_moments.sx + EXCLUDED.sx,
+            sy = correlation_moments.sy + EXCLUDED.sy,
+            sxx = correlation_moments.sxx + EXCLUDED.sxx,
+            syy = correlation_moments.syy + EXCLUDED.syy,
+            sxy = correlation_moments.sxy + EXCLUDED.sxy
+    """, [key + tuple(moments) for key, moments in sums.items()], page_size=page_size)
+
+def _correlation_pairs():
+    size = len(CORRELATION_COLUMNS)
+    return [(i, j) for i in range(size) for j in range(i, size)]
+
+def _rebuild_correlation_moments(cur):
+    """Recompute correlation_moments from the predictions table; hold its lock"""
+    pairs = [(CORRELATION_COLUMNS[i], CORRELATION_COLUMNS[j]) for i, j in _correlation_pairs()]
+    values = ", ".join(
+        f"('{x}', '{y}', p.{x}::double precision, p.{y}::double precision)" for x, y in pairs
+    )
+    cur.execute("DELETE FROM correlation_moments")
+    cur.execute(f"""
+        INSERT INTO correlation_moments (day, x_column, y_column, n, sx, sy, sxx, syy, sxy)
+        SELECT p.timestamp::date, v.x_column, v.y_column,
+               COUNT(*), SUM(v.x), SUM(v.y), SUM(v.x * v.x), SUM(v.y * v.y), SUM(v.x * v.y)
+        FROM predictions p
+        CROSS JOIN LATERAL (VALUES {values}) AS v (x_column, y_column, x, y)
+        WHERE v.x IS NOT NULL AND v.y IS NOT NULL
+        GROUP BY 1, 2, 3
+    """)
+
+def _subject_band(score):
+    if not isinstance(score, (int, float)):
+        return None
+    for band, minimum in SUBJECT_BANDS:
+        if score >= minimum:
+            return band
+    return None
+
+def _dashboard_contributions(record):
+    """``(grade_level, dimension, band)`` keys a student's latest prediction is counted under"""
+    grade_level = _rollup_dimensions(record)[0]
+    keys = []
+    risk_level = _rollup_risk_level(record)
+    if risk_level in RISK_PROBABILITY_RANGES:
+        keys.append((grade_level, 'risk_level', risk_level))
+    for subject in DASHBOARD_SUBJECTS:
+        band = _subject_band(record.get(subject))
+        if band is not None:
+            keys.append((grade_level, subject, band))
+    return keys
+
+def _add_to_dashboard_counts(cur, deltas, page_size=1000):
+    changes = [key + (delta,) for key, delta in deltas.items() if delta]
+    if changes:
+        execute_values(cur, """
+            INSERT INTO dashboard_counts (grade_level, dimension, band, count)
+            VALUES %s
+            ON CONFLICT (grade_level, dimension, band)
+            DO UPDATE SET count = dashboard_counts.count + EXCLUDED.count
+        """, changes, page_size=page_size)
+
+def _update_latest_predictions(cur, saved, page_size=1000):
+    """
+    Move each student's latest prediction and the dashboard counts forward, in the caller's transaction
+    
+    ``saved`` lists ``(student_id, timestamp, record)`` for the inserted
+    predictions. The students' rows are locked first, so concurrent saves
+    for the same student apply their count changes one after the other.
+    """
+    newest = {}
+    for student_id, timestamp, record in saved:
+        if student_id not in newest or timestamp >= newest[student_id][0]:
+            newest[student_id] = (timestamp, record)
+    student_ids = sorted(newest)
+    
+    cur.execute("SELECT id FROM students WHERE id = ANY(%s) ORDER BY id FOR UPDATE", (student_ids,))
+    cur.execute(f"""
+        SELECT student_id, {LATEST_PREDICTION_FIELDS}
+        FROM latest_predictions
+        WHERE student_id = ANY(%s)
+    """, (student_ids,))
+    previous = {row[0]: _latest_row_to_dict(row[1:]) for row in cur.fetchall()}
+    
+    deltas = {}
+    rows = []
+    for student_id in student_ids:
+        timestamp, record = newest[student_id]
+        old = previous.get(student_id)
+        if old is not None and old['timestamp'] > timestamp:
+            continue
+        if old is not None:
+            for key in _dashboard_contributions(old):
+                deltas[key] = deltas.get(key, 0) - 1
+        for key in _dashboard_contributions(record):
+            deltas[key] = deltas.get(key, 0) + 1
+        rows.append((student_id, timestamp, record.get('probability'), record.get('risk_level'),
+                     _rollup_dimensions(record)[0]) + tuple(record.get(subject) for subject in DASHBOARD_SUBJECTS))
+    
+    if rows:
+        execute_values(cur, f"""
+            INSERT INTO latest_predictions (student_id, {LATEST_PREDICTION_FIELDS})
+            VALUES %s
+            ON CONFLICT (student_id) DO UPDATE SET
+                timestamp = EXCLUDED.timestamp, probability = EXCLUDED.probability,
+                risk_level = EXCLUDED.risk_level, grade_level = EXCLUDED.grade_level,
+                math_score = EXCLUDED.math_score, reading_score = EXCLUDED.reading_score,
+                writing_score = EXCLUDED.writing_score
+        """, rows, page_size=page_size)
+    _add_to_dashboard_counts(cur, deltas, page_size)
+
+def _latest_row_to_dict(row):
+    return dict(zip(['timestamp', 'probability', 'risk_level', 'grade_level'] + DASHBOARD_SUBJECTS, row))
+
+def _rebuild_latest_predictions(cur):
+    """Recompute latest_predictions and dashboard_counts from the predictions table; hold their locks"""
+    cur.execute("DELETE FROM latest_predictions")
+    cur.execute(f"""
+        INSERT INTO latest_predictions (student_id, {LATEST_PREDICTION_FIELDS})
+        SELECT DISTINCT ON (p.student_id)
+            p.student_id, p.timestamp, p.probability, p.risk_level,
+            COALESCE(p.grade_level, s.grade_level, ''), {", ".join(f"p.{subject}" for subject in DASHBOARD_SUBJECTS)}
+        FROM predictions p
+        JOIN students s ON p.student_id = s.id
+        ORDER BY p.student_id, p.timestamp DESC
+    """)
+    
+    # Counted with the same code as live saves, one row per student
+    cur.execute(f"SELECT {LATEST_PREDICTION_FIELDS} FROM latest_predictions")
+    counts = {}
+    for row in cur:
+        for key in _dashboard_contributions(_latest_row_to_dict(row)):
+            counts[key] = counts.get(key, 0) + 1
+    cur.execute("DELETE FROM dashboard_counts")
+    _add_to_dashboard_counts(cur, counts)
+
+def rebuild_daily_rollups():
+    """Backfill: recompute the daily rollups, latest-prediction and correlation tables from every stored prediction"""
+    _ensure_indexes_once()
+    
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                LOCK TABLE daily_risk_rollups, latest_predictions, dashboard_counts, correlation_moments
+                IN EXCLUSIVE MODE
+            """)
+            cur.execute("DELETE FROM daily_risk_rollups")
+            cur.execute("""
+                INSERT INTO daily_risk_rollups (day, risk_level, grade_level, school, count)
+                SELECT
+                    p.timestamp::date,
+                    CASE
+                        WHEN p.probability IS NULL THEN p.risk_level
+                        WHEN p.probability >= %s THEN 'High Risk'
+                        WHEN p.probability >= %s THEN 'Medium Risk'
+                        ELSE 'Low Risk'
+                    END AS risk_level,
+                    -- Rows saved before predictions had these columns use the student's grade
+                    COALESCE(p.grade_level, s.grade_level, ''),
+                    COALESCE(p.school, ''),
+                    COUNT(*)
+                FROM predictions p
+                JOIN students s ON p.student_id = s.id
+                WHERE p.probability IS NOT NULL OR p.risk_level IS NOT NULL
+                GROUP BY 1, 2, 3, 4
+            """, (RISK_PROBABILITY_RANGES['High Risk'][0], RISK_PROBABILITY_RANGES['Medium Risk'][0]))
+            _rebuild_latest_predictions(cur)
+            _rebuild_correlation_moments(cur)
         
-        if student_record:
-            student_id = student_record[0]
-        else:
+        logger.info("Rebuilt daily risk rollups, latest predictions and correlation moments")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error rebuilding daily rollups: {e}")
+        return False
+
+def query_daily_risk_counts(start_date=None, end_date=None, grade_level=None, school=None):
+    """
+    Assessments per day and risk level from the rollup table
+    
+    Returns ``{'day', 'risk_level', 'count'}`` dicts for the inclusive date
+    range, or None if the query failed.
+    """
+    _ensure_indexes_once()
+    
+    conditions = []
+    params = []
+    if start_date is not None:
+        conditions.append("day >= %s")
+        params.append(start_date)
+    if end_date is not None:
+        conditions.append("day <= %s")
+        params.append(end_date)
+    if grade_level is not None:
+        conditions.append("grade_level = %s")
+        params.append(grade_level)
+    if school is not None:
+        conditions.append("school = %s")
+        params.append(school)
+    
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(f"""
+                SELECT day, risk_level, SUM(count)
+                FROM daily_risk_rollups
+                {"WHERE " + " AND ".join(conditions) if conditions else ""}
+                GROUP BY day, risk_level
+                ORDER BY day
+            """, params)
+            return [{'day': row[0].isoformat(), 'risk_level': row[1], 'count': int(row[2])}
+                    for row in cur.fetchall()]
+    except Exception as e:
+        logger.error(f"Error querying daily risk counts: {e}")
+        return None
+
+def save_parent_observation_to_db(observation_data):
+    """Save parent observation to PostgreSQL database"""
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            
+            # Get or create student
+            child_name = observation_data.get('child_name', 'Unknown Child')
+            
             cur.execute(
-                "INSERT INTO students (name, grade_level) VALUES (%s, %s) RETURNING id",
-                (child_name, 'Unknown')
+                "SELECT id FROM students WHERE name = %s",
+                (child_name,)
             )
-            student_id = cur.fetchone()[0]
-        
-        # Convert subjects_struggled list to JSON string
-        subjects_struggled = observation_data.get('subjects_struggled', [])
-        if isinstance(subjects_struggled, list):
-            subjects_struggled = json.dumps(subjects_struggled)
-        
-        # Insert observation
-        cur.execute("""
-            INSERT INTO parent_observations (
-                student_id, child_name, date, homework_completion, reading_time,
-                focus_level, subjects_struggled, behavior_rating, mood_rating,
-                sleep_hours, energy_level, social_interactions, learning_wins,
-                challenges_faced, strategies_used, screen_time, physical_activity,
-                medication_taken, special_events, timestamp
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            student_id,
-            child_name,
-            datetime.fromisoformat(observation_data.get('date', date.today().isoformat())),
-            observation_data.get('homework_completion'),
-            observation_data.get('reading_time'),
-            observation_data.get('focus_level'),
-            subjects_struggled,
-            observation_data.get('behavior_rating'),
-            observation_data.get('mood_rating'),
-            observation_data.get('sleep_hours'),
-            observation_data.get('energy_level'),
-            observation_data.get('social_interactions', ''),
-            observation_data.get('learning_wins', ''),
-            observation_data.get('challenges_faced', ''),
-            observation_data.get('strategies_used', ''),
-            observation_data.get('screen_time'),
-            observation_data.get('physical_activity'),
-            observation_data.get('medication_taken', False),
-            observation_data.get('special_events', ''),
-            datetime.fromisoformat(observation_data.get('timestamp', datetime.now().isoformat()))
-        ))
+            student_record = cur.fetchone()
+            
+            if student_record:
+                student_id = student_record[0]
+            else:
+                cur.execute(
+                    "INSERT INTO students (name, grade_level) VALUES (%s, %s) RETURNING id",
+                    (child_name, 'Unknown')
+                )
+                student_id = cur.fetchone()[0]
+            
+            # Convert subjects_struggled list to JSON string
+            subjects_struggled = observation_data.get('subjects_struggled', [])
+            if isinstance(subjects_struggled, list):
+                subjects_struggled = json.dumps(subjects_struggled)
+            
+            # Insert observation
+            cur.execute("""
+                INSERT INTO parent_observations (
+                    student_id, child_name, date, homework_completion, reading_time,
+                    focus_level, subjects_struggled, behavior_rating, mood_rating,
+                    sleep_hours, energy_level, social_interactions, learning_wins,
+                    challenges_faced, strategies_used, screen_time, physical_activity,
+                    medication_taken, special_events, timestamp
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (
+                student_id,
+                child_name,
+                datetime.fromisoformat(observation_data.get('date', date.today().isoformat())),
+                observation_data.get('homework_completion'),
+                observation_data.get('reading_time'),
+                observation_data.get('focus_level'),
+                subjects_struggled,
+                observation_data.get('behavior_rating'),
+                observation_data.get('mood_rating'),
+                observation_data.get('sleep_hours'),
+                observation_data.get('energy_level'),
+                observation_data.get('social_interactions', ''),
+                observation_data.get('learning_wins', ''),
+                observation_data.get('challenges_faced', ''),
+                observation_data.get('strategies_used', ''),
+                observation_data.get('screen_time'),
+                observation_data.get('physical_activity'),
+                observation_data.get('medication_taken', False),
+                observation_data.get('special_events', ''),
+                datetime.fromisoformat(observation_data.get('timestamp', datetime.now().isoformat()))
+            ))
         
-        conn.commit()
         logger.info(f"Parent observation saved for: {child_name}")
         return True
         
     except Exception as e:
-        conn.rollback()
         logger.error(f"Error saving parent observation: {e}")
         return False
-    finally:
-        conn.close()
 
-def load_student_predictions():
-    """Load all student prediction data from database"""
-    conn = get_db_connection()
-    if not conn:
-        return []
+PREDICTION_COLUMNS = """
+    p.id, p.math_score, p.reading_score, p.writing_score, p.attendance, p.behavior,
+    p.literacy, p.prediction, p.probability, p.risk_level, p.notes, p.timestamp,
+    s.name, s.grade_level, p.school
+"""
+
+OBSERVATION_COLUMNS = """
+    po.id, po.child_name, po.date, po.homework_completion, po.reading_time, po.focus_level,
+    po.subjects_struggled, po.behavior_rating, po.mood_rating, po.sleep_hours, po.energy_level,
+    po.social_interactions, po.learning_wins, po.challenges_faced, po.strategies_used,
+    po.screen_time, po.physical_activity, po.medication_taken, po.special_events, po.timestamp
+"""
+
+# Same positions as OBSERVATION_COLUMNS with the free-text fields left out, for log listings
+OBSERVATION_SUMMARY_COLUMNS = """
+    po.id, po.child_name, po.date, po.homework_completion, po.reading_time, po.focus_level,
+    po.subjects_struggled, po.behavior_rating, po.mood_rating, po.sleep_hours, po.energy_level,
+    NULL, NULL, NULL, NULL,
+    po.screen_time, po.physical_activity, po.medication_taken, NULL, po.timestamp
+"""
+
+# Record field -> SQL expression, for reads of selected columns
+PREDICTION_FIELDS = {
+    'id': 'p.id', 'math_score': 'p.math_score', 'reading_score': 'p.reading_score',
+    'writing_score': 'p.writing_score', 'attendance': 'p.attendance', 'behavior': 'p.behavior',
+    'literacy': 'p.literacy', 'prediction': 'p.prediction', 'probability': 'p.probability',
+    'risk_level': 'p.risk_level', 'notes': 'p.notes', 'timestamp': 'p.timestamp',
+    'student_name': 's.name', 'grade_level': 's.grade_level', 'school': 'p.school'
+}
+OBSERVATION_FIELDS = {
+    field: f"po.{field}" for field in [
+        'id', 'child_name', 'date', 'homework_completion', 'reading_time', 'focus_level',
+        'subjects_struggled', 'behavior_rating', 'mood_rating', 'sleep_hours', 'energy_level',
+        'social_interactions', 'learning_wins', 'challenges_faced', 'strategies_used',
+        'screen_time', 'physical_activity', 'medication_taken', 'special_events', 'timestamp'
+    ]
+}
+
+# Probability band of each risk level (same thresholds as model_utils.get_risk_level)
+RISK_PROBABILITY_RANGES = {
+    'Low Risk': (0.0, 0.3),
+    'Medium Risk': (0.3, 0.7),
+    'High Risk': (0.7, None)
+}
+
+# Subject score bands on the dashboard as (band, minimum score), highest first
+# (same thresholds as analytics.SUBJECT_BANDS)
+SUBJECT_BANDS = [
+    ('On Track', 70),
+    ('At Risk', 50),
+    ('Intervention', 0)
+]
+
+DASHBOARD_SUBJECTS = ['math_score', 'reading_score', 'writing_score']
+
+# Numeric prediction columns with stored correlation statistics (same as analytics.CORRELATION_COLUMNS)
+CORRELATION_COLUMNS = [
+    'math_score', 'reading_score', 'writing_score', 'attendance', 'behavior', 'literacy', 'probability'
+]
+
+# Columns of latest_predictions after student_id
+LATEST_PREDICTION_FIELDS = "timestamp, probability, risk_level, grade_level, math_score, reading_score, writing_score"
+
+# Columns added to the base tables: the grade and school a prediction was made under
+COLUMN_STATEMENTS = [
+    "ALTER TABLE predictions ADD COLUMN IF NOT EXISTS grade_level TEXT",
+    "ALTER TABLE predictions ADD COLUMN IF NOT EXISTS school TEXT"
+]
+
+# Tables derived from the base tables, created alongside the indexes
+ROLLUP_TABLE_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS daily_risk_rollups (
+        day DATE NOT NULL,
+        risk_level TEXT NOT NULL,
+        grade_level TEXT NOT NULL DEFAULT '',
+        school TEXT NOT NULL DEFAULT '',
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, risk_level, grade_level, school)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS latest_predictions (
+        student_id INTEGER PRIMARY KEY,
+        timestamp TIMESTAMP NOT NULL,
+        probability DOUBLE PRECISION,
+        risk_level TEXT,
+        grade_level TEXT NOT NULL DEFAULT '',
+        math_score DOUBLE PRECISION,
+        reading_score DOUBLE PRECISION,
+        writing_score DOUBLE PRECISION
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS correlation_moments (
+        day DATE NOT NULL,
+        x_column TEXT NOT NULL,
+        y_column TEXT NOT NULL,
+        n DOUBLE PRECISION NOT NULL DEFAULT 0,
+        sx DOUBLE PRECISION NOT NULL DEFAULT 0,
+        sy DOUBLE PRECISION NOT NULL DEFAULT 0,
+        sxx DOUBLE PRECISION NOT NULL DEFAULT 0,
+        syy DOUBLE PRECISION NOT NULL DEFAULT 0,
+        sxy DOUBLE PRECISION NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, x_column, y_column)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dashboard_counts (
+        grade_level TEXT NOT NULL,
+        dimension TEXT NOT NULL,
+        band TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (grade_level, dimension, band)
+    )
+    """
+]
+
+# Indexes backing the filtered queries below
+INDEX_STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS idx_students_name ON students (name)",
+    "CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_predictions_student_timestamp ON predictions (student_id, timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_predictions_probability ON predictions (probability)",
+    "CREATE INDEX IF NOT EXISTS idx_parent_observations_student_date ON parent_observations (student_id, date DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_parent_observations_timestamp ON parent_observations (timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_parent_observations_date ON parent_observations (date)",
+    "CREATE INDEX IF NOT EXISTS idx_latest_predictions_probability ON latest_predictions (probability DESC, timestamp DESC)"
+]
+
+_indexes_checked = False
+
+def ensure_indexes():
+    """Create the columns, rollup tables and indexes used by the queries below if they are missing"""
+    global _indexes_checked
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            for statement in COLUMN_STATEMENTS + ROLLUP_TABLE_STATEMENTS + INDEX_STATEMENTS:
+                cur.execute(statement)
+        _indexes_checked = True
+        return True
+    except Exception as e:
+        logger.error(f"Error creating indexes: {e}")
+        return False
+
+def _ensure_indexes_once():
+    if not _indexes_checked:
+        ensure_indexes()
+
+def _date_range_clause(column, start_date, end_date, params):
+    """Build an index-friendly range condition; dates are inclusive whole days"""
+    clauses = []
+    if start_date is not None:
+        clauses.append(f"{column} >= %s")
+        params.append(start_date)
+    if end_date is not None:
+        if isinstance(end_date, date) and not isinstance(end_date, datetime):
+            clauses.append(f"{column} < %s")
+            params.append(end_date + timedelta(days=1))
+        else:
+            clauses.append(f"{column} <= %s")
+            params.append(end_date)
+    return clauses
+
+def _prediction_row_to_dict(row):
+    return {
+        'id': row[0],
+        'math_score': row[1],
+        'reading_score': row[2],
+        'writing_score': row[3],
+        'attendance': row[4],
+        'behavior': row[5],
+        'literacy': row[6],
+        'prediction': row[7],
+        'probability': row[8],
+        'risk_level': row[9],
+        'notes': row[10],
+        'timestamp': row[11].isoformat(),
+        'student_name': row[12],
+        'grade_level': row[13],
+        'school': row[14]
+    }
+
+def _observation_row_to_dict(row):
+    # Parse subjects_struggled back to list
+    subjects_struggled = row[6] or '[]'
+    try:
+        subjects_struggled = json.loads(subjects_struggled)
+    except json.JSONDecodeError:
+        subjects_struggled = []
+    
+    return {
+        'id': row[0],
+        'child_name': row[1],
+        'date': row[2].isoformat(),
+        'homework_completion': row[3],
+        'reading_time': row[4],
+        'focus_level': row[5],
+        'subjects_struggled': subjects_struggled,
+        'behavior_rating': row[7],
+        'mood_rating': row[8],
+        'sleep_hours': row[9],
+        'energy_level': row[10],
+        'social_interactions': row[11],
+        'learning_wins': row[12],
+        'challenges_faced': row[13],
+        'strategies_used': row[14],
+        'screen_time': row[15],
+        'physical_activity': row[16],
+        'medication_taken': row[17],
+        'special_events': row[18],
+        'timestamp': row[19].isoformat()
+    }
+
+def _prediction_conditions(student_name, start_date, end_date, risk_level, params):
+    """WHERE conditions for the prediction filters shared by queries and exports"""
+    conditions = []
+    if student_name is not None:
+        conditions.append("s.name = %s")
+        params.append(student_name)
+    if risk_level is not None:
+        # Stored labels may be translated, so filter on the probability band instead
+        low, high = RISK_PROBABILITY_RANGES[risk_level]
+        conditions.append("p.probability >= %s")
+        params.append(low)
+        if high is not None:
+            conditions.append("p.probability < %s")
+            params.append(high)
+    conditions.extend(_date_range_clause("p.timestamp", start_date, end_date, params))
+    return conditions
+
+def query_student_predictions(student_name=None, start_date=None, end_date=None,
+                              risk_level=None, limit=None, offset=0):
+    """
+    Load predictions matching the given filters, newest first
+    
+    All filters are applied in SQL: ``student_name`` by equality, ``risk_level``
+    ('Low Risk', 'Medium Risk' or 'High Risk') as a probability band,
+    ``start_date``/``end_date`` as an inclusive timestamp range, and
+    ``limit``/``offset`` for paging. Returns None if the query failed.
+    """
+    _ensure_indexes_once()
+    
+    params = []
+    conditions = _prediction_conditions(student_name, start_date, end_date, risk_level, params)
+    
+    query = f"""
+        SELECT {PREDICTION_COLUMNS}
+        FROM predictions p 
+        JOIN students s ON p.student_id = s.id 
+        {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        ORDER BY p.timestamp DESC
+    """
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    if offset:
+        query += " OFFSET %s"
+        params.append(offset)
     
     try:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT p.*, s.name, s.grade_level 
-            FROM predictions p 
-            JOIN students s ON p.student_id = s.id 
-            ORDER BY p.timestamp DESC
-        """)
-        
-        predictions = []
-        for row in cur.fetchall():
-            prediction_dict = {
-                'id': row[0],
-                'math_score': row[2],
-                'reading_score': row[3],
-                'writing_score': row[4],
-                'attendance': row[5],
-                'behavior': row[6],
-                'literacy': row[7],
-                'prediction': row[8],
-                'probability': row[9],
-                'risk_level': row[10],
-                'notes': row[11],
-                'timestamp': row[12].isoformat(),
-                'student_name': row[13],
-                'grade_level': row[14]
-            }
-            predictions.append(prediction_dict)
-        
-        return predictions
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            return [_prediction_row_to_dict(row) for row in cur.fetchall()]
         
     except Exception as e:
         logger.error(f"Error loading predictions: {e}")
-        return []
-    finally:
-        conn.close()
+        return None
 
-def load_parent_observations():
-    """Load all parent observation data from database"""
-    conn = get_db_connection()
-    if not conn:
-        return []
+def query_parent_observations(child_name=None, start_date=None, end_date=None, limit=None, offset=0):
+    """
+    Load parent observations matching the given filters, newest first
+    
+    ``start_date``/``end_date`` filter the observation date (inclusive);
+    ``limit``/``offset`` page through the result in SQL. Returns None if the
+    query failed.
+    """
+    _ensure_indexes_once()
+    
+    conditions = []
+    params = []
+    if child_name is not None:
+        conditions.append("s.name = %s")
+        params.append(child_name)
+    conditions.extend(_date_range_clause("po.date", start_date, end_date, params))
+    
+    query = f"""
+        SELECT {OBSERVATION_COLUMNS}
+        FROM parent_observations po 
+        JOIN students s ON po.student_id = s.id 
+        {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        ORDER BY po.date DESC, po.timestamp DESC
+    """
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    if offset:
+        query += " OFFSET %s"
+        params.append(offset)
     
     try:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT po.*, s.name 
-            FROM parent_observations po 
-            JOIN students s ON po.student_id = s.id 
-            ORDER BY po.timestamp DESC
-        """)
-        
-        observations = []
-        for row in cur.fetchall():
-            # Parse subjects_struggled back to list
-            subjects_struggled = row[8] or '[]'
-            try:
-                subjects_struggled = json.loads(subjects_struggled)
-            except json.JSONDecodeError:
-                subjects_struggled = []
-            
-            observation_dict = {
-                'id': row[0],
-                'child_name': row[2],
-                'date': row[3].isoformat(),
-                'homework_completion': row[4],
-                'reading_time': row[5],
-                'focus_level': row[6],
-                'subjects_struggled': subjects_struggled,
-                'behavior_rating': row[9],
-                'mood_rating': row[10],
-                'sleep_hours': row[11],
-                'energy_level': row[12],
-                'social_interactions': row[13],
-                'learning_wins': row[14],
-                'challenges_faced': row[15],
-                'strategies_used': row[16],
-                'screen_time': row[17],
-                'physical_activity': row[18],
-                'medication_taken': row[19],
-                'special_events': row[20],
-                'timestamp': row[21].isoformat()
-            }
-            observations.append(observation_dict)
-        
-        return observations
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            return [_observation_row_to_dict(row) for row in cur.fetchall()]
         
     except Exception as e:
         logger.error(f"Error loading observations: {e}")
-        return []
-    finally:
-        conn.close()
+        return None
 
-def authenticate_user_db(username, password):
-    """Authenticate user against database"""
-    conn = get_db_connection()
-    if not conn:
+def query_observation_page(child_name, page_size, before=None, start_date=None, end_date=None):
+    """
+    One page of a child's observations, newest first, without the free-text fields
+    
+    ``before`` is the ``(date, timestamp)`` of the last entry of the previous
+    page; the page is fetched by keyset rather than OFFSET, so deep pages cost
+    the same as the first. Up to ``page_size + 1`` rows are returned so the
+    caller can tell whether another page follows. Returns None if the query
+    failed.
+    """
+    _ensure_indexes_once()
+    
+    conditions = ["s.name = %s"]
+    params = [child_name]
+    conditions.extend(_date_range_clause("po.date", start_date, end_date, params))
+    if before is not None:
+        conditions.append("(po.date, po.timestamp) < (%s, %s)")
+        params.extend(before)
+    params.append(page_size + 1)
+    
+    query = f"""
+        SELECT {OBSERVATION_SUMMARY_COLUMNS}
+        FROM parent_observations po 
+        JOIN students s ON po.student_id = s.id 
+        WHERE {" AND ".join(conditions)}
+        ORDER BY po.date DESC, po.timestamp DESC
+        LIMIT %s
+    """
+    
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            return [_observation_row_to_dict(row) for row in cur.fetchall()]
+    except Exception as e:
+        logger.error(f"Error loading observation page: {e}")
         return None
+
+def query_observation_details(child_name, observation_date, timestamp):
+    """The full observation recorded for a child at ``timestamp`` on ``observation_date``, or None"""
+    query = f"""
+        SELECT {OBSERVATION_COLUMNS}
+        FROM parent_observations po 
+        JOIN students s ON po.student_id = s.id 
+        WHERE s.name = %s AND po.date = %s AND po.timestamp = %s
+        LIMIT 1
+    """
     
     try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(query, (child_name, observation_date, timestamp))
+            row = cur.fetchone()
+            return _observation_row_to_dict(row) if row else None
+    except Exception as e:
+        logger.error(f"Error loading observation details: {e}")
+        return None
+
+def _selected_row_to_dict(columns, row):
+    """Record holding only ``columns``, with the same value types as the full row dicts"""
+    record = {}
+    for column, value in zip(columns, row):
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        elif column == 'subjects_struggled':
+            try:
+                value = json.loads(value or '[]')
+            except json.JSONDecodeError:
+                value = []
+        record[column] = value
+    return record
+
+def _select_list(fields, columns):
+    """SQL select list for ``columns``, a list of keys of ``fields``"""
+    unknown = [column for column in columns if column not in fields]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    return ", ".join(fields[column] for column in columns)
+
+def _iter_rows(name, query, params, row_to_dict, chunk_size):
+    """
+    Run ``query`` on a server-side cursor and yield its rows as lists of dicts
+    
+    The pooled connection is held until the generator is exhausted or closed;
+    callers that may stop early close it (contextlib.closing) rather than
+    leaving it to garbage collection.
+    """
+    with db_connection() as conn:
+        cur = conn.cursor(name=name)
+        cur.itersize = chunk_size
+        try:
+            cur.execute(query, params)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [row_to_dict(row) for row in rows]
+        except GeneratorExit:
+            # Abandoned before the end: end the read-only transaction before the pool gets it back
+            cur.close()
+            conn.rollback()
+            raise
+        finally:
+            if not cur.closed:
+                cur.close()
+
+def iter_student_predictions(student_name=None, start_date=None, end_date=None, risk_level=None, chunk_size=5000,
+                             columns=None):
+    """
+    Yield the predictions matching the filters in lists of up to ``chunk_size``, oldest first
+    
+    Rows are streamed through a server-side cursor, so memory use does not
+    grow with the size of the result. With ``columns`` (fields of
+    PREDICTION_FIELDS) only those are selected and returned. Errors
+    propagate to the caller.
+    """
+    _ensure_indexes_once()
+    
+    params = []
+    conditions = _prediction_conditions(student_name, start_date, end_date, risk_level, params)
+    if columns is None:
+        select, row_to_dict, join = PREDICTION_COLUMNS, _prediction_row_to_dict, True
+    else:
+        select = _select_list(PREDICTION_FIELDS, columns)
+        row_to_dict = lambda row: _selected_row_to_dict(columns, row)
+        join = student_name is not None or 's.' in select
+    query = f"""
+        SELECT {select}
+        FROM predictions p 
+        {"JOIN students s ON p.student_id = s.id" if join else ""}
+        {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        ORDER BY p.timestamp
+    """
+    return _iter_rows('export_predictions', query, params, row_to_dict, chunk_size)
+
+def iter_parent_observations(child_name=None, start_date=None, end_date=None, chunk_size=5000, columns=None):
+    """
+    Yield the observations matching the filters in lists of up to ``chunk_size``, oldest first
+    
+    With ``columns`` (fields of OBSERVATION_FIELDS) only those are selected and returned.
+    """
+    _ensure_indexes_once()
+    
+    conditions = []
+    params = []
+    if child_name is not None:
+        conditions.append("s.name = %s")
+        params.append(child_name)
+    conditions.extend(_date_range_clause("po.date", start_date, end_date, params))
+    if columns is None:
+        select, row_to_dict = OBSERVATION_COLUMNS, _observation_row_to_dict
+    else:
+        select = _select_list(OBSERVATION_FIELDS, columns)
+        row_to_dict = lambda row: _selected_row_to_dict(columns, row)
+    query = f"""
+        SELECT {select}
+        FROM parent_observations po 
+        {"JOIN students s ON po.student_id = s.id" if child_name is not None or columns is None else ""}
+        {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        ORDER BY po.date, po.timestamp
+    """
+    return _iter_rows('export_observations', query, params, row_to_dict, chunk_size)
+
+def _delete_before(table, column, cutoff, batch_size):
+    """Delete the rows of ``table`` with ``column`` before ``cutoff`` in batches, one transaction each"""
+    removed = 0
+    while True:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(f"""
+                DELETE FROM {table} WHERE id IN (
+                    SELECT id FROM {table} WHERE {column} < %s LIMIT %s
+                )
+            """, (cutoff, batch_size))
+            deleted = cur.rowcount
+        removed += deleted
+        if deleted < batch_size:
+            return removed
+
+def delete_predictions_before(cutoff, batch_size=10000):
+    """
+    Delete the predictions made before ``cutoff`` (a date) and what was derived from them
+    
+    Rows are removed through the timestamp index in batches of ``batch_size``,
+    each in its own short transaction, so saves are never blocked for long.
+    Returns the number of predictions deleted; errors propagate.
+    """
+    _ensure_indexes_once()
+    
+    removed = _delete_before('predictions', 'timestamp', cutoff, batch_size)
+    with db_connection() as conn:
         cur = conn.cursor()
-        cur.execute(
-            "SELECT id, username, user_type, full_name, email, created_date FROM users WHERE username = %s AND password = %s",
-            (username, password)
-        )
-        user_record = cur.fetchone()
+        cur.execute("DELETE FROM daily_risk_rollups WHERE day < %s", (cutoff,))
+        cur.execute("DELETE FROM correlation_moments WHERE day < %s", (cutoff,))
+        
+        # Students whose latest prediction was deleted leave the dashboard counts;
+        # their rows are locked like in _update_latest_predictions
+        cur.execute("""
+            SELECT id FROM students
+            WHERE id IN (SELECT student_id FROM latest_predictions WHERE timestamp < %s)
+            ORDER BY id FOR UPDATE
+        """, (cutoff,))
+        cur.execute(f"""
+            DELETE FROM latest_predictions
+            WHERE student_id = ANY(%s) AND timestamp < %s
+            RETURNING {LATEST_PREDICTION_FIELDS}
+        """, ([row[0] for row in cur.fetchall()], cutoff))
+        deltas = {}
+        for row in cur.fetchall():
+            for key in _dashboard_contributions(_latest_row_to_dict(row)):
+                deltas[key] = deltas.get(key, 0) - 1
+        _add_to_dashboard_counts(cur, deltas)
+    return removed
+
+def delete_observations_before(cutoff, batch_size=10000):
+    """Delete the parent observations dated before ``cutoff`` in batches; returns how many were deleted"""
+    _ensure_indexes_once()
+    
+    return _delete_before('parent_observations', 'date', cutoff, batch_size)
+
+def load_student_predictions():
+    """Load all student prediction data from database; None if the query failed"""
+    return query_student_predictions()
+
+def load_parent_observations():
+    """Load all parent observation data from database; None if the query failed"""
+    return query_parent_observations()
+
+def authenticate_user_db(username, password):
+    """Authenticate user against database"""
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT id, username, user_type, full_name, email, created_date FROM users WHERE username = %s AND password = %s",
+                (username, password)
+            )
+            user_record = cur.fetchone()
         
         if user_record:
             return {
@@ -283,44 +1251,27 @@ def authenticate_user_db(username, password):
     except Exception as e:
         logger.error(f"Error authenticating user: {e}")
         return None
-    finally:
-        conn.close()
 
 def get_database_stats():
-    """Get database statistics"""
-    conn = get_db_connection()
-    if not conn:
-        return {
-            'total_students': 0,
-            'total_predictions': 0,
-            'total_observations': 0,
-            'total_users': 0,
-            'last_prediction_date': None,
-            'last_observation_date': None
-        }
+    """Get database statistics in a single round trip"""
+    _ensure_indexes_once()
     
     try:
-        cur = conn.cursor()
-        
-        # Get counts
-        cur.execute("SELECT COUNT(*) FROM students")
-        total_students = cur.fetchone()[0]
-        
-        cur.execute("SELECT COUNT(*) FROM predictions")
-        total_predictions = cur.fetchone()[0]
-        
-        cur.execute("SELECT COUNT(*) FROM parent_observations")
-        total_observations = cur.fetchone()[0]
-        
-        cur.execute("SELECT COUNT(*) FROM users")
-        total_users = cur.fetchone()[0]
-        
-        # Get latest dates
-        cur.execute("SELECT MAX(timestamp) FROM predictions")
-        latest_prediction = cur.fetchone()[0]
-        
-        cur.execute("SELECT MAX(timestamp) FROM parent_observations")
-        latest_observation = cur.fetchone()[0]
+        with db_connection() as conn:
+            cur = conn.cursor()
+            
+            # MAX(timestamp) is answered from the timestamp indexes
+            cur.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM students),
+                    (SELECT COUNT(*) FROM predictions),
+                    (SELECT COUNT(*) FROM parent_observations),
+                    (SELECT COUNT(*) FROM users),
+                    (SELECT MAX(timestamp) FROM predictions),
+                    (SELECT MAX(timestamp) FROM parent_observations)
+            """)
+            (total_students, total_predictions, total_observations, total_users,
+             latest_prediction, latest_observation) = cur.fetchone()
         
         return {
             'total_students': total_students,
@@ -341,5 +1292,140 @@ def get_database_stats():
             'last_prediction_date': None,
             'last_observation_date': None
         }
-    finally:
-        conn.close()
\ No newline at end of file
+
+def get_dashboard_aggregates():
+    """
+    Count students by risk level and subject band, per grade, from each student's latest prediction
+    
+    The counts are kept in dashboard_counts by the save transactions, so this
+    reads a handful of rows. Returns a list of ``{'grade_level', 'risk_counts',
+    'subject_counts'}`` dicts (subject counts keyed by DASHBOARD_SUBJECTS and
+    SUBJECT_BANDS), or None if the query failed.
+    """
+    _ensure_indexes_once()
+    
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT grade_level, dimension, band, count FROM dashboard_counts WHERE count <> 0")
+            rows = cur.fetchall()
+    except Exception as e:
+        logger.error(f"Error reading dashboard counts: {e}")
+        return None
+    
+    grades = {}
+    for grade_level, dimension, band, count in rows:
+        result = grades.get(grade_level)
+        if result is None:
+            result = grades[grade_level] = {
+                'grade_level': grade_level,
+                'risk_counts': {risk_level: 0 for risk_level in RISK_PROBABILITY_RANGES},
+                'subject_counts': {subject: {name: 0 for name, _ in SUBJECT_BANDS} for subject in DASHBOARD_SUBJECTS}
+            }
+        if dimension == 'risk_level':
+            result['risk_counts'][band] = count
+        elif dimension in result['subject_counts']:
+            result['subject_counts'][dimension][band] = count
+    return list(grades.values())
+
+def query_students_needing_attention(limit=5, risk_levels=None):
+    """
+    Latest prediction of the ``limit`` students with the highest risk probability
+    
+    Reads latest_predictions, which holds one row per student, in the order of
+    its probability index, so only about ``limit`` rows are visited.
+    ``risk_levels`` optionally restricts the result to some risk levels.
+    Returns dicts with ``student_name``, ``grade_level``, ``probability``,
+    ``risk_level``, ``timestamp`` and the subject scores, or None if the query
+    failed.
+    """
+    _ensure_indexes_once()
+    
+    params = []
+    conditions = []
+    for risk_level in (risk_levels or []):
+        low, high = RISK_PROBABILITY_RANGES[risk_level]
+        if high is None:
+            conditions.append("lp.probability >= %s")
+            params.append(low)
+        else:
+            conditions.append("(lp.probability >= %s AND lp.probability < %s)")
+            params.extend([low, high])
+    
+    query = f"""
+        SELECT s.name, lp.timestamp, lp.probability, lp.risk_level, lp.grade_level,
+               lp.math_score, lp.reading_score, lp.writing_score
+        FROM latest_predictions lp
+        JOIN students s ON lp.student_id = s.id
+        WHERE lp.probability IS NOT NULL
+        {"AND (" + " OR ".join(conditions) + ")" if conditions else ""}
+        ORDER BY lp.probability DESC, lp.timestamp DESC
+        LIMIT %s
+    """
+    params.append(limit)
+    
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            rows = cur.fetchall()
+    except Exception as e:
+        logger.error(f"Error querying students needing attention: {e}")
+        return None
+    
+    results = []
+    for row in rows:
+        entry = _latest_row_to_dict(row[1:])
+        entry['student_name'] = row[0]
+        entry['timestamp'] = entry['timestamp'].isoformat()
+        results.append(entry)
+    return results
+
+def list_student_names():
+    """Names of all students, sorted; None if the query failed"""
+    _ensure_indexes_once()
+    
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT name FROM students ORDER BY name")
+            return [row[0] for row in cur.fetchall()]
+    except Exception as e:
+        logger.error(f"Error listing students: {e}")
+        return None
+
+def query_correlation_moments(pairs, columns, start_date=None, end_date=None):
+    """
+    Pairwise count, sums, sums of squares and cross-products of prediction columns
+    
+    ``pairs`` lists ``(i, j)`` indexes into ``columns``; the result is a flat
+    list of ``(n, Σx, Σy, Σx², Σy², Σxy)`` per pair, over rows where both
+    values are present. The statistics are summed from the per-day rows of
+    correlation_moments, kept up to date as predictions are saved, so the cost
+    depends on the number of days in the range rather than on the number of
+    predictions. Returns None if the query failed.
+    """
+    _ensure_indexes_once()
+    
+    params = []
+    conditions = _date_range_clause("day", start_date, end_date, params)
+    query = f"""
+        SELECT x_column, y_column, SUM(n), SUM(sx), SUM(sy), SUM(sxx), SUM(syy), SUM(sxy)
+        FROM correlation_moments
+        {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        GROUP BY x_column, y_column
+    """
+    
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            sums = {(row[0], row[1]): row[2:] for row in cur.fetchall()}
+    except Exception as e:
+        logger.error(f"Error reading correlation statistics: {e}")
+        return None
+    
+    moments = []
+    for i, j in pairs:
+        moments.extend(float(value) for value in sums.get((columns[i], columns[j]), [0.0] * 6))
+    return moments
@@ -2,6 +2,16 @@
 Exact UI components matching the provided EduScan design mockup
 """
 import streamlit as st
+from datetime import datetime
+from html import escape
+from utils.analytics import get_dashboard_summary, get_students_needing_attention
+
+# CSS modifier used for each risk level
+RISK_BADGE_CLASSES = {
+    'Low Risk': 'low',
+    'Medium Risk': 'medium',
+    'High Risk': 'high'
+}
 
 def add_exact_ui_styles():
     """Add CSS styles that exactly match the provided UI design"""
@@ -606,16 +616,20 @@ def create_exact_dashboard_header():
     </div>
     """
 
-def create_exact_stats_cards():
-    """Create stats cards exactly matching the design"""
-    return """
+def create_exact_stats_cards(summary=None):
+    """Create stats cards exactly matching the design, filled from the dashboard summary"""
+    if summary is None:
+        summary = get_dashboard_summary()
+    risk_counts = summary['risk_counts']
+    
+    return f"""
     <div class="stats-grid">
         <div class="stat-card">
             <div class="stat-header">
                 <span class="stat-label">Total</span>
                 <div class="stat-icon total"></div>
             </div>
-            <div class="stat-number">42</div>
+            <div class="stat-number">{summary['total_students']}</div>
             <div class="stat-subtitle">Students</div>
         </div>
         
@@ -624,7 +638,7 @@ def create_exact_stats_cards():
                 <span class="stat-label">On Track</span>
                 <div class="stat-icon on-track"></div>
             </div>
-            <div class="stat-number">28</div>
+            <div class="stat-number">{risk_counts['Low Risk']}</div>
             <div class="stat-subtitle">Students</div>
         </div>
         
@@ -633,7 +647,7 @@ def create_exact_stats_cards():
                 <span class="stat-label">At Risk</span>
                 <div class="stat-icon at-risk"></div>
             </div>
-            <div class="stat-number">10</div>
+            <div class="stat-number">{risk_counts['Medium Risk']}</div>
             <div class="stat-subtitle">Students</div>
         </div>
         
@@ -642,7 +656,7 @@ def create_exact_stats_cards():
                 <span class="stat-label">Intervention</span>
                 <div class="stat-icon intervention"></div>
             </div>
-            <div class="stat-number">4</div>
+            <div class="stat-number">{risk_counts['High Risk']}</div>
             <div class="stat-subtitle">Students</div>
         </div>
     </div>
@@ -683,49 +697,60 @@ def create_exact_recent_assessments():
     </div>
     """
 
-def create_exact_students_attention():
-    """Create students needing attention section exactly as in design"""
-    return """
-    <div class="section-card">
-        <div class="section-header">
-            <h3 class="section-title">Students Needing Attention</h3>
-            <a href="#" class="view-all-link">View All</a>
-        </div>
-        
+def _relative_day(timestamp):
+    """'Today', 'Yesterday' or 'N days ago' for an ISO timestamp"""
+    try:
+        days = (datetime.now().date() - datetime.fromisoformat(timestamp).date()).days
+    except (TypeError, ValueError):
+        return ""
+    if days <= 0:
+        return "Today"
+    if days == 1:
+        return "Yesterday"
+    return f"{days} days ago"
+
+def create_exact_students_attention(students=None, limit=3):
+    """Create students needing attention section exactly as in design, listing the highest-risk students"""
+    if students is None:
+        students = get_students_needing_attention(limit)
+    
+    items = []
+    for student in students:
+        raw_name = student.get('student_name') or ''
+        name = escape(raw_name)
+        initials = escape(''.join(part[0] for part in raw_name.split()[:2]).upper())
+        risk_class = RISK_BADGE_CLASSES.get(student.get('risk_level'), 'low')
+        details = [escape(str(student['grade_level'])) if student.get('grade_level') else None,
+                   f"{student['weakest_subject']} Difficulties" if student.get('weakest_subject') else None]
+        items.append(f"""
         <div class="list-item">
-            <div class="student-avatar risk-high">AH</div>
+            <div class="student-avatar risk-{risk_class}">{initials}</div>
             <div class="item-content">
-                <div class="item-title">Amina Hassan</div>
-                <div class="item-subtitle">Grade 3 • Reading Difficulties</div>
+                <div class="item-title">{name}</div>
+                <div class="item-subtitle">{" • ".join(d for d in details if d)}</div>
             </div>
             <div class="item-meta">
-                <span class="item-time">Today</span>
-                <span class="risk-badge high">High Risk</span>
+                <span class="item-time">{_relative_day(student.get('timestamp'))}</span>
+                <span class="risk-badge {risk_class}">{student.get('risk_level')}</span>
             </div>
         </div>
-        
+        """)
+    
+    if not items:
+        items.append("""
         <div class="list-item">
-            <div class="student-avatar risk-medium">MA</div>
             <div class="item-content">
-                <div class="item-title">Mohamed Ali</div>
-                <div class="item-subtitle">Grade 2 • Math Difficulties</div>
-            </div>
-            <div class="item-meta">
-                <span class="item-time">Yesterday</span>
-                <span class="risk-badge medium">Medium Risk</span>
+                <div class="item-subtitle">No assessments recorded yet</div>
             </div>
         </div>
-        
-        <div class="list-item">
-            <div class="student-avatar risk-low">SF</div>
-            <div class="item-content">
-                <div class="item-title">Sahra Farah</div>
-                <div class="item-subtitle">Grade 4 • Attention Issues</div>
-            </div>
-            <div class="item-meta">
-                <span class="item-time">2 days ago</span>
-                <span class="risk-badge low">Low Risk</span>
-            </div>
+        """)
+    
+    return f"""
+    <div class="section-card">
+        <div class="section-header">
+            <h3 class="section-title">Students Needing Attention</h3>
+            <a href="#" class="view-all-link">View All</a>
         </div>
+        {"".join(items)}
     </div>
     """
\ No newline at end of file
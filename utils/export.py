@@ -0,0 +1,262 @@
+"""
+Streaming data export
+Writes predictions or parent observations to a CSV, gzip-compressed CSV or Parquet
+file chunk by chunk, reading them from the database through a server-side cursor or
+from the file store segment by segment, so memory use stays flat for large exports.
+"""
+
+import os
+import csv
+import gzip
+import tempfile
+from contextlib import closing
+from datetime import datetime
+
+from utils.data_utils import DATABASE_AVAILABLE, iter_stored_predictions, iter_stored_observations
+
+if DATABASE_AVAILABLE:
+    from utils.db_utils import iter_student_predictions, iter_parent_observations
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+EXPORT_CHUNK_ROWS = 5000
+
+# Format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet')
+}
+
+EXPORT_FORMAT_LABELS = {
+    'csv': 'CSV',
+    'csv.gz': 'CSV (gzip)',
+    'parquet': 'Parquet'
+}
+
+# Exported columns per data type: name -> Parquet type ('string', 'float', 'int' or 'bool')
+EXPORT_COLUMNS = {
+    'predictions': {
+        'timestamp': 'string',
+        'student_name': 'string',
+        'grade_level': 'string',
+        'math_score': 'float',
+        'reading_score': 'float',
+        'writing_score': 'float',
+        'attendance': 'float',
+        'behavior': 'float',
+        'literacy': 'float',
+        'prediction': 'int',
+        'probability': 'float',
+        'risk_level': 'string',
+        'notes': 'string'
+    },
+    'observations': {
+        'date': 'string',
+        'child_name': 'string',
+        'homework_completion': 'float',
+        'reading_time': 'float',
+        'focus_level': 'string',
+        'subjects_struggled': 'string',
+        'behavior_rating': 'float',
+        'mood_rating': 'float',
+        'sleep_hours': 'float',
+        'energy_level': 'string',
+        'social_interactions': 'string',
+        'learning_wins': 'string',
+        'challenges_faced': 'string',
+        'strategies_used': 'string',
+        'screen_time': 'float',
+        'physical_activity': 'float',
+        'medication_taken': 'bool',
+        'special_events': 'string',
+        'timestamp': 'string'
+    }
+}
+
+
+def _chunked(records, chunk_size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_file_chunks(data_type, student_name, start_date, end_date, risk_level, chunk_size, columns=None):
+    """
+    Yield filtered records from the file store, reading only the segments in the date range
+
+    With ``columns`` each record is cut down to those fields as it is read.
+    """
+    if data_type == 'predictions':
+        records = iter_stored_predictions(student_name, start_date, end_date, risk_level)
+    else:
+        records = iter_stored_observations(student_name, start_date, end_date)
+    if columns is not None:
+        records = ({column: record.get(column) for column in columns} for record in records)
+    return _chunked(records, chunk_size)
+
+
+def iter_export_chunks(data_type, student_name=None, start_date=None, end_date=None, risk_level=None,
+                       chunk_size=EXPORT_CHUNK_ROWS, columns=None):
+    """
+    Yield the records to export in lists of up to ``chunk_size``, oldest first
+
+    Filters match the views: ``student_name`` (the child's name for
+    observations), an inclusive date range and, for predictions only,
+    ``risk_level``. With ``columns`` the records only hold those fields, and
+    the database only selects them. Database errors propagate so the caller
+    can fall back. The result is a generator holding a pooled connection
+    until it is exhausted, so callers that may stop early must close it,
+    e.g. with contextlib.closing.
+    """
+    if data_type not in EXPORT_COLUMNS:
+        raise ValueError(f"Unknown data type: {data_type}")
+
+    if DATABASE_AVAILABLE:
+        if data_type == 'predictions':
+            return iter_student_predictions(student_name, start_date, end_date, risk_level, chunk_size, columns)
+        return iter_parent_observations(student_name, start_date, end_date, chunk_size, columns)
+    return iter_file_chunks(data_type, student_name, start_date, end_date, risk_level, chunk_size, columns)
+
+
+def _cell(value, kind):
+    """Convert a stored value to the column's export type, or None if it does not fit"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, list):
+        value = '; '.join(str(item) for item in value)
+    try:
+        if kind == 'float':
+            return float(value)
+        if kind == 'int':
+            return int(value)
+        if kind == 'bool':
+            return bool(value)
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+
+def to_export_rows(chunk, columns):
+    """Typed rows holding exactly ``columns`` (a name -> type mapping from EXPORT_COLUMNS)"""
+    return [{column: _cell(record.get(column), kind) for column, kind in columns.items()} for record in chunk]
+
+
+class _CsvWriter:
+    def __init__(self, path, columns, compress):
+        self._file = (gzip.open(path, 'wt', newline='', encoding='utf-8') if compress
+                      else open(path, 'w', newline='', encoding='utf-8'))
+        self._writer = csv.DictWriter(self._file, fieldnames=list(columns))
+        self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetChunkWriter:
+    """Parquet file written one row group per chunk, with the schema of an EXPORT_COLUMNS mapping"""
+
+    ARROW_TYPES = {'string': 'string', 'float': 'float64', 'int': 'int64', 'bool': 'bool_'}
+
+    def __init__(self, path, columns):
+        self._schema = pa.schema([(column, getattr(pa, self.ARROW_TYPES[kind])()) for column, kind in columns.items()])
+        self._writer = pq.ParquetWriter(path, self._schema, compression='snappy')
+
+    def write(self, rows):
+        # Each chunk becomes one row group
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def _open_writer(path, export_format, columns):
+    if export_format == 'parquet':
+        return ParquetChunkWriter(path, columns)
+    return _CsvWriter(path, columns, compress=export_format == 'csv.gz')
+
+
+def _write_export(path, export_format, columns, chunks):
+    writer = _open_writer(path, export_format, columns)
+    rows = 0
+    # Closing the chunks returns a database connection even when writing fails
+    with closing(chunks):
+        try:
+            for chunk in chunks:
+                writer.write(to_export_rows(chunk, columns))
+                rows += len(chunk)
+        finally:
+            writer.close()
+    return rows
+
+
+def export_data(data_type, export_format='csv', student_name=None, start_date=None, end_date=None,
+                risk_level=None, output_path=None, chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Stream an export of predictions or observations to a file
+
+    ``data_type`` is 'predictions' or 'observations' and ``export_format``
+    one of EXPORT_FORMATS. Without ``output_path`` the export is written to a
+    temporary file that the caller should remove when done.
+
+    Returns:
+        dict: ``path``, ``file_name`` (suggested download name), ``format``,
+            ``mime`` and ``rows``; or None with the reason printed if the export failed
+    """
+    if data_type not in EXPORT_COLUMNS or export_format not in EXPORT_FORMATS:
+        print(f"Unsupported export: {data_type} as {export_format}")
+        return None
+    if export_format == 'parquet' and not PARQUET_AVAILABLE:
+        print("Parquet export requires the pyarrow package")
+        return None
+
+    extension, mime = EXPORT_FORMATS[export_format]
+    temporary = output_path is None
+    if temporary:
+        fd, output_path = tempfile.mkstemp(prefix=f"{data_type}_export_", suffix=extension)
+        os.close(fd)
+    columns = EXPORT_COLUMNS[data_type]
+    file_name = f"{data_type}_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
+
+    try:
+        try:
+            rows = _write_export(output_path, export_format, columns, iter_export_chunks(
+                data_type, student_name, start_date, end_date, risk_level, chunk_size))
+        except Exception as e:
+            if not DATABASE_AVAILABLE:
+                raise
+            # Start over from the file store; the partial output is overwritten
+            print(f"Database error, falling back to JSON: {e}")
+            rows = _write_export(output_path, export_format, columns, iter_file_chunks(
+                data_type, student_name, start_date, end_date, risk_level, chunk_size))
+    except Exception as e:
+        print(f"Error exporting {data_type}: {e}")
+        if temporary and os.path.exists(output_path):
+            os.remove(output_path)
+        return None
+
+    return {'path': output_path, 'file_name': file_name, 'format': export_format, 'mime': mime, 'rows': rows}
+
+
+def remove_export(export):
+    """Delete the temporary file of an export_data result (None is ignored)"""
+    if export and os.path.exists(export['path']):
+        os.remove(export['path'])
+
+
+def available_formats():
+    """Export formats usable in this environment"""
+    return [export_format for export_format in EXPORT_FORMATS if export_format != 'parquet' or PARQUET_AVAILABLE]
@@ -1,22 +1,30 @@
 import streamlit as st
-import base64
-import os
 from PIL import Image
 import io
+from utils.image_base64 import get_encoded_image
+from utils.asset_pipeline import find_asset, get_picture_html
+
+HOVER_ZOOM = ("onmouseover=\"this.style.transform='scale({scale})'\" "
+              "onmouseout=\"this.style.transform='scale(1)'\"")
 
 def load_image_as_base64(image_path):
     """Load an image file and convert it to base64 string"""
     try:
-        if os.path.exists(image_path):
-            with open(image_path, "rb") as image_file:
-                return base64.b64encode(image_file.read()).decode()
-        return None
+        # Shared process-wide cache, so each file is encoded once rather than on every rerun
+        return get_encoded_image(image_path)
     except Exception as e:
         st.error(f"Error loading image: {str(e)}")
         return None
 
 def get_image_html(image_path, alt_text="Student Image", width="100%", height="auto", border_radius="15px"):
     """Generate HTML for displaying an image with styling"""
+    entry = find_asset(image_path)
+    if entry is not None:
+        style = (f"width: {width}; height: {height}; border-radius: {border_radius}; "
+                 "box-shadow: 0 8px 25px rgba(0,0,0,0.2); margin: 1rem 0; "
+                 "object-fit: cover; transition: transform 0.3s ease;")
+        return get_picture_html(entry, alt_text, style, extra_attributes=HOVER_ZOOM.format(scale="1.02"))
+    
     base64_image = load_image_as_base64(image_path)
     if base64_image:
         return f"""
@@ -54,6 +62,21 @@ def create_image_gallery(image_paths, alt_texts, columns=3):
     
     for i, (image_path, alt_text) in enumerate(zip(image_paths, alt_texts)):
         with cols[i % columns]:
+            entry = find_asset(image_path)
+            if entry is not None:
+                style = ("width: 100%; height: 200px; border-radius: 15px; "
+                         "box-shadow: 0 8px 25px rgba(0,0,0,0.2); "
+                         "object-fit: cover; transition: transform 0.3s ease;")
+                picture = get_picture_html(entry, alt_text, style, sizes=f"{100 // columns}vw",
+                                           extra_attributes=HOVER_ZOOM.format(scale="1.05"))
+                st.markdown(f"""
+                <div style="text-align: center; margin: 1rem 0;">
+                    {picture}
+                    <p style="margin-top: 0.5rem; font-weight: 500; color: #2c3e50;">{alt_text}</p>
+                </div>
+                """, unsafe_allow_html=True)
+                continue
+            
             base64_image = load_image_as_base64(image_path)
             if base64_image:
                 st.markdown(f"""
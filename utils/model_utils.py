@@ -1,13 +1,33 @@
 import pickle
+import hashlib
+import threading
 import numpy as np
+import pandas as pd
 import os
 import sys
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
+from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+# Model input features, in the order the model expects them
+FEATURE_COLUMNS = ['math_score', 'reading_score', 'writing_score', 'attendance', 'behavior', 'literacy']
+
+# Optional identifying columns carried through batch results
+IDENTITY_COLUMNS = ['student_name', 'grade_level']
+
+# Valid (min, max) range and validation message for each feature
+FEATURE_RULES = [
+    ('math_score', 0, 100, "Math score must be between 0 and 100"),
+    ('reading_score', 0, 100, "Reading score must be between 0 and 100"),
+    ('writing_score', 0, 100, "Writing score must be between 0 and 100"),
+    ('attendance', 0, 100, "Attendance must be between 0 and 100"),
+    ('behavior', 1, 5, "Behavior rating must be between 1 and 5"),
+    ('literacy', 1, 10, "Literacy level must be between 1 and 10")
+]
+
 def get_model_path():
     """Get the correct path for the model file"""
     if getattr(sys, 'frozen', False):
@@ -124,6 +144,75 @@ def load_model():
             'feature_order': ['math_score', 'reading_score', 'writing_score', 'attendance', 'behavior', 'literacy']
         }
 
+# Process-wide model registry shared by every Streamlit session and page
+_model_registry = {
+    'path': None,
+    'signature': None,
+    'sha256': None,
+    'package': None
+}
+_model_registry_lock = threading.Lock()
+
+def _file_signature(path):
+    """Return a cheap (mtime, size) signature for a file, or None if missing"""
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+def _file_sha256(path):
+    """Compute the SHA-256 digest of a file, or None if it cannot be read"""
+    try:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+def get_model():
+    """
+    Get the shared model package, loading it at most once per process.
+
+    The cached package is reused until the model file's mtime/size changes.
+    When they do change, the file's content hash decides whether the model
+    actually needs to be unpickled again (e.g. a touch or re-copy of the
+    same file keeps the cached model).
+    """
+    model_path = get_model_path()
+    signature = _file_signature(model_path)
+    
+    with _model_registry_lock:
+        registry = _model_registry
+        if registry['package'] is not None and registry['path'] == model_path:
+            if signature == registry['signature']:
+                return registry['package']
+            
+            sha256 = _file_sha256(model_path) if signature is not None else None
+            if sha256 is not None and sha256 == registry['sha256']:
+                registry['signature'] = signature
+                return registry['package']
+        
+        model_package = load_model()
+        
+        # load_model may have created the file, so take the signature afterwards
+        model_path = get_model_path()
+        registry['path'] = model_path
+        registry['signature'] = _file_signature(model_path)
+        registry['sha256'] = _file_sha256(model_path) if registry['signature'] is not None else None
+        registry['package'] = model_package
+        return model_package
+
+def clear_model_cache():
+    """Drop the cached model package so the next call reloads it from disk"""
+    with _model_registry_lock:
+        _model_registry['path'] = None
+        _model_registry['signature'] = None
+        _model_registry['sha256'] = None
+        _model_registry['package'] = None
+
 def make_prediction(student_data):
     """
     Make a prediction for a student based on their data
@@ -141,7 +230,7 @@ def make_prediction(student_data):
         tuple: (prediction, probability) where prediction is 0/1 and probability is float
     """
     try:
-        model_package = load_model()
+        model_package = get_model()
         model = model_package['model']
         scaler = model_package.get('scaler')
         
@@ -190,10 +279,215 @@ def make_prediction(student_data):
         
         return prediction, risk_probability
 
+def get_risk_level(probability):
+    """Map a risk probability to its (untranslated) risk level label"""
+    if probability < 0.3:
+        return 'Low Risk'
+    elif probability < 0.7:
+        return 'Medium Risk'
+    return 'High Risk'
+
+def _rule_based_batch(features):
+    """Vectorized version of the rule-based fallback used by make_prediction"""
+    academic_avg = features[:, 0:3].mean(axis=1)
+    
+    risk_factors = (
+        (academic_avg < 70) * 2 +
+        (features[:, 3] < 80) +
+        (features[:, 4] < 3) +
+        (features[:, 5] < 5)
+    )
+    
+    risk_probability = np.minimum(risk_factors / 5.0, 1.0)
+    prediction = (risk_probability > 0.5).astype(int)
+    return prediction, risk_probability
+
+def predict_batch(df):
+    """
+    Score a whole DataFrame of students in one vectorized pass
+    
+    Args:
+        df (DataFrame): Must contain the FEATURE_COLUMNS; other columns are ignored
+    
+    Returns:
+        DataFrame: Indexed like ``df`` with columns
+            - prediction: Predicted class (nullable int, missing for invalid rows)
+            - probability: Risk probability (NaN for invalid rows)
+            - risk_level: 'Low Risk' / 'Medium Risk' / 'High Risk' (None for invalid rows)
+            - error: Validation message for rows that could not be scored, else None
+    """
+    missing_columns = [col for col in FEATURE_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+    
+    features = df[FEATURE_COLUMNS].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    n_rows = len(features)
+    
+    # Validate every row at once; the first failing rule wins, like validate_student_data
+    errors = np.full(n_rows, None, dtype=object)
+    valid = ~np.isnan(features).any(axis=1)
+    errors[~valid] = "Missing or non-numeric feature value"
+    for i, (field, low, high, message) in enumerate(FEATURE_RULES):
+        out_of_range = valid & ((features[:, i] < low) | (features[:, i] > high))
+        errors[out_of_range] = message
+        valid &= ~out_of_range
+    
+    predictions = np.full(n_rows, -1, dtype=int)
+    probabilities = np.full(n_rows, np.nan)
+    
+    if valid.any():
+        valid_features = features[valid]
+        try:
+            model_package = get_model()
+            model = model_package['model']
+            scaler = model_package.get('scaler')
+            
+            if scaler is not None:
+                valid_features = scaler.transform(valid_features)
+            
+            # One forest pass: the label is the argmax of predict_proba,
+            # which is exactly what model.predict would return
+            prediction_proba = model.predict_proba(valid_features)
+            predictions[valid] = model.classes_[prediction_proba.argmax(axis=1)]
+            probabilities[valid] = prediction_proba[:, 1] if prediction_proba.shape[1] > 1 else prediction_proba[:, 0]
+        
+        except Exception as e:
+            print(f"Error making batch prediction: {e}")
+            predictions[valid], probabilities[valid] = _rule_based_batch(features[valid])
+    
+    risk_levels = np.full(n_rows, None, dtype=object)
+    risk_levels[valid & (probabilities < 0.3)] = 'Low Risk'
+    risk_levels[valid & (probabilities >= 0.3) & (probabilities < 0.7)] = 'Medium Risk'
+    risk_levels[valid & (probabilities >= 0.7)] = 'High Risk'
+    
+    prediction_column = pd.array(predictions, dtype='Int64')
+    prediction_column[~valid] = pd.NA
+    
+    return pd.DataFrame({
+        'prediction': prediction_column,
+        'probability': probabilities,
+        'risk_level': risk_levels,
+        'error': errors
+    }, index=df.index)
+
+def format_batch_results(df, scores):
+    """
+    Build the user-facing batch results table from predict_batch output
+    
+    Only rows that were scored successfully are kept. Student_ID is the
+    1-based row number in the uploaded file.
+    """
+    scored = scores[scores['error'].isna()]
+    identity_columns = [col for col in IDENTITY_COLUMNS if col in df.columns]
+    results_df = df.loc[scored.index, identity_columns + FEATURE_COLUMNS].copy()
+    results_df.insert(0, 'Student_ID', scored.index + 1)
+    results_df.insert(1 + len(identity_columns), 'Risk_Level', scored['risk_level'])
+    results_df.insert(2 + len(identity_columns), 'Risk_Probability', scored['probability'].map(lambda p: f"{p:.1%}"))
+    return results_df
+
+def _text_value(value):
+    """Stripped text of a CSV cell, or None if it is empty; whole numbers lose their '.0'"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() or None
+
+def build_prediction_records(df, scores, timestamp=None, notes="Batch upload"):
+    """
+    Turn scored batch rows into prediction records ready to be saved
+    
+    Rows without a student_name value are left out, since a made-up name would
+    merge unrelated uploads into one student's history. Grade levels are kept
+    as text, so numeric grades are saved as '5' rather than dropped.
+    """
+    timestamp = timestamp or datetime.now().isoformat()
+    scored = scores[scores['error'].isna()]
+    rows = df.loc[scored.index]
+    
+    names = rows['student_name'] if 'student_name' in rows.columns else pd.Series(index=rows.index, dtype=object)
+    grades = rows['grade_level'] if 'grade_level' in rows.columns else pd.Series(index=rows.index, dtype=object)
+    features = rows[FEATURE_COLUMNS].apply(pd.to_numeric, errors='coerce')
+    
+    records = []
+    for name, grade, prediction, probability, risk_level, values in zip(
+            names, grades, scored['prediction'], scored['probability'],
+            scored['risk_level'], features.itertuples(index=False, name=None)):
+        name = _text_value(name)
+        if name is None:
+            continue
+        records.append({
+            'timestamp': timestamp,
+            'student_name': name,
+            'grade_level': _text_value(grade) or 'Unknown',
+            'prediction': int(prediction),
+            'probability': float(probability),
+            'risk_level': risk_level,
+            'notes': notes,
+            **{col: value.item() if hasattr(value, 'item') else value for col, value in zip(FEATURE_COLUMNS, values)}
+        })
+    return records
+
+def predict_csv_in_chunks(source, output_path, chunksize=20000, total_bytes=None, progress_callback=None, chunk_callback=None):
+    """
+    Score a CSV of any size in fixed-size chunks, streaming results to disk
+    
+    Only one chunk is held in memory at a time, so peak memory is bounded by
+    ``chunksize`` rather than by the size of the upload.
+    
+    Args:
+        source: Path or binary file-like object with the student CSV
+        output_path (str): File the formatted results are written to
+        chunksize (int): Number of rows read and scored per chunk
+        total_bytes (int): Size of ``source``, used to report progress
+        progress_callback (callable): Called as ``progress_callback(fraction, rows_processed)``
+        chunk_callback (callable): Called as ``chunk_callback(chunk, scores)`` after each
+            chunk is scored, e.g. to persist its predictions
+    
+    Returns:
+        dict: Summary with total_rows, scored_rows, failed_rows, risk_counts and
+            the first few (row number, error) pairs under 'errors'
+    """
+    summary = {
+        'total_rows': 0,
+        'scored_rows': 0,
+        'failed_rows': 0,
+        'risk_counts': {},
+        'errors': []
+    }
+    
+    with open(output_path, 'w', newline='', encoding='utf-8') as output:
+        for chunk_number, chunk in enumerate(pd.read_csv(source, chunksize=chunksize)):
+            scores = predict_batch(chunk)
+            if chunk_callback is not None:
+                chunk_callback(chunk, scores)
+            results_df = format_batch_results(chunk, scores)
+            results_df.to_csv(output, header=(chunk_number == 0), index=False)
+            
+            failed = scores['error'].dropna()
+            summary['total_rows'] += len(chunk)
+            summary['scored_rows'] += len(results_df)
+            summary['failed_rows'] += len(failed)
+            for risk_level, count in results_df['Risk_Level'].value_counts().items():
+                summary['risk_counts'][risk_level] = summary['risk_counts'].get(risk_level, 0) + int(count)
+            for idx, error in failed.head(10 - len(summary['errors'])).items():
+                summary['errors'].append((idx + 1, error))
+            
+            if progress_callback is not None:
+                fraction = None
+                if total_bytes and hasattr(source, 'tell'):
+                    fraction = min(source.tell() / total_bytes, 1.0)
+                progress_callback(fraction, summary['total_rows'])
+    
+    if progress_callback is not None:
+        progress_callback(1.0, summary['total_rows'])
+    
+    return summary
+
 def get_feature_importance():
     """Get feature importance from the model"""
     try:
-        model_package = load_model()
+        model_package = get_model()
         model = model_package['model']
         
         if hasattr(model, 'feature_importances_'):
@@ -224,25 +518,14 @@ def get_feature_importance():
 
 def validate_student_data(student_data):
     """Validate student data before making prediction"""
-    required_fields = ['math_score', 'reading_score', 'writing_score', 'attendance', 'behavior', 'literacy']
-    
     # Check if all required fields are present
-    for field in required_fields:
+    for field in FEATURE_COLUMNS:
         if field not in student_data:
             raise ValueError(f"Missing required field: {field}")
     
     # Validate ranges
-    if not (0 <= student_data['math_score'] <= 100):
-        raise ValueError("Math score must be between 0 and 100")
-    if not (0 <= student_data['reading_score'] <= 100):
-        raise ValueError("Reading score must be between 0 and 100")
-    if not (0 <= student_data['writing_score'] <= 100):
-        raise ValueError("Writing score must be between 0 and 100")
-    if not (0 <= student_data['attendance'] <= 100):
-        raise ValueError("Attendance must be between 0 and 100")
-    if not (1 <= student_data['behavior'] <= 5):
-        raise ValueError("Behavior rating must be between 1 and 5")
-    if not (1 <= student_data['literacy'] <= 10):
-        raise ValueError("Literacy level must be between 1 and 10")
+    for field, low, high, message in FEATURE_RULES:
+        if not (low <= student_data[field] <= high):
+            raise ValueError(message)
     
     return True
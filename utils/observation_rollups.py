@@ -0,0 +1,141 @@
+"""
+Rollups of parent observations
+Calendar-week, calendar-month and rolling 7/28-day statistics of every numeric
+observation field, computed in one pass over a daily resample of a child's
+observation frame and cached per child until that child's observations change.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.analytics import OBSERVATION_NUMERIC_FIELDS, get_child_observations
+from utils.archive import archive_version, hot_start_date, read_history
+
+# Window name -> calendar resample rule
+CALENDAR_WINDOWS = {
+    'week': 'W',
+    'month': 'MS'
+}
+
+# Window name -> length of the trailing window in days
+ROLLING_WINDOWS = {
+    'rolling_7': 7,
+    'rolling_28': 28
+}
+
+STATISTICS = ['mean', 'var', 'slope', 'count']
+
+
+def _daily_moments(frame):
+    """
+    Per-day sufficient statistics of the numeric fields
+
+    Returns a day-indexed DataFrame with ``(n, t, v, tt, tv, vv)`` column
+    groups, where ``t`` is the day number, and a Series flagging the days with
+    an observation, both covering every calendar day between the first and
+    last observation.
+    """
+    values = frame[OBSERVATION_NUMERIC_FIELDS].astype(np.float64)
+    present = values.notna()
+    days = (frame['date'] - pd.Timestamp('1970-01-01')).dt.days.astype(np.float64)
+    t = present.mul(days, axis=0)
+    v = values.fillna(0.0)
+
+    moments = pd.concat({
+        'n': present.astype(np.float64),
+        't': t,
+        'v': v,
+        'tt': t.mul(days, axis=0),
+        'tv': t * v,
+        'vv': v * v
+    }, axis=1)
+    daily = moments.groupby(frame['date']).sum().resample('D').sum()
+    observed = frame.groupby('date').size().reindex(daily.index, fill_value=0).gt(0).astype(int)
+    return daily, observed
+
+
+def _statistics(sums, observed_days, calendar_days):
+    """Mean, sample variance, least-squares slope per day and count from summed moments"""
+    n, t, v, tt, tv, vv = (sums[key] for key in ('n', 't', 'v', 'tt', 'tv', 'vv'))
+    counted = n.where(n > 0)
+    mean = v / counted
+    var = (vv - v * v / counted) / (counted - 1).where(counted > 1)
+    spread = counted * tt - t * t
+    slope = (counted * tv - t * v) / spread.where(spread > 1e-9)
+
+    rollup = pd.concat({'mean': mean, 'var': var.clip(lower=0), 'slope': slope, 'count': n.astype(int)}, axis=1)
+    rollup['missing_days'] = (calendar_days - observed_days).astype(int)
+    return rollup
+
+
+def compute_rollups(frame):
+    """
+    Calendar and rolling rollups of an observation frame
+
+    Returns ``{window: DataFrame}`` for the windows in CALENDAR_WINDOWS and
+    ROLLING_WINDOWS. Each DataFrame is indexed by the resample label (the
+    Sunday ending a week, the first day of a month) or, for rolling windows,
+    by the last day of the window, and has a
+    ``(statistic, field)`` column for every statistic in STATISTICS and
+    numeric field, plus ``missing_days``: days in the window without any
+    observation, counted from the child's first observation.
+    """
+    if frame.empty or frame['date'].isna().all():
+        return {}
+
+    daily, observed = _daily_moments(frame)
+    days = pd.Series(1, index=daily.index)
+
+    rollups = {}
+    for window, rule in CALENDAR_WINDOWS.items():
+        rollups[window] = _statistics(daily.resample(rule).sum(), observed.resample(rule).sum(),
+                                      days.resample(rule).sum())
+    for window, length in ROLLING_WINDOWS.items():
+        rollups[window] = _statistics(daily.rolling(length, min_periods=1).sum(),
+                                      observed.rolling(length, min_periods=1).sum(),
+                                      days.rolling(length, min_periods=1).sum())
+    return rollups
+
+
+# Columns read for the rollups
+ROLLUP_COLUMNS = ['date', 'timestamp'] + OBSERVATION_NUMERIC_FIELDS
+
+# child name -> (observation signature, rollups)
+_rollup_cache = {}
+_rollup_lock = threading.Lock()
+
+
+def _signature(observations):
+    """Changes whenever an observation is added to or removed from the child's recent history"""
+    return len(observations), max((obs.get('timestamp') or obs.get('date') or '' for obs in observations), default='')
+
+
+def get_child_rollups(child_name):
+    """
+    Rollups of a child's whole observation history, cached until the child gets a new observation
+
+    The history is read through the archive tier, so archived months only cost
+    the numeric columns of the child's rows. New observations only land in the
+    hot months, so the cache is keyed on those plus the archive version. See
+    compute_rollups for the returned structure; empty when the child has no
+    observations.
+    """
+    recent = get_child_observations(child_name, hot_start_date('observations'))
+    signature = (archive_version(), _signature(recent))
+
+    with _rollup_lock:
+        cached = _rollup_cache.get(child_name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+    history = read_history('observations', ROLLUP_COLUMNS, student_name=child_name)
+    history['date'] = pd.to_datetime(history['date'].str[:10], format='%Y-%m-%d', errors='coerce')
+    rollups = compute_rollups(history)
+
+    with _rollup_lock:
+        if len(_rollup_cache) > 256:
+            _rollup_cache.clear()
+        _rollup_cache[child_name] = (signature, rollups)
+    return rollups
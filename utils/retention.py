@@ -0,0 +1,182 @@
+"""
+Data retention
+Per-dataset retention policies for predictions and parent observations, applied by a
+background worker or from the command line. Old records are removed from PostgreSQL
+with batched range deletes on indexed columns, from the file store and the Parquet
+archive by dropping whole months and rewriting only the month of the cutoff. Each run
+writes a report of what it removed to data/retention_report.json.
+
+    python -m utils.retention                 # apply the configured policies
+    python -m utils.retention --days 365      # keep one year of both datasets
+"""
+
+import os
+import time
+import threading
+from datetime import date, datetime, timedelta
+
+from utils.data_utils import DATABASE_AVAILABLE, get_data_directory, get_prediction_store, get_observation_store
+from utils.archive import remove_archived_before
+from utils.storage import atomic_write_json, read_json_file
+
+if DATABASE_AVAILABLE:
+    from utils.db_utils import delete_predictions_before, delete_observations_before
+
+
+def _env_days(name):
+    value = os.environ.get(name, '').strip()
+    return int(value) if value.isdigit() and int(value) > 0 else None
+
+
+# Dataset -> policy; records older than ``max_age_days`` are removed, None keeps everything
+RETENTION_POLICIES = {
+    'predictions': {'max_age_days': _env_days('EDUSCAN_RETENTION_PREDICTIONS_DAYS')},
+    'observations': {'max_age_days': _env_days('EDUSCAN_RETENTION_OBSERVATIONS_DAYS')}
+}
+
+# Hours between runs of the background worker
+RETENTION_INTERVAL_HOURS = 24
+
+REPORT_NAME = 'retention_report.json'
+
+# Dataset -> file store getter
+_FILE_STORES = {
+    'predictions': get_prediction_store,
+    'observations': get_observation_store
+}
+
+
+def _report_path():
+    return os.path.join(get_data_directory(), REPORT_NAME)
+
+
+def retention_cutoff(max_age_days, today=None):
+    """First day that is kept under a policy of ``max_age_days``"""
+    return (today or date.today()) - timedelta(days=max_age_days)
+
+
+def _delete_from_database(dataset, cutoff):
+    delete = delete_predictions_before if dataset == 'predictions' else delete_observations_before
+    return delete(cutoff)
+
+
+def _apply_policy(dataset, cutoff):
+    """Remove a dataset's records dated before ``cutoff`` from every tier; returns the dataset's report"""
+    report = {'cutoff': cutoff.isoformat(), 'database': None, 'files': 0, 'archive_months': [], 'archive_rows': 0,
+              'errors': []}
+
+    if DATABASE_AVAILABLE:
+        try:
+            report['database'] = _delete_from_database(dataset, cutoff)
+        except Exception as e:
+            report['errors'].append(f"database: {e}")
+
+    # The file store also holds the records saved while the database was unreachable
+    try:
+        report['files'] = _FILE_STORES[dataset]().remove_before(cutoff.isoformat())
+    except Exception as e:
+        report['errors'].append(f"files: {e}")
+
+    # Like the file store, the archive only rewrites the partitions of the cutoff month
+    try:
+        report['archive_months'], report['archive_rows'] = remove_archived_before(dataset, cutoff.isoformat())
+    except Exception as e:
+        report['errors'].append(f"archive: {e}")
+    return report
+
+
+_run_lock = threading.Lock()
+
+
+def apply_retention(policies=None, today=None):
+    """
+    Apply retention policies now and return the report
+
+    ``policies`` defaults to RETENTION_POLICIES. The report holds, per dataset
+    with a policy, the ``cutoff`` date, the rows deleted from the ``database``
+    (None without one), the records removed from the ``files``, the dropped
+    ``archive_months``, the rows removed from the archive (``archive_rows``)
+    and any ``errors``. Runs are serialized; the latest report is also saved
+    for get_last_retention_report.
+    """
+    policies = RETENTION_POLICIES if policies is None else policies
+    with _run_lock:
+        report = {'started': datetime.now().isoformat(), 'datasets': {}}
+        for dataset, policy in policies.items():
+            max_age_days = (policy or {}).get('max_age_days')
+            if dataset not in _FILE_STORES or not max_age_days:
+                continue
+            report['datasets'][dataset] = _apply_policy(dataset, retention_cutoff(max_age_days, today))
+        report['finished'] = datetime.now().isoformat()
+
+        try:
+            atomic_write_json(_report_path(), report)
+        except Exception as e:
+            print(f"Error saving retention report: {e}")
+    return report
+
+
+def get_last_retention_report():
+    """Report of the most recent retention run, or None"""
+    return read_json_file(_report_path(), default=None)
+
+
+def start_retention(policies=None):
+    """Apply retention policies in a background thread and return the thread"""
+    thread = threading.Thread(target=apply_retention, args=(policies,), name='retention-run', daemon=True)
+    thread.start()
+    return thread
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _retention_loop(interval_hours):
+    while True:
+        try:
+            apply_retention()
+        except Exception as e:
+            print(f"Error in background retention: {e}")
+        time.sleep(interval_hours * 3600)
+
+
+def schedule_retention(interval_hours=RETENTION_INTERVAL_HOURS):
+    """Apply the configured policies from a daemon thread every ``interval_hours``, once per process"""
+    global _worker
+    if not any((policy or {}).get('max_age_days') for policy in RETENTION_POLICIES.values()):
+        return False
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_retention_loop, args=(interval_hours,),
+                                       name='retention-worker', daemon=True)
+            _worker.start()
+    return True
+
+
+def _print_report(report):
+    if not report['datasets']:
+        print("No retention policy configured")
+    for dataset, result in report['datasets'].items():
+        removed = [f"{result['files']} from files"]
+        if result['database'] is not None:
+            removed.insert(0, f"{result['database']} from the database")
+        if result['archive_rows']:
+            removed.append(f"{result['archive_rows']} from the archive")
+        print(f"{dataset}: removed records before {result['cutoff']}: {', '.join(removed)}")
+        for error in result['errors']:
+            print(f"  error: {error}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    arguments = sys.argv[1:]
+    if arguments[:1] == ['--days'] and len(arguments) == 2 and arguments[1].isdigit():
+        days = int(arguments[1])
+        _print_report(apply_retention({dataset: {'max_age_days': days} for dataset in _FILE_STORES}))
+    elif not arguments:
+        _print_report(apply_retention())
+    else:
+        print("Usage: python -m utils.retention [--days N]")
+        sys.exit(2)
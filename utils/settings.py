@@ -0,0 +1,169 @@
+"""
+Application settings service
+Keeps the parsed contents of data/app_settings.json in memory for the whole process.
+Writes are persisted atomically under the shared file lock, and edits made by other
+processes or by hand are picked up by watching the file's modification time.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+
+from utils.storage import atomic_write_json, get_lock
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_FILE = os.path.join("data", "app_settings.json")
+
+DEFAULT_SETTINGS = {'language': 'English', 'theme': 'Modern', 'offline_mode': False}
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class SettingsStore:
+    """
+    In-memory settings backed by a JSON file
+
+    The file is stat'ed at most once every ``poll_interval`` seconds and only
+    re-read when its mtime or size changed, so reading settings on the render
+    path normally costs no disk I/O. Subscribers are called with the new
+    settings whenever they change, whether through ``save``/``update`` or an
+    external edit.
+    """
+
+    def __init__(self, path=SETTINGS_FILE, defaults=None, poll_interval=2.0):
+        self.path = path
+        self.defaults = dict(DEFAULT_SETTINGS if defaults is None else defaults)
+        self.poll_interval = poll_interval
+
+        self._lock = threading.RLock()
+        self._settings = None
+        self._signature = None
+        self._last_check = 0.0
+        self._subscribers = []
+
+    def _read_file(self):
+        """Parse the settings file, or return None if it is missing or unreadable"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Error reading settings from {self.path}: {e}")
+            return None
+        if not isinstance(data, dict):
+            logger.error(f"Ignoring settings in {self.path}: expected a JSON object")
+            return None
+        return data
+
+    def _refresh(self, force=False):
+        """Reload the file if it changed since it was last read; returns True on a change"""
+        now = time.monotonic()
+        if not force and self._settings is not None and now - self._last_check < self.poll_interval:
+            return False
+        self._last_check = now
+
+        signature = _file_signature(self.path)
+        if self._settings is not None and signature == self._signature:
+            return False
+
+        data = self._read_file()
+        if data is None and self._settings is not None and signature is not None:
+            # Keep the last good settings while the file is being rewritten or is broken
+            return False
+
+        previous = self._settings
+        self._settings = dict(self.defaults, **(data or {}))
+        self._signature = signature
+        return previous is not None and previous != self._settings
+
+    def get_all(self):
+        """Return a copy of the current settings"""
+        with self._lock:
+            changed = self._refresh()
+            settings = dict(self._settings)
+        if changed:
+            self._notify(settings)
+        return settings
+
+    def get(self, key, default=None):
+        """Return one setting"""
+        return self.get_all().get(key, default)
+
+    def save(self, settings):
+        """Replace the settings and persist them atomically; returns True on success"""
+        with self._lock:
+            try:
+                with get_lock(self.path):
+                    atomic_write_json(self.path, settings)
+            except Exception as e:
+                logger.error(f"Error saving settings: {e}")
+                return False
+            changed = self._settings != settings
+            self._settings = dict(settings)
+            self._signature = _file_signature(self.path)
+            self._last_check = time.monotonic()
+            snapshot = dict(self._settings)
+        if changed:
+            self._notify(snapshot)
+        return True
+
+    def update(self, **changes):
+        """Change some settings, re-reading the file first so concurrent edits to other keys survive"""
+        with self._lock:
+            with get_lock(self.path):
+                self._refresh(force=True)
+                settings = dict(self._settings, **changes)
+                return self.save(settings)
+
+    def subscribe(self, callback):
+        """Call ``callback(settings)`` on every change; returns a function that unsubscribes it"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def _notify(self, settings):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(dict(settings))
+            except Exception as e:
+                logger.error(f"Settings subscriber failed: {e}")
+
+
+_settings_store = None
+_settings_store_lock = threading.Lock()
+
+
+def get_settings_store():
+    """Return the process-wide settings store"""
+    global _settings_store
+    with _settings_store_lock:
+        if _settings_store is None:
+            _settings_store = SettingsStore()
+        return _settings_store
+
+
+def load_app_settings():
+    """Load application settings (served from memory)"""
+    return get_settings_store().get_all()
+
+
+def save_app_settings(settings):
+    """Save application settings"""
+    return get_settings_store().save(settings)
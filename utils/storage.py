@@ -0,0 +1,805 @@
+"""
+File storage backends for the JSON fallback path
+Records are kept as JSON Lines in monthly segment files so a save is a single append.
+Every writer holds an inter-process lock and replaces files atomically, so several
+Streamlit processes can share the data directory without losing or corrupting records.
+"""
+
+import os
+import re
+import json
+import time
+import atexit
+import tempfile
+import threading
+import logging
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Backend used when EDUSCAN_STORAGE_BACKEND is not set
+DEFAULT_BACKEND = 'jsonl'
+
+# Record fields used to place a record in a monthly segment, in order of preference
+DATASET_TIMESTAMP_FIELDS = {
+    'student_data': ('timestamp', 'assessment_date'),
+    'parent_observations': ('date', 'observation_date', 'timestamp')
+}
+
+_MONTH_PATTERN = re.compile(r'^(\d{4})-(\d{2})')
+
+
+def record_month(record, timestamp_fields=('timestamp',)):
+    """Return the 'YYYY-MM' segment key for a record, defaulting to the current month"""
+    for field in timestamp_fields:
+        value = record.get(field)
+        if isinstance(value, str):
+            match = _MONTH_PATTERN.match(value)
+            if match and 1 <= int(match.group(2)) <= 12:
+                return f"{match.group(1)}-{match.group(2)}"
+    return datetime.now().strftime('%Y-%m')
+
+
+def dated_before(record, timestamp_fields, cutoff):
+    """True if the first date field of a record is earlier than ``cutoff`` ('YYYY-MM-DD'); undated records are not"""
+    for field in timestamp_fields:
+        value = record.get(field)
+        if isinstance(value, str) and _MONTH_PATTERN.match(value):
+            return value[:10] < cutoff
+    return False
+
+
+def _count_lines(path):
+    count = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            count += block.count(b'\n')
+    return count
+
+
+class InterProcessLock:
+    """
+    Re-entrant lock shared by threads and processes
+
+    Threads of one process serialize on an RLock; the outermost holder also
+    takes an exclusive OS lock on ``<path>.lock`` so other processes wait too.
+    Use get_lock() so every caller in a process shares one instance per path.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._lock_file = None
+
+    def __enter__(self):
+        self._rlock.acquire()
+        try:
+            if self._depth == 0:
+                os.makedirs(os.path.dirname(self.lock_path) or '.', exist_ok=True)
+                lock_file = open(self.lock_path, 'a+b')
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                self._lock_file = lock_file
+            self._depth += 1
+        except Exception:
+            self._rlock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self._depth -= 1
+            if self._depth == 0 and self._lock_file is not None:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self._lock_file.seek(0)
+                    msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+                self._lock_file.close()
+                self._lock_file = None
+        finally:
+            self._rlock.release()
+        return False
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def get_lock(path):
+    """Return the process-wide InterProcessLock guarding a file or directory"""
+    key = os.path.abspath(path)
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = InterProcessLock(key)
+        return lock
+
+
+def _fsync_directory(directory):
+    """Persist a rename in ``directory`` where the platform supports it"""
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path, data):
+    """Write a file via temp file + fsync + rename, so readers never see a partial file"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def atomic_write_json(path, data, indent=2):
+    """Atomically replace ``path`` with ``data`` serialized as JSON"""
+    atomic_write_bytes(path, json.dumps(data, indent=indent, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+def quarantine_file(path):
+    """Move an unreadable file aside instead of overwriting it, returning the new path"""
+    quarantine_path = f"{path}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    os.replace(path, quarantine_path)
+    logger.error(f"Moved unreadable file {path} to {quarantine_path}")
+    return quarantine_path
+
+
+def read_json_file(path, default=None):
+    """
+    Read a JSON document, returning ``default`` if the file is missing or empty
+
+    A file that cannot be parsed is quarantined (renamed to ``.corrupt-<time>``)
+    so its contents can still be recovered by hand.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read().strip()
+    except FileNotFoundError:
+        return default
+    if not content:
+        return default
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        quarantine_file(path)
+        return default
+
+
+def _last_byte(path):
+    """Return the final byte of a file, or None if it is empty or missing"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return None
+            f.seek(-1, os.SEEK_END)
+            return f.read(1)
+    except FileNotFoundError:
+        return None
+
+
+def _read_json_lines(path):
+    """Read the complete lines of a JSON Lines file, skipping torn or corrupt ones"""
+    records = []
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return records
+    with f:
+        for line in f:
+            if not line.endswith(b'\n') or not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+    return records
+
+
+def _file_state(path):
+    """(inode, size, mtime) of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def summarize_records(records, field='timestamp'):
+    """Return ``(record_count, latest_value)`` where latest is the greatest string ``field``"""
+    count = 0
+    latest = None
+    for record in records:
+        count += 1
+        value = record.get(field) if isinstance(record, dict) else None
+        if isinstance(value, str) and (latest is None or value > latest):
+            latest = value
+    return count, latest
+
+
+class JsonArrayStore:
+    """
+    Legacy backend: the whole dataset is one JSON array file
+
+    Writes first go to an fsync'ed write-ahead log (``<path>.wal``) and are then
+    checkpointed into the array with an atomic replace, so a crash at any point
+    leaves either the old or the new file plus a log that is replayed on the
+    next access.
+    """
+
+    def __init__(self, path, timestamp_fields=('timestamp',)):
+        self.path = path
+        self.wal_path = f"{path}.wal"
+        self.timestamp_fields = timestamp_fields
+        self._lock = get_lock(path)
+        self._stats_cache = {}
+
+    def append(self, record):
+        """Add one record"""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Add several records with a single checkpoint"""
+        with self._lock:
+            payload = ''.join(json.dumps(r, ensure_ascii=False, default=str) + '\n' for r in records)
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.wal_path, 'ab') as wal:
+                wal.write(payload.encode('utf-8'))
+                wal.flush()
+                os.fsync(wal.fileno())
+            self._checkpoint()
+
+    def _read_array(self):
+        data = read_json_file(self.path, default=[])
+        return data if isinstance(data, list) else []
+
+    def _checkpoint(self):
+        """Fold the write-ahead log into the array file"""
+        pending = _read_json_lines(self.wal_path)
+        if pending:
+            atomic_write_json(self.path, self._read_array() + pending)
+        if os.path.exists(self.wal_path):
+            os.remove(self.wal_path)
+
+    def iter_records(self):
+        """Yield every stored record"""
+        for record in self.load_all():
+            yield record
+
+    def iter_months(self, first_month=None, last_month=None):
+        """Yield candidate records for a month range; this backend cannot prune, so all of them"""
+        return self.iter_records()
+
+    def load_all(self):
+        """Return every stored record as a list, including not yet checkpointed ones"""
+        with self._lock:
+            return self._read_array() + _read_json_lines(self.wal_path)
+
+    def rewrite(self, records):
+        """Replace the stored records"""
+        with self._lock:
+            atomic_write_json(self.path, list(records))
+            if os.path.exists(self.wal_path):
+                os.remove(self.wal_path)
+
+    def update(self, func):
+        """Replace the records with ``func(records)`` while holding the lock"""
+        with self._lock:
+            records = func(self.load_all())
+            self.rewrite(records)
+            return records
+
+    def filter(self, keep):
+        """Keep only records for which ``keep(record)`` is true; returns (kept, removed)"""
+        with self._lock:
+            records = self.load_all()
+            kept = [r for r in records if keep(r)]
+            self.rewrite(kept)
+            return len(kept), len(records) - len(kept)
+
+    def remove_before(self, cutoff):
+        """Remove the records dated before ``cutoff`` ('YYYY-MM-DD'); returns how many were removed"""
+        return self.filter(lambda record: not dated_before(record, self.timestamp_fields, cutoff))[1]
+
+    def flush(self):
+        """Nothing is buffered by this backend"""
+        return None
+
+    def stats(self, field='timestamp'):
+        """Return ``(record_count, latest_value)``, re-reading the file only after it changed"""
+        signature = (_file_state(self.path), _file_state(self.wal_path))
+        cached = self._stats_cache.get(field)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        result = summarize_records(self.load_all(), field)
+        self._stats_cache[field] = (signature, result)
+        return result
+
+    def read_since(self, cursor=None):
+        """
+        Return ``(records, cursor, reset)`` like JsonLinesStore.read_since
+
+        A single array file cannot be read incrementally, so any change since
+        ``cursor`` returns every record with ``reset`` set.
+        """
+        signature = (_file_state(self.path), _file_state(self.wal_path))
+        if cursor is not None and cursor == signature:
+            return [], cursor, False
+        return self.load_all(), signature, True
+
+
+class JsonLinesStore:
+    """
+    Append-only JSON Lines backend
+
+    Records live in ``<directory>/<YYYY-MM>.jsonl`` segments, one JSON document
+    per line. Saving appends a single line to the current segment, so the cost
+    of a save does not depend on how much history is stored. Lines are flushed
+    to the OS on every append and fsync'ed in batches of ``fsync_batch`` records
+    or every ``fsync_interval`` seconds, whichever comes first.
+
+    Segments in which a torn or unparsable line was seen are compacted (rewritten
+    without the bad lines) every ``compact_interval`` appends. An existing
+    ``legacy_path`` JSON array file is migrated into segments on first use.
+    """
+
+    def __init__(self, directory, legacy_path=None, timestamp_fields=('timestamp',),
+                 fsync_batch=32, fsync_interval=1.0, compact_interval=500):
+        self.directory = directory
+        self.legacy_path = legacy_path
+        self.timestamp_fields = timestamp_fields
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_interval = compact_interval
+
+        self._lock = get_lock(directory)
+        self._handle = None
+        self._handle_segment = None
+        self._pending_fsync = 0
+        self._last_fsync = time.monotonic()
+        self._appends_since_compaction = 0
+        self._dirty_segments = set()
+        self._segment_stats = {}
+        self._stats_lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        if self.legacy_path:
+            self._migrate_legacy_file()
+
+    # Segment helpers
+
+    def segment_path(self, segment):
+        """Path of the segment file for a 'YYYY-MM' key"""
+        return os.path.join(self.directory, f"{segment}.jsonl")
+
+    def list_segments(self):
+        """Return the stored segment keys in chronological order"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len('.jsonl')] for name in names
+                      if name.endswith('.jsonl') and _MONTH_PATTERN.match(name))
+
+    def _open_segment(self, segment):
+        """Return an append handle for a segment, repairing a torn final line first"""
+        path = self.segment_path(segment)
+        if self._handle is not None and self._handle_segment == segment:
+            # Reopen if another process compacted or rewrote the segment under us
+            try:
+                if os.stat(path).st_ino != os.fstat(self._handle.fileno()).st_ino:
+                    self._close_handle()
+            except FileNotFoundError:
+                self._close_handle()
+        if self._handle is None or self._handle_segment != segment:
+            self._close_handle()
+            self._handle = open(path, 'ab')
+            self._handle_segment = segment
+
+        # Another process may have appended (or died mid-line) since the last write
+        if _last_byte(path) not in (None, b'\n'):
+            # Terminate the torn line so the next record stays intact
+            self._handle.write(b'\n')
+            self._dirty_segments.add(segment)
+        return self._handle
+
+    def _close_handle(self):
+        if self._handle is not None:
+            self._sync()
+            self._handle.close()
+        self._handle = None
+        self._handle_segment = None
+
+    def _sync(self):
+        if self._handle is not None and self._pending_fsync:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+        self._pending_fsync = 0
+        self._last_fsync = time.monotonic()
+
+    # Writes
+
+    def append(self, record):
+        """Append one record as a single line"""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Append several records, grouping consecutive records of the same segment"""
+        with self._lock:
+            current_segment = handle = None
+            for record in records:
+                segment = record_month(record, self.timestamp_fields)
+                if segment != current_segment:
+                    handle = self._open_segment(segment)
+                    current_segment = segment
+                line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+                handle.write(line.encode('utf-8'))
+                self._pending_fsync += 1
+            if handle is not None:
+                handle.flush()
+
+            if (self._pending_fsync >= self.fsync_batch or
+                    time.monotonic() - self._last_fsync >= self.fsync_interval):
+                self._sync()
+
+            self._appends_since_compaction += len(records)
+            if self._appends_since_compaction >= self.compact_interval:
+                self.compact(only_dirty=True)
+
+    def flush(self):
+        """Force any batched appends to stable storage"""
+        with self._lock:
+            self._sync()
+
+    def rewrite(self, records):
+        """Replace the stored records, dropping segments that end up empty"""
+        with self._lock:
+            self._close_handle()
+            by_segment = {}
+            for record in records:
+                by_segment.setdefault(record_month(record, self.timestamp_fields), []).append(record)
+
+            for segment, segment_records in by_segment.items():
+                self._write_segment(segment, segment_records)
+            for segment in self.list_segments():
+                if segment not in by_segment:
+                    os.remove(self.segment_path(segment))
+            self._dirty_segments.clear()
+
+    def filter(self, keep):
+        """Keep only records for which ``keep(record)`` is true; returns (kept, removed)"""
+        with self._lock:
+            self._close_handle()
+            kept_total = removed_total = 0
+            for segment in self.list_segments():
+                records = list(self.iter_segment(segment))
+                kept = [r for r in records if keep(r)]
+                if len(kept) != len(records) or segment in self._dirty_segments:
+                    if kept:
+                        self._write_segment(segment, kept)
+                    else:
+                        os.remove(self.segment_path(segment))
+                    self._dirty_segments.discard(segment)
+                kept_total += len(kept)
+                removed_total += len(records) - len(kept)
+            return kept_total, removed_total
+
+    def remove_before(self, cutoff):
+        """
+        Remove the records dated before ``cutoff`` ('YYYY-MM-DD'); returns how many were removed
+
+        Segments of earlier months are deleted whole without being parsed; only
+        the segment of the cutoff month is filtered record by record.
+        """
+        cutoff_month = cutoff[:7]
+        with self._lock:
+            self._close_handle()
+            removed = 0
+            for segment in self.list_segments():
+                if segment > cutoff_month:
+                    break
+                path = self.segment_path(segment)
+                if segment < cutoff_month:
+                    removed += _count_lines(path)
+                    os.remove(path)
+                    self._dirty_segments.discard(segment)
+                    continue
+
+                records = list(self.iter_segment(segment))
+                kept = [r for r in records if not dated_before(r, self.timestamp_fields, cutoff)]
+                if len(kept) != len(records):
+                    if kept:
+                        self._write_segment(segment, kept)
+                    else:
+                        os.remove(path)
+                    self._dirty_segments.discard(segment)
+                removed += len(records) - len(kept)
+            return removed
+
+    def _write_segment(self, segment, records):
+        payload = ''.join(json.dumps(r, ensure_ascii=False, default=str) + '\n' for r in records)
+        atomic_write_bytes(self.segment_path(segment), payload.encode('utf-8'))
+
+    # Reads
+
+    def iter_segment(self, segment):
+        """Yield the records of one segment, skipping torn or corrupt lines"""
+        path = self.segment_path(segment)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Either a line still being written or a torn one; a later append repairs it
+                    continue
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    self._dirty_segments.add(segment)
+
+    def iter_records(self, segments=None):
+        """Yield stored records segment by segment, oldest month first"""
+        for segment in (self.list_segments() if segments is None else segments):
+            yield from self.iter_segment(segment)
+
+    def iter_months(self, first_month=None, last_month=None):
+        """Yield the records of segments between two 'YYYY-MM' keys (inclusive, open-ended if None)"""
+        segments = [segment for segment in self.list_segments()
+                    if (first_month is None or segment >= first_month)
+                    and (last_month is None or segment <= last_month)]
+        return self.iter_records(segments)
+
+    def load_all(self):
+        """Return every stored record as a list"""
+        return list(self.iter_records())
+
+    # Summary statistics
+
+    def stats(self, field='timestamp'):
+        """
+        Return ``(record_count, latest_value)`` over all segments
+
+        Each segment's count and maximum are cached together with the byte
+        offset they cover, so a call only parses lines appended since the
+        previous one. Segments replaced by a compaction or rewrite are rescanned.
+        """
+        with self._stats_lock:
+            cache = self._segment_stats.setdefault(field, {})
+            segments = self.list_segments()
+            for segment in set(cache) - set(segments):
+                del cache[segment]
+
+            count = 0
+            latest = None
+            for segment in segments:
+                entry = self._segment_summary(segment, field, cache.get(segment))
+                if entry is None:
+                    cache.pop(segment, None)
+                    continue
+                cache[segment] = entry
+                count += entry['count']
+                if entry['latest'] is not None and (latest is None or entry['latest'] > latest):
+                    latest = entry['latest']
+            return count, latest
+
+    def _segment_summary(self, segment, field, entry):
+        """Extend a cached segment summary with the complete lines written after it"""
+        position = (entry['inode'], entry['offset']) if entry is not None else None
+        tail = self._read_tail(segment, position)
+        if tail is None:
+            return None
+        records, (inode, offset), replaced = tail
+        if entry is None or replaced:
+            entry = {'count': 0, 'latest': None}
+
+        count, latest = summarize_records(records, field)
+        if entry['latest'] is not None and (latest is None or entry['latest'] > latest):
+            latest = entry['latest']
+        return {'inode': inode, 'offset': offset, 'count': entry['count'] + count, 'latest': latest}
+
+    def _read_tail(self, segment, position=None):
+        """
+        Read the complete lines of a segment after ``position``
+
+        ``position`` is an ``(inode, offset)`` pair returned by an earlier call.
+        Returns ``(records, position, replaced)``, where ``replaced`` tells that
+        the segment was rewritten since then and was read from the start, or
+        None if the segment no longer exists.
+        """
+        try:
+            f = open(self.segment_path(segment), 'rb')
+        except FileNotFoundError:
+            return None
+        with f:
+            st = os.fstat(f.fileno())
+            replaced = position is not None and (position[0] != st.st_ino or st.st_size < position[1])
+            offset = 0 if position is None or replaced else position[1]
+
+            records = []
+            if st.st_size > offset:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        # Unfinished line; pick it up on a later call once it is complete
+                        break
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        continue
+        return records, (st.st_ino, offset), replaced
+
+    def read_since(self, cursor=None):
+        """
+        Return ``(records, cursor, reset)`` for the records appended after ``cursor``
+
+        Pass the returned cursor to the next call to receive only newer
+        records. When segments were rewritten or removed in the meantime (by
+        compaction, filtering or retention) ``reset`` is True and ``records``
+        holds every stored record, so callers should rebuild their state.
+        """
+        segments = self.list_segments()
+        if cursor is not None and set(cursor) - set(segments):
+            cursor = None
+            reset = True
+        else:
+            reset = cursor is None
+
+        records = []
+        new_cursor = {}
+        for segment in segments:
+            tail = self._read_tail(segment, None if cursor is None else cursor.get(segment))
+            if tail is None:
+                continue
+            segment_records, position, replaced = tail
+            if replaced:
+                records, new_cursor, _ = self.read_since(None)
+                return records, new_cursor, True
+            records.extend(segment_records)
+            new_cursor[segment] = position
+        return records, new_cursor, reset
+
+    # Maintenance
+
+    def compact(self, only_dirty=False):
+        """Rewrite segments without their torn or corrupt lines"""
+        with self._lock:
+            self._appends_since_compaction = 0
+            segments = sorted(self._dirty_segments) if only_dirty else self.list_segments()
+            if not segments:
+                return 0
+            self._close_handle()
+            for segment in segments:
+                records = list(self.iter_segment(segment))
+                self._write_segment(segment, records)
+                self._dirty_segments.discard(segment)
+            return len(segments)
+
+    def _migrate_legacy_file(self):
+        """
+        One-time import of the old JSON array file into segments
+
+        The legacy file is renamed to ``.migrating`` before import and to
+        ``.migrated`` afterwards. If a previous import was interrupted, the
+        leftover ``.migrating`` file is re-imported skipping records that
+        already made it into the segments.
+        """
+        migrating_path = f"{self.legacy_path}.migrating"
+        with self._lock:
+            resuming = os.path.exists(migrating_path)
+            if not resuming:
+                if not os.path.exists(self.legacy_path):
+                    return
+                os.replace(self.legacy_path, migrating_path)
+
+            try:
+                with open(migrating_path, 'r', encoding='utf-8') as f:
+                    content = f.read().strip()
+                records = json.loads(content) if content else []
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                logger.error(f"Not migrating unreadable {migrating_path}: {e}")
+                return
+            if not isinstance(records, list):
+                records = []
+
+            if resuming:
+                imported = {json.dumps(r, sort_keys=True, default=str) for r in self.iter_records()}
+                records = [r for r in records if json.dumps(r, sort_keys=True, default=str) not in imported]
+
+            if records:
+                self.append_many(records)
+                self._sync()
+            os.replace(migrating_path, f"{self.legacy_path}.migrated")
+            logger.info(f"Migrated {len(records)} records from {self.legacy_path} to {self.directory}")
+
+    def close(self):
+        """Flush and close the open segment handle"""
+        with self._lock:
+            self._close_handle()
+
+
+STORAGE_BACKENDS = {
+    'jsonl': JsonLinesStore,
+    'json': JsonArrayStore
+}
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_storage_backend():
+    """Name of the configured storage backend"""
+    backend = os.environ.get('EDUSCAN_STORAGE_BACKEND', DEFAULT_BACKEND)
+    if backend not in STORAGE_BACKENDS:
+        logger.error(f"Unknown storage backend '{backend}', using '{DEFAULT_BACKEND}'")
+        backend = DEFAULT_BACKEND
+    return backend
+
+
+def get_store(dataset, data_dir):
+    """Return the shared store instance for a dataset ('student_data' or 'parent_observations')"""
+    backend = get_storage_backend()
+    key = (backend, os.path.abspath(data_dir), dataset)
+
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            legacy_path = os.path.join(data_dir, f"{dataset}.json")
+            timestamp_fields = DATASET_TIMESTAMP_FIELDS.get(dataset, ('timestamp',))
+            if backend == 'json':
+                store = JsonArrayStore(legacy_path, timestamp_fields=timestamp_fields)
+            else:
+                store = JsonLinesStore(
+                    os.path.join(data_dir, dataset),
+                    legacy_path=legacy_path,
+                    timestamp_fields=timestamp_fields
+                )
+            _stores[key] = store
+        return store
+
+
+def close_all_stores():
+    """Flush every open store; registered to run at interpreter exit"""
+    with _stores_lock:
+        for store in _stores.values():
+            if isinstance(store, JsonLinesStore):
+                store.close()
+
+
+atexit.register(close_all_stores)